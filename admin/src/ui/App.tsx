@@ -664,7 +664,14 @@ export default function App() {
         const ws = new WebSocket(wsUrl)
         adminWsRef.current = ws
         setAdminWs(ws)
-        ws.onopen = () => { reconnectAttemptsRef.current = 0 }
+        ws.onopen = () => {
+          reconnectAttemptsRef.current = 0
+          // Получаем только открытый диалог, а не сообщения всех пользователей
+          const selected = activeChatUserRef.current
+          try { ws.send(JSON.stringify({ action: 'subscribe', userIds: selected ? [selected.id] : [] })) } catch {
+            // ignore
+          }
+        }
         ws.onmessage = (ev) => {
           try {
             const message = JSON.parse(ev.data)
@@ -720,8 +727,18 @@ export default function App() {
   }, [])
 
   const openUser = async (u: any) => {
+    const previous = activeChatUserRef.current
     setActiveChatUser(u)
     activeChatUserRef.current = u
+    const ws = adminWsRef.current
+    if (ws && ws.readyState === WebSocket.OPEN) {
+      try {
+        if (previous && previous.id !== u.id) ws.send(JSON.stringify({ action: 'unsubscribe', userIds: [previous.id] }))
+        ws.send(JSON.stringify({ action: 'subscribe', userIds: [u.id] }))
+      } catch {
+        // ignore
+      }
+    }
     try {
       const [history, ordersList] = await Promise.all([
         api(`/users/${u.id}/chat`).catch(() => []),
@@ -746,6 +763,21 @@ export default function App() {
     }
   }
 
+  const closeUser = () => {
+    const previous = activeChatUserRef.current
+    const ws = adminWsRef.current
+    if (previous && ws && ws.readyState === WebSocket.OPEN) {
+      try { ws.send(JSON.stringify({ action: 'unsubscribe', userIds: [previous.id] })) } catch {
+        // ignore
+      }
+    }
+    activeChatUserRef.current = null
+    setActiveChatUser(null)
+    setChat([])
+    setUserOrders([])
+    setSelectedUserOrderId(null)
+  }
+
   const sendAdminMessage = async () => {
     if (!activeChatUser || !chatInput.trim()) return
     const payload = { userId: activeChatUser.id, text: chatInput.trim() }
@@ -1167,7 +1199,7 @@ export default function App() {
           {tab === 'users' && activeChatUser && (
             <div className="neo-stack">
               <div className="neo-row between">
-                <button className="neo-back" onClick={() => { setActiveChatUser(null); setChat([]); setUserOrders([]); setSelectedUserOrderId(null) }}>← Назад</button>
+                <button className="neo-back" onClick={closeUser}>← Назад</button>
                 <span className="neo-status">{activeChatUser.name || activeChatUser.phone || 'Пользователь'}</span>
                 <span className="neo-status">ID {activeChatUser.id}</span>
               </div>
@@ -22,6 +22,8 @@ export default function ChatScreen() {
   const wsRef = useRef(null);
   const tokenRef = useRef('');
   const uidRef = useRef(null);
+  // Номер последнего полученного сообщения: при переподключении сервер досылает только пропущенное
+  const lastSeqRef = useRef(null);
   const reconnectTimerRef = useRef(null);
   const reconnectAttemptsRef = useRef(0);
   const shouldReconnectRef = useRef(true);
@@ -30,19 +32,39 @@ export default function ChatScreen() {
   const base = getApiBase();
   const wsUrl = base.replace(/^http/, 'ws') + '/ws/user';
 
+  const trackSeq = (list) => {
+    for (const m of list || []) {
+      if (typeof m?.seq === 'number' && (lastSeqRef.current === null || m.seq > lastSeqRef.current)) lastSeqRef.current = m.seq;
+    }
+  };
+
+  const reloadHistory = async () => {
+    if (!uidRef.current) return;
+    try {
+      const histRes = await fetch(`${base}/users/${uidRef.current}/chat`, { headers: { Authorization: `Bearer ${tokenRef.current}` } });
+      if (histRes.ok) { const hist = await histRes.json(); trackSeq(hist); setMessages(hist || []); }
+    } catch {}
+  };
+
   const connectWs = () => {
     if (!tokenRef.current) return;
     try {
       const ws = new WebSocket(wsUrl);
       wsRef.current = ws;
       ws.onopen = () => {
-        try { ws.send(JSON.stringify({ token: tokenRef.current })); } catch {}
+        const init = lastSeqRef.current === null ? { token: tokenRef.current } : { token: tokenRef.current, since: lastSeqRef.current };
+        try { ws.send(JSON.stringify(init)); } catch {}
         reconnectAttemptsRef.current = 0;
       };
       ws.onmessage = (ev) => {
         try {
           const msg = JSON.parse(ev.data);
+          if (msg?.type === 'replay' && msg.truncated) {
+            // Пропущено слишком много — проще перезагрузить историю целиком
+            reloadHistory();
+          }
           if (msg?.type === 'message') {
+            trackSeq([msg.data]);
             setMessages((prev) => {
               const d = msg.data;
               return prev.some((m) => m.id === d.id) ? prev : [...prev, d];
@@ -83,6 +105,7 @@ export default function ChatScreen() {
     const histRes = await fetch(`${base}/users/${uid}/chat`);
     const hist = histRes.ok ? await histRes.json() : [];
         if (!mounted) return;
+        trackSeq(hist);
         setMessages(hist);
   // Ensure newest messages are visible on initial load
   try { setTimeout(() => { if (listRef.current?.scrollToEnd) listRef.current.scrollToEnd({ animated: false }); }, 0); } catch {}
@@ -99,6 +122,7 @@ export default function ChatScreen() {
         if (action === 'logout') {
           // Clear messages and close WS
           setMessages([]);
+          lastSeqRef.current = null;
           shouldReconnectRef.current = false;
           try { if (reconnectTimerRef.current) clearTimeout(reconnectTimerRef.current); } catch {}
           try { wsRef.current && wsRef.current.close(); } catch {}
@@ -110,6 +134,7 @@ export default function ChatScreen() {
           try { shouldReconnectRef.current = true; } catch {}
           try { tokenRef.current = await AsyncStorage.getItem('tow_token') || ''; } catch {}
           setMessages([]);
+          lastSeqRef.current = null;
           // reload history
           try {
             if (tokenRef.current) {
@@ -117,7 +142,7 @@ export default function ChatScreen() {
               if (meRes.ok) {
                 const me = await meRes.json(); const uid = me?.user?.id; uidRef.current = uid || null;
                 const histRes = await fetch(`${base}/users/${uid}/chat`, { headers: { Authorization: `Bearer ${tokenRef.current}` } });
-                if (histRes.ok) { const hist = await histRes.json(); setMessages(hist || []); }
+                if (histRes.ok) { const hist = await histRes.json(); trackSeq(hist); setMessages(hist || []); }
               }
             }
           } catch (_) {}
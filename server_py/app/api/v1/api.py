@@ -1,5 +1,9 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import users, auth, orders, drivers, tariff, settings, geocoding
+from app.api.v1.endpoints import users, auth, orders, drivers, tariff, settings
+
+# Геокодинг подключается лениво в app.main (GEOCODING_ROUTER), без импорта здесь
+GEOCODING_ROUTER = "app.api.v1.endpoints.geocoding:router"
+GEOCODING_PREFIX = "/geocode"
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -8,4 +12,3 @@ api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
 api_router.include_router(drivers.router, prefix="/drivers", tags=["drivers"])
 api_router.include_router(tariff.router, tags=["tariff"])
 api_router.include_router(settings.router, tags=["settings"])
-api_router.include_router(geocoding.router, prefix="/geocode", tags=["geocoding"])
\ No newline at end of file
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from app.core.auth_cache import invalidate_user
+from app.core.database import get_db, get_read_db
 from app.services.auth import AuthService
 from app.schemas.auth import PhoneRequest, VerifyCodeRequest, TokenResponse
 from app.schemas.user import User as UserSchema
@@ -22,7 +23,7 @@ router = APIRouter()
 @router.post("/send-code", status_code=status.HTTP_200_OK)
 async def send_verification_code(
     request: PhoneRequest,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Отправляет код подтверждения на указанный номер телефона.
@@ -72,6 +73,9 @@ async def verify_code(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Неверный или истекший код"
         )
+
+    # verify_code мог поменять телефон или имя: сбрасываем кеш профиля
+    await invalidate_user(user.id)
     
     # Создаем JWT токен
     token = auth_service.create_token(user.id)
@@ -1,21 +1,24 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List
 
-from app.core.database import get_db
+from app.core.database import get_read_db
+from app.core.pagination import PageParams, fetch_page, page_params
 from app.models.user import User
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[dict])
-async def get_drivers(db: AsyncSession = Depends(get_db)):
-    """Get all drivers (users with role='driver')."""
-    result = await db.execute(
-        select(User).where(User.role == "driver").order_by(User.created_at.desc())
-    )
-    drivers = result.scalars().all()
+async def get_drivers(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Get drivers (users with role='driver'), newest first; next page via X-Next-Cursor."""
+    result = await fetch_page(db, select(User).where(User.role == "driver"), User, page)
+    drivers = result.apply_headers(response)
     
     return [
         {
@@ -1,28 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.database import get_read_db
+from app.core.dependencies import get_current_user, require_admin
+from app.core.fast_json import Projection, page_response
+from app.core.pagination import PageParams, page_params
+from app.core.write_queue import write_queue
 from app.models.user import User
 from app.models.order import Order
 from app.schemas.order import OrderCreate, OrderResponse
+from app.services.order_export import EXPORT_FORMATS, OrderExport
+from app.websockets.chat_ws import chat_manager
 from typing import List, Optional
 
 router = APIRouter()
 
+ORDER_ROWS = Projection(Order, OrderResponse)
+
 @router.get("", response_model=List[OrderResponse])
 async def get_orders(
-    db: AsyncSession = Depends(get_db)
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Получение списка заказов"""
-    result = await db.execute(select(Order).order_by(Order.created_at.desc()))
-    orders = result.scalars().all()
-    return orders
+    """Получение списка заказов (новые сверху, следующая страница — по X-Next-Cursor)"""
+    return await page_response(db, ORDER_ROWS, page, response)
 
 @router.post("", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order_data: OrderCreate,
-    db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user)
 ):
     """Создание заказа (с авторизацией или без)"""
@@ -51,16 +59,41 @@ async def create_order(
         meta=order_data.meta
     )
     
-    db.add(order)
-    await db.commit()
-    await db.refresh(order)
-    
+    # Групповой коммит: заказ возвращается уже сохранённым, с id
+    order = await write_queue.add(order)
+
+    # Событие владельцу заказа и всем админам (без учёта подписок на диалоги),
+    # в каком бы воркере ни были их сокеты
+    event = {"type": "order", "event": "created", "data": OrderResponse.model_validate(order).model_dump(mode="json")}
+    if order.user_id is not None:
+        await chat_manager.send_to_user(order.user_id, event)
+    await chat_manager.broadcast_admin(event)
     return order
 
+@router.get("/export", dependencies=[Depends(require_admin)])
+async def export_orders(
+    format: str = Query("ndjson", description="ndjson или csv"),
+    created_from: Optional[datetime] = Query(None, alias="from", description="Создан не раньше"),
+    created_to: Optional[datetime] = Query(None, alias="to", description="Создан раньше"),
+    order_status: Optional[List[str]] = Query(None, alias="status", description="Фильтр по статусу, можно несколько"),
+):
+    """Выгрузка заказов для отчётов потоком NDJSON/CSV (новые сверху), только для админов"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Неизвестный формат: {format}",
+        )
+    export = OrderExport(created_from=created_from, created_to=created_to, statuses=order_status)
+    return StreamingResponse(
+        export.stream(format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'},
+    )
+
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получение заказа по ID"""
     result = await db.execute(select(Order).where(Order.id == order_id))
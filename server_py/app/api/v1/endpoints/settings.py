@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Dict
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.app_settings import Support, Info
 from app.schemas.settings import SupportResponse, InfoResponse
 
@@ -11,7 +11,7 @@ router = APIRouter()
 
 
 @router.get("/support", response_model=SupportResponse)
-async def get_support(db: AsyncSession = Depends(get_db)):
+async def get_support(db: AsyncSession = Depends(get_read_db)):
     """Get support contact information."""
     result = await db.execute(select(Support).order_by(Support.id.desc()).limit(1))
     support = result.scalars().first()
@@ -45,7 +45,7 @@ async def update_support(
 
 
 @router.get("/info", response_model=InfoResponse)
-async def get_info(db: AsyncSession = Depends(get_db)):
+async def get_info(db: AsyncSession = Depends(get_read_db)):
     """Get application information."""
     result = await db.execute(select(Info).order_by(Info.id.desc()).limit(1))
     info = result.scalars().first()
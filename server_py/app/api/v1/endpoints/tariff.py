@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Dict
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.tariff import Tariff
 from app.schemas.tariff import TariffResponse
 
@@ -11,7 +11,7 @@ router = APIRouter()
 
 
 @router.get("/tariff", response_model=TariffResponse)
-async def get_tariff(db: AsyncSession = Depends(get_db)):
+async def get_tariff(db: AsyncSession = Depends(get_read_db)):
     """Get current tariff settings."""
     result = await db.execute(select(Tariff).order_by(Tariff.id.desc()).limit(1))
     tariff = result.scalars().first()
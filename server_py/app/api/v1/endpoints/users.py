@@ -1,14 +1,18 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.auth_cache import invalidate_user
 from app.core.dependencies import get_current_user
+from app.core.fast_json import Projection, page_response
+from app.core.pagination import PageParams, chat_page_params, page_params
+from app.core.write_queue import write_queue
 from app.models.user import User
 from app.models.order import Order
-from app.schemas.user import User as UserSchema, UserUpdate
+from app.schemas.user import User as UserSchema, UserUpdate, preferred_name
 
 from app.schemas.auth import UserProfileUpdate
 from app.schemas.chat import ChatMessageCreate, ChatMessageResponse
@@ -18,14 +22,26 @@ from app.schemas.order import OrderResponse
 
 router = APIRouter()
 
+USER_ROWS = Projection(
+    User,
+    UserSchema,
+    computed={
+        "name": lambda u: preferred_name(u["display_name"], u["first_name"], u["last_name"], u["phone"]),
+    },
+)
+ORDER_ROWS = Projection(Order, OrderResponse)
+
 @router.get("", response_model=List[UserSchema])
-async def list_users(db: AsyncSession = Depends(get_db)):
+async def list_users(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
     """Возвращает список пользователей (для админки и мобильного приложения)."""
-    result = await db.execute(select(User).order_by(User.created_at.desc()))
-    return result.scalars().all()
+    return await page_response(db, USER_ROWS, page, response)
 
 @router.get("/stats")
-async def users_stats(db: AsyncSession = Depends(get_db)):
+async def users_stats(db: AsyncSession = Depends(get_read_db)):
     """Возвращает агрегированную информацию о количестве пользователей."""
     result = await db.execute(select(func.count()).select_from(User))
     count = result.scalar_one()
@@ -42,28 +58,32 @@ async def get_current_user_profile(
 async def update_current_user_profile(
     profile_data: UserProfileUpdate,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
 ):
     """Обновление профиля текущего пользователя"""
-    # Обновляем данные пользователя
     payload = profile_data.model_dump(exclude_unset=True)
-    sentinel = object()
-    display_name = payload.pop("display_name", sentinel)
-    if display_name is not sentinel:
-        current_user.display_name = display_name
-    for field, value in payload.items():
-        setattr(current_user, field, value)
-    
-    await db.commit()
-    await db.refresh(current_user)
-    
-    return current_user
+
+    async def apply(session: AsyncSession) -> User:
+        # Обновляем данные пользователя в транзакции писателя
+        user = await session.get(User, current_user.id)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Пользователь не найден",
+            )
+        for field, value in payload.items():
+            setattr(user, field, value)
+        await session.flush()
+        return user
+
+    user = await write_queue.run(apply)
+    await invalidate_user(user.id)
+    return user
 
 @router.get("/{user_id}", response_model=UserSchema)
 async def get_user(
     user_id: int,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получение пользователя по ID (требует аутентификации)"""
     from sqlalchemy.future import select
@@ -83,21 +103,23 @@ async def get_user(
 @router.get("/{user_id}/orders", response_model=List[OrderResponse])
 async def get_user_orders(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Список заказов конкретного пользователя для админки."""
 
-    result = await db.execute(
-        select(Order).where(Order.user_id == user_id).order_by(Order.created_at.desc())
-    )
-    return result.scalars().all()
+    return await page_response(db, ORDER_ROWS, page, response, Order.user_id == user_id)
 
 
 @router.get("/{user_id}/chat", response_model=List[ChatMessageResponse])
 async def get_user_chat(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(chat_page_params),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    """История чата: последние сообщения, более старые — по X-Prev-Cursor."""
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     if not user:
@@ -107,8 +129,8 @@ async def get_user_chat(
         )
 
     chat_service = ChatService(db)
-    messages = await chat_service.list_messages(user_id=user_id, limit=500)
-    return [ChatMessageResponse.model_validate(m) for m in messages]
+    result = await chat_service.page_messages(user_id=user_id, params=page)
+    return [ChatMessageResponse.model_validate(m) for m in result.apply_headers(response)]
 
 
 @router.post(
@@ -119,7 +141,7 @@ async def get_user_chat(
 async def post_user_chat_message(
     user_id: int,
     payload: ChatMessageCreate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: Optional[User] = Depends(get_current_user),
 ):
     text = (payload.text or "").strip()
@@ -155,13 +177,11 @@ async def post_user_chat_message(
                 detail="Недостаточно прав",
             )
 
-    chat_service = ChatService(db)
-    message = await chat_service.create_message(
+    message = await ChatService().create_message(
         user_id=user_id,
         sender=sender,
         text=text,
         meta=payload.meta,
-        auto_commit=True,
     )
 
     payload_dict = {"type": "message", "data": serialize_message(message)}
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from jose import JWTError, jwt
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.core.database import AsyncReadSessionLocal
+from app.core.pubsub import pubsub
+from app.core.security import ALGORITHM
+from app.models.user import User
+from app.services.auth import AuthService
+
+# Канал pub/sub: профиль изменился — сбросить кеш во всех воркерах
+CHANNEL_USER_INVALIDATE = "auth.user_invalidate"
+
+
+class TokenMemo:
+    """Уже проверенные JWT: токен → (user_id, exp). Живут до истечения токена."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._items: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[int]:
+        item = self._items.get(token)
+        if item is None:
+            self.misses += 1
+            return None
+        user_id, exp = item
+        if exp <= time.time():
+            del self._items[token]
+            self.misses += 1
+            return None
+        self._items.move_to_end(token)
+        self.hits += 1
+        return user_id
+
+    def put(self, token: str, user_id: int, exp: float) -> None:
+        self._items[token] = (user_id, exp)
+        self._items.move_to_end(token)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"size": len(self._items), "hits": self.hits, "misses": self.misses}
+
+
+def _snapshot(user: User) -> Mapping[str, Any]:
+    """Неизменяемый снимок колонок пользователя (все колонки скалярные)."""
+    return MappingProxyType({attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+
+
+def _restore(snapshot: Mapping[str, Any]) -> User:
+    user = User(**snapshot)
+    # Как загруженный из БД и отсоединённый: merge() не превратит его в INSERT
+    make_transient_to_detached(user)
+    return user
+
+
+class UserCache:
+    """Пользователи по id на AUTH_USER_CACHE_TTL_SECONDS, LRU до max_size записей.
+
+    Хранится неизменяемый снимок колонок, каждый get() собирает из него новый
+    отсоединённый User: изменения current_user в одном запросе не видны
+    другим. Ленивые связи недоступны (как и у current_user после закрытия сессии).
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items: "OrderedDict[int, Tuple[Optional[Mapping[str, Any]], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int) -> Tuple[bool, Optional[User]]:
+        item = self._items.get(user_id)
+        if item is None or item[1] <= time.monotonic():
+            self.misses += 1
+            return False, None
+        self._items.move_to_end(user_id)
+        self.hits += 1
+        snapshot = item[0]
+        return True, None if snapshot is None else _restore(snapshot)
+
+    def put(self, user_id: int, user: Optional[User]) -> None:
+        # None тоже кешируется: удалённый пользователь со старым токеном не ходит в БД
+        snapshot = None if user is None else _snapshot(user)
+        self._items[user_id] = (snapshot, time.monotonic() + self.ttl)
+        self._items.move_to_end(user_id)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def discard(self, user_id: int) -> None:
+        if self._items.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+token_memo = TokenMemo(settings.AUTH_TOKEN_CACHE_SIZE)
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL_SECONDS)
+
+
+def decode_user_id(token: str) -> Optional[int]:
+    """id пользователя из JWT; подпись проверяется один раз за жизнь токена."""
+    if not token:
+        return None
+    if settings.AUTH_CACHE_ENABLED:
+        user_id = token_memo.get(token)
+        if user_id is not None:
+            return user_id
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        user_id = int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+    exp = payload.get("exp")
+    if settings.AUTH_CACHE_ENABLED and isinstance(exp, (int, float)):
+        token_memo.put(token, user_id, float(exp))
+    return user_id
+
+
+async def get_user(user_id: int) -> Optional[User]:
+    if settings.AUTH_CACHE_ENABLED:
+        found, user = user_cache.get(user_id)
+        if found:
+            return user
+    async with AsyncReadSessionLocal() as session:
+        user = await AuthService(session).get_user_by_id(user_id)
+    if settings.AUTH_CACHE_ENABLED:
+        user_cache.put(user_id, user)
+    return user
+
+
+async def resolve_token(token: str) -> Optional[User]:
+    """Активный пользователь по токену или None (HTTP и рукопожатие вебсокета)."""
+    user_id = decode_user_id(token)
+    if user_id is None:
+        return None
+    user = await get_user(user_id)
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+async def invalidate_user(user_id: int) -> None:
+    """Вызывать после любого изменения пользователя: сбрасывает кеш во всех воркерах."""
+    await pubsub.publish(CHANNEL_USER_INVALIDATE, {"userId": user_id})
+
+
+async def _on_invalidate(event: Dict[str, Any]) -> None:
+    user_cache.discard(int(event["userId"]))
+
+
+pubsub.subscribe(CHANNEL_USER_INVALIDATE, _on_invalidate)
@@ -1,19 +1,152 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from typing import Any, AsyncGenerator, Dict
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
 # Создаем базовый класс для моделей
 Base = declarative_base()
 
-# Создаем движок SQLAlchemy для асинхронной работы
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+# Профили PRAGMA для SQLite, применяются к каждому новому соединению
+SQLITE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",  # Читатели не блокируются писателем
+        "synchronous": "NORMAL",  # В режиме WAL безопасно и намного быстрее FULL
+        "busy_timeout": 5000,  # мс ожидания блокировки вместо мгновенного "database is locked"
+        "cache_size": -65536,  # 64 МБ страничного кеша на соединение
+        "mmap_size": 268435456,  # 256 МБ файла читаются через mmap
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    return {**SQLITE_PROFILES[settings.DB_SQLITE_PROFILE], **settings.DB_SQLITE_PRAGMAS}
+
+
+def async_database_url(url: str) -> str:
+    """Приводит URL к асинхронному драйверу: postgres:// → postgresql+asyncpg://."""
+    parsed = make_url(url)
+    if parsed.drivername in ("postgres", "postgresql", "postgresql+psycopg2"):
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    elif parsed.drivername == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+
+def _is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def _postgres_engine_options() -> Dict[str, Any]:
+    cache_size = settings.DB_STATEMENT_CACHE_SIZE if settings.DB_PREPARED_STATEMENTS else 0
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {
+            # Кеш asyncpg и кеш подготовленных запросов диалекта SQLAlchemy
+            "statement_cache_size": cache_size,
+            "prepared_statement_cache_size": cache_size,
+        },
+    }
+
+
+def _install_pragmas(engine: AsyncEngine, read_only: bool) -> None:
+    pragmas = sqlite_pragmas()
+    if read_only:
+        # Защита от случайной записи через читающий движок
+        pragmas["query_only"] = "ON"
+    else:
+        pragmas.pop("query_only", None)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def _install_sqlite_transactions(engine: AsyncEngine, begin: str = "BEGIN") -> None:
+    """Транзакции SQLite ведёт SQLAlchemy, а не драйвер.
+
+    pysqlite сам открывает транзакцию только перед DML и не знает о SAVEPOINT,
+    из-за чего точки сохранения (пачки группового коммита) коммитились бы
+    раньше внешней транзакции.
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql(begin)
+
+
+def _create_engines() -> "tuple[AsyncEngine, AsyncEngine]":
+    url = async_database_url(settings.DATABASE_URL)
+    if make_url(url).get_backend_name() == "postgresql":
+        # PostgreSQL сам обслуживает конкурентных писателей: один пул на всё
+        engine = create_async_engine(url, echo=settings.DATABASE_ECHO, **_postgres_engine_options())
+        return engine, engine
+    if not _is_sqlite_file(url):
+        engine = create_async_engine(url, echo=settings.DATABASE_ECHO)
+        _install_sqlite_transactions(engine)
+        return engine, engine
+
+    if not settings.DB_SPLIT_READ_WRITE:
+        engine = create_async_engine(url, echo=settings.DATABASE_ECHO)
+        _install_pragmas(engine, read_only=False)
+        _install_sqlite_transactions(engine)
+        return engine, engine
+
+    # SQLite допускает одного писателя: одно соединение на запись вместо
+    # конкуренции за блокировку файла, и отдельный пул только для чтения
+    write_engine = create_async_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.DB_WRITE_POOL_TIMEOUT,
+    )
+    read_engine = create_async_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.DB_READ_POOL_SIZE,
+        max_overflow=0,
+    )
+    _install_pragmas(write_engine, read_only=False)
+    _install_pragmas(read_engine, read_only=True)
+    # Писатель сразу берёт блокировку записи: чтение внутри его транзакции
+    # не устаревает из-за другого процесса (SQLITE_BUSY_SNAPSHOT)
+    _install_sqlite_transactions(write_engine, "BEGIN IMMEDIATE")
+    _install_sqlite_transactions(read_engine)
+    return write_engine, read_engine
+
+
+# Движок для записи и движок для чтения (для PostgreSQL это один и тот же движок)
+engine, read_engine = _create_engines()
 
 # Создаем фабрику сессий
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# Сессии только для чтения: списки заказов, чат и проверки пользователя
+AsyncReadSessionLocal = sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False
+)
+
 # Функция для получения сессии БД
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
@@ -24,4 +157,19 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+# Сессия для эндпоинтов, которые только читают: не занимает соединение писателя
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def dispose_engines() -> None:
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
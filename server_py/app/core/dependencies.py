@@ -1,11 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
-from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from app.core.config import settings
-from app.core.database import get_db
-from app.services.auth import AuthService
+from app.core.auth_cache import resolve_token
 from app.models.user import User
 
 # Определяем схему безопасности
@@ -13,40 +9,17 @@ security = HTTPBearer(auto_error=False)
 
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: AsyncSession = Depends(get_db)
 ) -> Optional[User]:
     """
     Dependency для получения текущего пользователя из JWT токена.
     Возвращает None если токен не предоставлен или невалиден (для опциональной авторизации).
+    Проверенные токены и пользователи берутся из кеша (app.core.auth_cache),
+    поэтому горячий клиент не проверяет подпись и не ходит в БД.
     """
     if not credentials:
         return None
-    
-    token = credentials.credentials
-    
-    try:
-        # Декодируем JWT токен
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=["HS256"]
-        )
-        user_id: str = payload.get("sub")
-        
-        if user_id is None:
-            return None
-            
-    except JWTError:
-        return None
-    
-    # Получаем пользователя из БД
-    auth_service = AuthService(db)
-    user = await auth_service.get_user_by_id(int(user_id))
-    
-    if user is None or not user.is_active:
-        return None
-    
-    return user
+
+    return await resolve_token(credentials.credentials)
 
 async def require_auth(
     current_user: Optional[User] = Depends(get_current_user)
@@ -60,4 +33,17 @@ async def require_auth(
             detail="Требуется авторизация",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def require_admin(
+    current_user: User = Depends(require_auth)
+) -> User:
+    """
+    Dependency для служебных эндпоинтов (выгрузки, статистика): только role='admin'.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Недостаточно прав",
+        )
+    return current_user
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pagination import PageParams, fetch_page
+
+Computed = Callable[[Dict[str, Any]], Any]
+
+
+class Projection:
+    """Колонки схемы ответа, выбранные Core-запросом, и сборка словарей из строк.
+
+    Ключи и порядок полей берутся из Pydantic-схемы один раз при импорте,
+    поэтому ответ совпадает с обычным путём через response_model, но строки
+    не проходят ни через ORM-объекты, ни через повторную валидацию.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        schema: Type[BaseModel],
+        computed: Optional[Dict[str, Computed]] = None,
+    ) -> None:
+        self.model = model
+        self.fields = tuple(schema.model_fields)
+        self.columns = [getattr(model, name) for name in self.fields]
+        self.computed = computed or {}
+
+    def select(self) -> Select:
+        return select(*self.columns)
+
+    def dicts(self, rows: Sequence[Any]) -> List[Dict[str, Any]]:
+        fields = self.fields
+        items = [dict(zip(fields, row)) for row in rows]
+        for name, compute in self.computed.items():
+            for item in items:
+                item[name] = compute(item)
+        return items
+
+
+async def page_response(
+    db: AsyncSession,
+    projection: Projection,
+    params: PageParams,
+    response: Response,
+    *where: Any,
+) -> Any:
+    """Страница списка: быстрый путь (Core-строки + orjson) или обычный через ORM.
+
+    Быстрый путь возвращает готовый ORJSONResponse, FastAPI не применяет к нему
+    response_model; схема остаётся в OpenAPI.
+    """
+    model = projection.model
+    if not settings.FAST_JSON_LISTS:
+        page = await fetch_page(db, select(model).where(*where), model, params)
+        return page.apply_headers(response)
+
+    page = await fetch_page(db, projection.select().where(*where), model, params, scalars=False)
+    fast = ORJSONResponse(projection.dicts(page.items))
+    page.apply_headers(fast)
+    return fast
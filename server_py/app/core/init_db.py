@@ -1,7 +1,11 @@
-from sqlalchemy import inspect, text
+import hashlib
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, delete, inspect, insert, select, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine
 from app.core.config import settings
-from app.core.database import Base
+from app.core.database import Base, async_database_url
+from app.models.user import User
 
 # Импортируем модели чтобы они попали в metadata перед созданием таблиц
 from app.models import user  # noqa: F401
@@ -11,23 +15,91 @@ from app.models import chat_message  # noqa: F401
 from app.models import tariff  # noqa: F401
 from app.models import app_settings  # noqa: F401
 
+# Отпечаток схемы, с которой база последний раз проверялась; вне Base.metadata,
+# чтобы не попадать ни в create_all моделей, ни в сам отпечаток
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+
+def schema_fingerprint() -> str:
+    """Хеш таблиц, колонок и индексов моделей плюс список файлов миграций."""
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(table.name.encode())
+        for column in table.columns:
+            digest.update(f"|{column.name}:{column.type!r}:{column.nullable}".encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(f"|ix:{index.name}".encode())
+    for migration in sorted((settings.BASE_DIR / "migrations" / "versions").glob("*.py")):
+        digest.update(f"|m:{migration.name}".encode())
+    return digest.hexdigest()
+
+
+def _stored_fingerprint(sync_conn):
+    if not inspect(sync_conn).has_table(schema_version.name):
+        return None
+    return sync_conn.execute(select(schema_version.c.fingerprint)).scalar()
+
+
+def _store_fingerprint(sync_conn, fingerprint: str) -> None:
+    schema_version.create(sync_conn, checkfirst=True)
+    sync_conn.execute(delete(schema_version))
+    sync_conn.execute(insert(schema_version).values(id=1, fingerprint=fingerprint, updated_at=datetime.utcnow()))
+
+
 async def init_db():
     """Инициализация базы данных и создание таблиц"""
-    # Гарантируем наличие директории для файла базы данных
-    settings.DATA_DIR.mkdir(parents=True, exist_ok=True)
+    url = async_database_url(settings.DATABASE_URL)
+    if make_url(url).get_backend_name() == "sqlite":
+        # Гарантируем наличие директории для файла базы данных
+        settings.DATA_DIR.mkdir(parents=True, exist_ok=True)
     # Создаем временный движок для инициализации
-    engine = create_async_engine(settings.DATABASE_URL)
-    
+    engine = create_async_engine(url)
+    fingerprint = schema_fingerprint()
+
+    if settings.FAST_STARTUP:
+        async with engine.connect() as conn:
+            stored = await conn.run_sync(_stored_fingerprint)
+        if stored == fingerprint:
+            # Схема не менялась с прошлого запуска
+            await engine.dispose()
+            return
+
     def ensure_user_display_name_column(sync_conn):
         inspector = inspect(sync_conn)
         columns = {col["name"] for col in inspector.get_columns("users")}
         if "display_name" not in columns:
-            sync_conn.execute(text("ALTER TABLE users ADD COLUMN display_name VARCHAR"))
+            # DDL собираем под текущий диалект, а не строкой для SQLite
+            preparer = sync_conn.dialect.identifier_preparer
+            column = User.__table__.c.display_name
+            sync_conn.execute(text(
+                f"ALTER TABLE {preparer.format_table(User.__table__)} "
+                f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=sync_conn.dialect)}"
+            ))
+
+    def run_migrations(sync_conn):
+        # Alembic импортируется только когда схему действительно надо проверять
+        from alembic import command
+        from alembic.config import Config
+
+        # Индексы и прочие изменения схемы уже существующих баз
+        config = Config(str(settings.BASE_DIR / "alembic.ini"))
+        config.set_main_option("script_location", str(settings.BASE_DIR / "migrations"))
+        config.attributes["connection"] = sync_conn
+        config.attributes["configure_logger"] = False
+        command.upgrade(config, "head")
 
     async with engine.begin() as conn:
         # Создаем все таблицы
         await conn.run_sync(Base.metadata.create_all)
         await conn.run_sync(ensure_user_display_name_column)
+        await conn.run_sync(run_migrations)
+        await conn.run_sync(_store_fingerprint, fingerprint)
     
     # Закрываем движок
-    await engine.dispose()
\ No newline at end of file
+    await engine.dispose()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+def import_string(target: str) -> Any:
+    """'package.module:attr' → объект."""
+    module_name, _, attr = target.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attr) if attr else module
+
+
+class LazySubsystem:
+    """Подсистема с фоновыми ресурсами, которая поднимается при первом обращении.
+
+    startup/shutdown задаются строками, чтобы модули подсистемы не
+    импортировались, пока она не нужна.
+    """
+
+    def __init__(self, name: str, startup: str, shutdown: str) -> None:
+        self.name = name
+        self._startup = startup
+        self._shutdown = shutdown
+        self._lock = asyncio.Lock()
+        self.started = False
+
+    async def ensure_started(self) -> None:
+        if self.started:
+            return
+        async with self._lock:
+            if self.started:
+                return
+            loop = asyncio.get_running_loop()
+            began = loop.time()
+            startup: Callable[[], Awaitable[None]] = import_string(self._startup)
+            await startup()
+            self.started = True
+            logger.info("Subsystem %s started in %.0f ms", self.name, (loop.time() - began) * 1000)
+
+    async def shutdown(self) -> None:
+        if not self.started:
+            return
+        shutdown: Callable[[], Awaitable[None]] = import_string(self._shutdown)
+        await shutdown()
+        self.started = False
+
+
+class LazyApp:
+    """ASGI-приложение (обычно APIRouter), импортируемое при первом запросе."""
+
+    def __init__(self, target: str, subsystem: Optional[LazySubsystem] = None) -> None:
+        self.target = target
+        self.subsystem = subsystem
+        self._app: Optional[ASGIApp] = None
+
+    def resolve(self) -> Any:
+        """Только импорт, без запуска подсистемы (нужно для OpenAPI)."""
+        if self._app is None:
+            self._app = import_string(self.target)
+        return self._app
+
+    async def load(self) -> ASGIApp:
+        app = self.resolve()
+        if self.subsystem is not None:
+            await self.subsystem.ensure_started()
+        return app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self._app is None or (self.subsystem is not None and not self.subsystem.started):
+            await self.load()
+        await self._app(scope, receive, send)
+
+
+class PathAliasMiddleware:
+    """Старые пути без префикса API (/orders → /api/v1/orders).
+
+    Переписывает путь до маршрутизации вместо второй копии роутера: таблица
+    маршрутов и схема OpenAPI остаются в одном экземпляре.
+    """
+
+    def __init__(self, app: ASGIApp, prefix: str, segments: "set[str]") -> None:
+        self.app = app
+        self.prefix = prefix
+        self.segments = frozenset(segments)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket"):
+            path: str = scope["path"]
+            if path.split("/", 2)[1] in self.segments:
+                scope = dict(scope)
+                scope["path"] = self.prefix + path
+                scope["raw_path"] = self.prefix.encode() + (scope.get("raw_path") or path.encode())
+        await self.app(scope, receive, send)
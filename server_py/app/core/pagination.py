@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+
+
+class Cursor:
+    """Позиция в списке: ключ (created_at, id) и направление чтения от него."""
+
+    __slots__ = ("created_at", "id", "backward")
+
+    def __init__(self, created_at: datetime, id: int, backward: bool = False) -> None:
+        self.created_at = created_at
+        self.id = id
+        self.backward = backward
+
+    def encode(self) -> str:
+        raw = json.dumps([self.created_at.isoformat(), self.id, int(self.backward)], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        try:
+            padded = value + "=" * (-len(value) % 4)
+            created_at, id_, backward = json.loads(base64.urlsafe_b64decode(padded))
+            return cls(datetime.fromisoformat(created_at), int(id_), bool(backward))
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Некорректный курсор",
+            )
+
+
+class PageParams:
+    """Параметры страницы из запроса: ?limit=...&cursor=..."""
+
+    def __init__(self, limit: int, cursor: Optional[str]) -> None:
+        self.limit = limit
+        self.cursor = Cursor.decode(cursor) if cursor else None
+
+
+def page_params(
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor / X-Prev-Cursor"),
+) -> PageParams:
+    return PageParams(limit, cursor)
+
+
+def chat_page_params(
+    limit: int = Query(settings.CHAT_PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Prev-Cursor / X-Next-Cursor"),
+) -> PageParams:
+    return PageParams(limit, cursor)
+
+
+class Page(Generic[T]):
+    def __init__(self, items: List[T], next_cursor: Optional[str], prev_cursor: Optional[str]) -> None:
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def apply_headers(self, response: Response) -> List[T]:
+        """Курсоры уходят в заголовки, тело остаётся обычным списком."""
+        if self.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = self.next_cursor
+        if self.prev_cursor:
+            response.headers[PREV_CURSOR_HEADER] = self.prev_cursor
+        return self.items
+
+
+def keyset_query(
+    stmt: Select,
+    model: Any,
+    params: PageParams,
+    *,
+    descending: bool = True,
+    from_end: bool = False,
+) -> Tuple[Select, bool]:
+    """Добавляет к запросу условие и порядок keyset-пагинации по (created_at, id).
+
+    Возвращает запрос (с limit + 1, чтобы узнать, есть ли ещё страница) и
+    признак чтения назад.
+    """
+    cursor = params.cursor
+    backward = cursor.backward if cursor is not None else from_end
+    # Порядок чтения из индекса: при движении назад читаем в обратную сторону
+    scan_desc = descending != backward
+
+    key = tuple_(model.created_at, model.id)
+    if cursor is not None:
+        bound = tuple_(literal(cursor.created_at), literal(cursor.id))
+        stmt = stmt.where(key < bound if scan_desc else key > bound)
+    if scan_desc:
+        stmt = stmt.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        stmt = stmt.order_by(model.created_at.asc(), model.id.asc())
+    return stmt.limit(params.limit + 1), backward
+
+
+async def fetch_page(
+    db: AsyncSession,
+    stmt: Select,
+    model: Any,
+    params: PageParams,
+    *,
+    descending: bool = True,
+    from_end: bool = False,
+    scalars: bool = True,
+) -> Page:
+    """Страница списка.
+
+    descending — порядок выдачи (новые сверху). from_end — без курсора
+    отдавать последнюю страницу, а не первую (чат: сначала свежие сообщения,
+    X-Prev-Cursor ведёт к более старым). scalars=False — запрос выбирает
+    колонки, а не сущность, и страница состоит из строк Row.
+    """
+    stmt, backward = keyset_query(stmt, model, params, descending=descending, from_end=from_end)
+    result = await db.execute(stmt)
+    rows = list(result.scalars() if scalars else result.all())
+    has_more = len(rows) > params.limit
+    rows = rows[: params.limit]
+    if backward:
+        rows.reverse()
+    if not rows:
+        return Page(rows, None, None)
+
+    cursor = params.cursor
+    first, last = rows[0], rows[-1]
+    has_next = has_more if not backward else cursor is not None
+    has_prev = cursor is not None if not backward else has_more
+    return Page(
+        rows,
+        Cursor(last.created_at, last.id).encode() if has_next else None,
+        Cursor(first.created_at, first.id, backward=True).encode() if has_prev else None,
+    )
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Message = Dict[str, Any]
+Handler = Callable[[Message], Awaitable[None]]
+Deliver = Callable[[str, Message], Awaitable[None]]
+
+
+class PubSubBackend(ABC):
+    """Доставка событий остальным воркерам. Свой воркер получает их напрямую."""
+
+    name = "base"
+
+    @abstractmethod
+    async def start(self, deliver: Deliver) -> None:
+        ...
+
+    @abstractmethod
+    async def publish(self, channel: str, message: Message) -> None:
+        ...
+
+    @abstractmethod
+    async def stop(self) -> None:
+        ...
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class InProcessBackend(PubSubBackend):
+    """Воркеры внутри одного процесса (тесты, один uvicorn без workers).
+
+    Экземпляры, созданные с общим hub, ведут себя как отдельные воркеры.
+    """
+
+    name = "inprocess"
+    default_hub: Set["InProcessBackend"] = set()
+
+    def __init__(self, hub: Optional[Set["InProcessBackend"]] = None) -> None:
+        self._hub = self.default_hub if hub is None else hub
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        self._hub.add(self)
+
+    async def publish(self, channel: str, message: Message) -> None:
+        for peer in list(self._hub):
+            if peer is not self and peer._deliver is not None:
+                await peer._deliver(channel, message)
+
+    async def stop(self) -> None:
+        self._hub.discard(self)
+        self._deliver = None
+
+
+class SQLiteBackend(PubSubBackend):
+    """Брокер для нескольких процессов на одной машине через общий файл SQLite.
+
+    Публикация — INSERT в журнал событий. Каждый воркер раз в PUBSUB_POLL_MS
+    сверяет PRAGMA data_version (меняется, только когда коммитит чужое
+    соединение) и читает новые строки лишь тогда, когда она сдвинулась.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._last_id = 0
+        self._data_version: Optional[int] = None
+        self.published = 0
+        self.received = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pubsub_events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, "
+                "payload TEXT NOT NULL, origin TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _open(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            # История до старта воркера не нужна — только новые события
+            self._last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM pubsub_events").fetchone()[0]
+            self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _insert(self, channel: str, payload: str) -> None:
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO pubsub_events (channel, payload, origin, created) VALUES (?, ?, ?, ?)",
+                (channel, payload, self._origin, time.time()),
+            )
+
+    def _fetch(self) -> List[Tuple[int, str, str, str]]:
+        with self._lock:
+            conn = self._connect()
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return []
+            self._data_version = version
+            return conn.execute(
+                "SELECT id, channel, payload, origin FROM pubsub_events WHERE id > ? ORDER BY id",
+                (self._last_id,),
+            ).fetchall()
+
+    def _prune(self) -> None:
+        with self._lock:
+            self._connect().execute(
+                "DELETE FROM pubsub_events WHERE created < ?",
+                (time.time() - settings.PUBSUB_RETENTION_SECONDS,),
+            )
+
+    async def start(self, deliver: Deliver) -> None:
+        await asyncio.to_thread(self._open)
+        self._task = asyncio.create_task(self._poll_loop(deliver))
+
+    async def publish(self, channel: str, message: Message) -> None:
+        payload = json.dumps(message, ensure_ascii=False, default=str)
+        try:
+            await asyncio.to_thread(self._insert, channel, payload)
+        except sqlite3.Error:
+            logger.exception("Failed to publish %s event", channel)
+            return
+        self.published += 1
+
+    async def _poll_loop(self, deliver: Deliver) -> None:
+        interval = settings.PUBSUB_POLL_MS / 1000
+        prune_every = max(int(settings.PUBSUB_RETENTION_SECONDS / interval), 1)
+        polls = 0
+        while True:
+            await asyncio.sleep(interval)
+            polls += 1
+            try:
+                rows = await asyncio.to_thread(self._fetch)
+                if polls % prune_every == 0:
+                    await asyncio.to_thread(self._prune)
+            except sqlite3.Error:
+                logger.exception("Pub/sub poll failed")
+                continue
+            for event_id, channel, payload, origin in rows:
+                self._last_id = event_id
+                if origin == self._origin:
+                    continue
+                self.received += 1
+                await deliver(channel, json.loads(payload))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"backend": self.name, "origin": self._origin, "published": self.published, "received": self.received}
+
+
+def create_backend() -> PubSubBackend:
+    backend = settings.PUBSUB_BACKEND
+    if backend == "auto":
+        backend = "sqlite" if settings.SERVER_WORKERS > 1 else "inprocess"
+    if backend == "sqlite":
+        return SQLiteBackend(settings.PUBSUB_DB_PATH)
+    if backend == "inprocess":
+        if settings.SERVER_WORKERS > 1:
+            logger.warning("PUBSUB_BACKEND=inprocess with %s workers: chat events stay inside one worker", settings.SERVER_WORKERS)
+        return InProcessBackend()
+    raise ValueError(f"Unknown PUBSUB_BACKEND: {settings.PUBSUB_BACKEND}")
+
+
+class PubSub:
+    """Каналы событий между воркерами.
+
+    publish сразу вызывает подписчиков своего процесса (сокеты этого воркера)
+    и передаёт событие бэкенду для остальных; подписчики других воркеров
+    получают его из бэкенда и шлют в свои сокеты.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: Dict[str, List[Handler]] = {}
+        self.backend: Optional[PubSubBackend] = None
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def publish(self, channel: str, message: Message) -> None:
+        await self._dispatch(channel, message)
+        if self.backend is not None:
+            await self.backend.publish(channel, message)
+
+    async def _dispatch(self, channel: str, message: Message) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                await handler(message)
+            except Exception:  # noqa: BLE001
+                logger.exception("Pub/sub handler for %s failed", channel)
+
+    async def startup(self, backend: Optional[PubSubBackend] = None) -> None:
+        if self.backend is not None:
+            return
+        backend = backend or create_backend()
+        await backend.start(self._dispatch)
+        self.backend = backend
+
+    async def shutdown(self) -> None:
+        if self.backend is not None:
+            await self.backend.stop()
+            self.backend = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self.backend.snapshot() if self.backend is not None else {"backend": None}
+
+
+pubsub = PubSub()
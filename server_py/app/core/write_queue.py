@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+WriteOp = Callable[[AsyncSession], Awaitable[Any]]
+
+# Маркер остановки: писатель дописывает всё, что стоит перед ним, и выходит
+_STOP: Any = object()
+
+
+class WriteQueue:
+    """Единственный писатель в БД с групповым коммитом.
+
+    Запросы ставят операции записи в очередь; фоновая задача собирает всё,
+    что накопилось за короткое окно, выполняет одной транзакцией и только
+    после успешного COMMIT отдаёт каждому вызывающему его результат
+    (объекты уже с присвоенными id). Каждая операция идёт в своей точке
+    сохранения: доменная ошибка (например HTTPException 404) откатывает и
+    получает только её вызывающий. Если падает сама транзакция (ошибка БД),
+    операции повторяются по одной, чтобы ошибка досталась только виновнику.
+    """
+
+    def __init__(self) -> None:
+        self._queue: "asyncio.Queue[Tuple[WriteOp, asyncio.Future]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.batches = 0
+        self.writes = 0
+        self.retried = 0
+        self.max_batch = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def run(self, op: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """Выполняет op(session) в общей транзакции; возвращает результат после COMMIT."""
+        if not settings.DB_WRITE_QUEUE_ENABLED or not self.running:
+            # Без фоновой задачи (скрипты, init_db) — обычная транзакция на вызов
+            return await self._run_single(op)
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, future))
+        return await future
+
+    async def add(self, instance: T) -> T:
+        """Вставляет ORM-объект и возвращает его с присвоенным id."""
+
+        async def op(session: AsyncSession) -> T:
+            session.add(instance)
+            await session.flush()
+            return instance
+
+        return await self.run(op)
+
+    async def _run_single(self, op: WriteOp) -> Any:
+        async with AsyncSessionLocal() as session:
+            try:
+                result = await op(session)
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+            return result
+
+    async def _collect(self) -> List[Tuple[WriteOp, asyncio.Future]]:
+        batch: List[Tuple[WriteOp, asyncio.Future]] = []
+        item = await self._queue.get()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.DB_WRITE_BATCH_WINDOW_MS / 1000
+        while item is not _STOP:
+            batch.append(item)
+            if len(batch) >= settings.DB_WRITE_BATCH_MAX:
+                return batch
+            try:
+                item = self._queue.get_nowait()
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                return batch
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                return batch
+        self._stopping = True
+        return batch
+
+    async def _commit_batch(self, batch: List[Tuple[WriteOp, asyncio.Future]]) -> None:
+        # Вызывающий мог уйти (отмена запроса) — его операцию не выполняем
+        batch = [(op, future) for op, future in batch if not future.done()]
+        if not batch:
+            return
+        outcomes: List[Tuple[bool, Any]] = []
+        try:
+            async with AsyncSessionLocal() as session:
+                try:
+                    for op, _ in batch:
+                        outcomes.append(await self._apply(session, op))
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+        except Exception as e:  # noqa: BLE001
+            if len(batch) == 1:
+                future = batch[0][1]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            # Пачка откатилась целиком: повторяем по одной, чтобы не потерять чужие записи
+            self.retried += len(batch)
+            for op, future in batch:
+                await self._commit_one(op, future)
+            return
+
+        self.batches += 1
+        self.writes += sum(1 for ok, _ in outcomes if ok)
+        self.max_batch = max(self.max_batch, len(batch))
+        for (_, future), (ok, value) in zip(batch, outcomes):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    @staticmethod
+    async def _apply(session: AsyncSession, op: WriteOp) -> Tuple[bool, Any]:
+        """Операция в точке сохранения: (True, результат) или (False, доменная ошибка).
+
+        Ошибки БД пробрасываются и откатывают всю пачку.
+        """
+        try:
+            async with session.begin_nested():
+                return True, await op(session)
+        except SQLAlchemyError:
+            raise
+        except Exception as e:  # noqa: BLE001
+            return False, e
+
+    async def _commit_one(self, op: WriteOp, future: asyncio.Future) -> None:
+        try:
+            result = await self._run_single(op)
+        except Exception as e:  # noqa: BLE001
+            if not future.done():
+                future.set_exception(e)
+            return
+        self.writes += 1
+        if not future.done():
+            future.set_result(result)
+
+    async def _worker(self) -> None:
+        while not self._stopping:
+            batch = await self._collect()
+            try:
+                await self._commit_batch(batch)
+            except Exception as e:  # noqa: BLE001
+                logger.exception("Group commit failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def startup(self) -> None:
+        if settings.DB_WRITE_QUEUE_ENABLED and not self.running:
+            self._stopping = False
+            self._task = asyncio.create_task(self._worker())
+
+    async def shutdown(self) -> None:
+        if self._task is None:
+            return
+        # Всё, что уже принято в очередь, будет записано до остановки
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "pending": self._queue.qsize(),
+            "batches": self.batches,
+            "writes": self.writes,
+            "retried": self.retried,
+            "maxBatch": self.max_batch,
+        }
+
+
+write_queue = WriteQueue()
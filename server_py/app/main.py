@@ -1,13 +1,87 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.openapi.utils import get_openapi
 from app.core.config import settings
-from app.api.v1.api import api_router
+from app.core.database import dispose_engines
+from app.core.lazy import LazyApp, LazySubsystem, PathAliasMiddleware
+from app.core.pubsub import pubsub
+from app.core.write_queue import write_queue
+from app.api.v1.api import GEOCODING_PREFIX, GEOCODING_ROUTER, api_router
 from app.websockets.chat_ws import router as chat_ws_router
 
+# Геокодинг (httpx, кеш, справочник, квоты) импортируется и запускается
+# при первом запросе к /geocode или /ws/suggest, а не при старте процесса
+geocoding = LazySubsystem(
+    "geocoding",
+    startup="app.services.geocoding.lifecycle:startup",
+    shutdown="app.services.geocoding.lifecycle:shutdown",
+)
+geocoding_api = LazyApp(GEOCODING_ROUTER, subsystem=geocoding)
+suggest_ws = LazyApp("app.websockets.suggest_ws:router", subsystem=geocoding)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not settings.FAST_STARTUP:
+        await geocoding_api.load()
+        await suggest_ws.load()
+    await write_queue.startup()
+    await pubsub.startup()
+    try:
+        yield
+    finally:
+        await pubsub.shutdown()
+        await write_queue.shutdown()
+        await geocoding.shutdown()
+        await dispose_engines()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
+)
+
+# Подключаем роутеры API v1
+app.include_router(api_router, prefix=settings.API_V1_STR)
+app.mount(settings.API_V1_STR + GEOCODING_PREFIX, geocoding_api)
+
+# Вебсокеты для чата поддержки
+app.include_router(chat_ws_router)
+
+# Вебсокет подсказок адресов при наборе
+app.add_websocket_route("/ws/suggest", suggest_ws)
+
+
+def openapi():
+    # Схема строится по первому запросу /openapi.json: ленивые роутеры
+    # импортируются здесь, но их подсистема не запускается
+    if app.openapi_schema is None:
+        lazy = APIRouter()
+        lazy.include_router(
+            geocoding_api.resolve(),
+            prefix=settings.API_V1_STR + GEOCODING_PREFIX,
+            tags=["geocoding"],
+        )
+        app.openapi_schema = get_openapi(
+            title=app.title,
+            version=app.version,
+            routes=[*app.routes, *lazy.routes],
+        )
+    return app.openapi_schema
+
+
+app.openapi = openapi
+
+# Пути без префикса для обратной совместимости (/orders, /geocode/...):
+# переписываются в /api/v1/... до маршрутизации
+app.add_middleware(
+    PathAliasMiddleware,
+    prefix=settings.API_V1_STR,
+    segments={route.path.split("/", 2)[1] for route in api_router.routes} | {GEOCODING_PREFIX.strip("/")},
 )
 
 # Настройка CORS
@@ -18,13 +92,6 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Курсоры пагинации отдаются в заголовках
+        expose_headers=["X-Next-Cursor", "X-Prev-Cursor"],
     )
-
-# Подключаем роутеры API v1
-app.include_router(api_router, prefix=settings.API_V1_STR)
-
-# Подключаем роутеры БЕЗ префикса для обратной совместимости
-app.include_router(api_router, prefix="")
-
-# Вебсокеты для чата поддержки
-app.include_router(chat_ws_router)
\ No newline at end of file
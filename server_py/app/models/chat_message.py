@@ -3,10 +3,11 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, JSON
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
+from app.models.types import JSONVariant
 
 
 class ChatMessage(Base):
@@ -17,6 +18,16 @@ class ChatMessage(Base):
     sender = Column(String(16), nullable=False)  # 'user' | 'admin'
     text = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
-    meta = Column(JSON, nullable=True)
+    meta = Column(JSONVariant, nullable=True)
+    # Номер сообщения внутри диалога: 1, 2, 3... Клиент передаёт последний
+    # полученный при переподключении и получает только пропущенные
+    seq = Column(Integer, nullable=True)
 
     user = relationship("User", back_populates="chat_messages")
+
+    __table_args__ = (
+        # История чата пользователя в порядке (created_at, id) без сортировки
+        Index("ix_chat_messages_user_id_created_at_id", user_id, created_at, id),
+        # Уникальность защищает от двух одинаковых номеров при гонке воркеров
+        Index("ux_chat_messages_user_id_seq", user_id, seq, unique=True),
+    )
@@ -1,7 +1,8 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.types import JSONVariant
 
 class Order(Base):
     __tablename__ = "orders"
@@ -15,8 +16,8 @@ class Order(Base):
     to_address = Column(String, nullable=True)
     
     # Координаты
-    start_coords = Column(JSON, nullable=True)  # {"latitude": ..., "longitude": ...}
-    dest_coords = Column(JSON, nullable=True)
+    start_coords = Column(JSONVariant, nullable=True)  # {"latitude": ..., "longitude": ...}
+    dest_coords = Column(JSONVariant, nullable=True)
     
     # Маршрут и стоимость
     distance = Column(Float, nullable=True)  # метры
@@ -35,11 +36,18 @@ class Order(Base):
     # Временные метки
     started_at = Column(DateTime, nullable=True)
     arrived_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Дополнительные данные
-    meta = Column(JSON, nullable=True)
+    meta = Column(JSONVariant, nullable=True)
     
     # Relationships
     user = relationship("User", back_populates="orders")
+
+    __table_args__ = (
+        # Заказы пользователя, новые сверху; id — ключ keyset-пагинации (get_user_orders)
+        Index("ix_orders_user_id_created_at_id", user_id, created_at.desc(), id.desc()),
+        # Общая лента заказов (get_orders)
+        Index("ix_orders_created_at_id", created_at.desc(), id.desc()),
+    )
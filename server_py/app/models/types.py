@@ -0,0 +1,6 @@
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
+
+# JSON-колонки: в PostgreSQL хранятся как JSONB (индексируемые, без повторного
+# разбора текста), в SQLite — как обычный JSON
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
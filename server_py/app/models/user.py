@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -15,7 +15,7 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
     display_name = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
@@ -24,4 +24,17 @@ class User(Base):
         "ChatMessage",
         back_populates="user",
         cascade="all, delete-orphan",
+    )
+
+    __table_args__ = (
+        # Список пользователей, новые сверху (list_users)
+        Index("ix_users_created_at_id", created_at.desc(), id.desc()),
+        # Частичный индекс: водителей мало, индекс крошечный (get_drivers)
+        Index(
+            "ix_users_drivers_created_at_id",
+            created_at.desc(),
+            id.desc(),
+            sqlite_where=role == "driver",
+            postgresql_where=role == "driver",
+        ),
     )
\ No newline at end of file
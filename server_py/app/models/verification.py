@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from app.core.database import Base
 
 class VerificationCode(Base):
@@ -10,4 +10,16 @@ class VerificationCode(Base):
     code = Column(String, nullable=False)
     expires_at = Column(DateTime, nullable=False)
     is_used = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Поиск действующего кода: только неиспользованные коды попадают в индекс
+        Index(
+            "ix_verification_codes_active",
+            phone,
+            code,
+            expires_at,
+            sqlite_where=is_used == False,  # noqa: E712
+            postgresql_where=is_used == False,  # noqa: E712
+        ),
+    )
\ No newline at end of file
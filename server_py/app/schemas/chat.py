@@ -19,6 +19,7 @@ class ChatMessageResponse(BaseModel):
     text: str
     created_at: datetime = Field(alias="createdAt")
     meta: Optional[Dict[str, Any]] = None
+    seq: Optional[int] = None
 
     model_config = {
         "from_attributes": True,
@@ -0,0 +1,16 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class BatchForwardRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1)
+
+
+class BatchPoint(BaseModel):
+    lat: float = Field(..., ge=-90.0, le=90.0)
+    lon: float = Field(..., ge=-180.0, le=180.0)
+
+
+class BatchReverseRequest(BaseModel):
+    points: List[BatchPoint] = Field(..., min_length=1)
@@ -2,6 +2,13 @@ from datetime import datetime
 from pydantic import BaseModel, EmailStr, computed_field
 from typing import Optional
 
+def preferred_name(*values: Optional[str]) -> Optional[str]:
+    """Первое непустое из имён: display_name, first_name, last_name, phone."""
+    for value in values:
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return None
+
 # Общая схема для пользователя
 class UserBase(BaseModel):
     phone: str
@@ -34,10 +41,7 @@ class User(UserBase):
 
     @computed_field(return_type=Optional[str])
     def name(self) -> Optional[str]:
-        for value in (self.display_name, self.first_name, self.last_name, self.phone):
-            if isinstance(value, str) and value.strip():
-                return value.strip()
-        return None
+        return preferred_name(self.display_name, self.first_name, self.last_name, self.phone)
     
     class Config:
         from_attributes = True
\ No newline at end of file
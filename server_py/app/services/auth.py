@@ -5,6 +5,7 @@ from app.models.verification import VerificationCode
 from app.models.user import User
 from app.core.security import create_access_token
 from app.core.phone import normalize_phone
+from app.core.write_queue import write_queue
 import random
 import string
 
@@ -34,8 +35,7 @@ class AuthService:
             expires_at=expires_at
         )
         
-        self.db.add(verification)
-        await self.db.commit()
+        await write_queue.add(verification)
         
         # В реальном приложении здесь была бы отправка SMS
         # Пока просто выводим в консоль
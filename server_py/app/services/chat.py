@@ -1,17 +1,42 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from sqlalchemy import asc, select
+from sqlalchemy import asc, func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import Page, PageParams, fetch_page
+from app.core.write_queue import write_queue
 from app.models.chat_message import ChatMessage
 
+# Сколько раз пересчитывать номер, если его занял параллельный писатель
+SEQ_ATTEMPTS = 5
+
+
+def _next_seq(user_id: int):
+    """Следующий номер диалога, вычисляемый в самом INSERT."""
+    return (
+        select(func.coalesce(func.max(ChatMessage.seq), 0) + 1)
+        .where(ChatMessage.user_id == user_id)
+        .scalar_subquery()
+    )
+
+
+def _is_seq_conflict(error: IntegrityError) -> bool:
+    # PostgreSQL называет индекс, SQLite — колонки
+    detail = str(error.orig)
+    return "ux_chat_messages_user_id_seq" in detail or "chat_messages.seq" in detail
+
 
 class ChatService:
-    """Управление сообщениями чата в БД."""
+    """Управление сообщениями чата в БД.
 
-    def __init__(self, db: AsyncSession) -> None:
+    Сессия нужна только для чтения: create_message пишет через групповой
+    коммит писателя, поэтому для отправки сервис создаётся без сессии.
+    """
+
+    def __init__(self, db: Optional[AsyncSession] = None) -> None:
         self.db = db
 
     async def create_message(
@@ -21,20 +46,35 @@ class ChatService:
         sender: str,
         text: str,
         meta: Optional[dict] = None,
-        auto_commit: bool = True,
     ) -> ChatMessage:
+        # Запись идёт через общий групповой коммит; сообщение возвращается уже сохранённым
         message = ChatMessage(
             user_id=user_id,
             sender=sender,
             text=text,
             meta=meta,
         )
-        self.db.add(message)
-        await self.db.flush()
-        await self.db.refresh(message)
-        if auto_commit:
-            await self.db.commit()
-        return message
+
+        async def op(session: AsyncSession) -> ChatMessage:
+            # Другой воркер (или соединение PostgreSQL) может занять тот же номер
+            # между подзапросом и вставкой: уникальный индекс отклоняет дубль,
+            # номер пересчитывается в новой точке сохранения
+            attempt = 1
+            while True:
+                message.seq = _next_seq(user_id)
+                try:
+                    async with session.begin_nested():
+                        session.add(message)
+                        await session.flush()
+                except IntegrityError as e:
+                    if attempt >= SEQ_ATTEMPTS or not _is_seq_conflict(e):
+                        raise
+                    attempt += 1
+                    continue
+                await session.refresh(message, ["seq"])
+                return message
+
+        return await write_queue.run(op)
 
     async def list_messages(
         self,
@@ -52,6 +92,47 @@ class ChatService:
         result = await self.db.execute(stmt)
         return list(result.scalars())
 
+    async def page_messages(self, *, user_id: int, params: PageParams) -> Page:
+        """Страница истории: без курсора — самые свежие сообщения, по возрастанию времени."""
+        stmt = select(ChatMessage).where(ChatMessage.user_id == user_id)
+        return await fetch_page(self.db, stmt, ChatMessage, params, descending=False, from_end=True)
+
+    async def messages_after(self, *, user_id: int, seq: int, limit: int) -> List[ChatMessage]:
+        """Сообщения диалога с номером больше seq, по возрастанию (догон после переподключения)."""
+        stmt = (
+            select(ChatMessage)
+            .where(ChatMessage.user_id == user_id, ChatMessage.seq > seq)
+            .order_by(asc(ChatMessage.seq))
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars())
+
+    async def inbox(self) -> Tuple[List[ChatMessage], Dict[int, int]]:
+        """Последнее сообщение каждого диалога и число сообщений пользователя
+        после последнего ответа админа (отметок о прочтении в схеме нет)."""
+        last_ids = select(func.max(ChatMessage.id)).group_by(ChatMessage.user_id)
+        result = await self.db.execute(select(ChatMessage).where(ChatMessage.id.in_(last_ids)))
+        last = list(result.scalars())
+
+        answered = (
+            select(ChatMessage.user_id, func.max(ChatMessage.id).label("last_admin_id"))
+            .where(ChatMessage.sender == "admin")
+            .group_by(ChatMessage.user_id)
+            .subquery()
+        )
+        stmt = (
+            select(ChatMessage.user_id, func.count())
+            .outerjoin(answered, answered.c.user_id == ChatMessage.user_id)
+            .where(
+                ChatMessage.sender == "user",
+                ChatMessage.id > func.coalesce(answered.c.last_admin_id, 0),
+            )
+            .group_by(ChatMessage.user_id)
+        )
+        unread = {user_id: count for user_id, count in (await self.db.execute(stmt)).all()}
+        return last, unread
+
 
 def serialize_message(message: ChatMessage) -> dict:
     """Преобразует модель SQLAlchemy в JSON-совместимый словарь."""
@@ -62,4 +143,5 @@ def serialize_message(message: ChatMessage) -> dict:
         "text": message.text,
         "createdAt": message.created_at.isoformat(),
         "meta": message.meta,
+        "seq": message.seq,
     }
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Hashable, Iterable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+BatchItem = Tuple[K, Optional[dict], Optional[str]]  # ключ, результат, ошибка
+
+
+async def iter_batch(
+    keys: Iterable[K],
+    cached: Callable[[K], Awaitable[Optional[dict]]],
+    fetch: Callable[[K], Awaitable[Optional[dict]]],
+    concurrency: int,
+) -> AsyncIterator[BatchItem]:
+    """Отдаёт результаты по мере готовности: сначала из кеша, затем от провайдера.
+
+    Запросы к провайдеру выполняются не более чем по `concurrency` одновременно.
+    Если потребитель прекратил чтение (клиент отключился), оставшиеся задачи
+    отменяются.
+    """
+    misses = []
+    for key in keys:
+        hit = await cached(key)
+        if hit is not None:
+            yield key, hit, None
+        else:
+            misses.append(key)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(key: K) -> BatchItem:
+        async with semaphore:
+            try:
+                return key, await fetch(key), None
+            except Exception as e:  # noqa: BLE001
+                return key, None, str(e)
+
+    tasks = [asyncio.create_task(run(key)) for key in misses]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Приводит запрос к каноничному виду для ключа кеша."""
+    text = (query or "").lower().replace("ё", "е")
+    text = "".join(ch if ch.isalnum() else " " for ch in text)
+    return " ".join(text.split())
+
+
+def suggest_key(query: str, limit: int) -> str:
+    return f"suggest:{limit}:{normalize_query(query)}"
+
+
+def forward_key(query: str) -> str:
+    return f"forward:{normalize_query(query)}"
+
+
+def reverse_key(lat: float, lon: float) -> str:
+    precision = settings.GEO_CACHE_REVERSE_PRECISION
+    return f"reverse:{lat:.{precision}f},{lon:.{precision}f}"
+
+
+class CacheStats:
+    def __init__(self) -> None:
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "memoryHits": self.memory_hits,
+            "diskHits": self.disk_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class MemoryCache:
+    """LRU-кеш с TTL на каждую запись (первый уровень)."""
+
+    def __init__(self, max_entries: int, stats: CacheStats) -> None:
+        self._max_entries = max_entries
+        self._stats = stats
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._data[key]
+            self._stats.expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+            self._stats.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class SQLiteCache:
+    """Персистентный второй уровень кеша в отдельном SQLite-файле."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value, expires_at FROM geocache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at <= time.time():
+            return None
+        return expires_at, json.loads(value)
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO geocache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at),
+            )
+            conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute("DELETE FROM geocache WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+            return cursor.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM geocache").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class GeoCache:
+    """Двухуровневый кеш ответов геокодеров: LRU в памяти + SQLite на диске."""
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+        self.memory = MemoryCache(settings.GEO_CACHE_MEMORY_SIZE, self.stats)
+        self.disk = SQLiteCache(settings.GEO_CACHE_DB_PATH)
+
+    async def get(self, key: str) -> Optional[Any]:
+        if not settings.GEO_CACHE_ENABLED:
+            return None
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.memory_hits += 1
+            return value
+        try:
+            entry = await asyncio.to_thread(self.disk.get, key)
+        except sqlite3.Error:
+            logger.exception("Geocoding cache read failed")
+            entry = None
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires_at, value = entry
+        self.memory.set(key, value, expires_at)
+        self.stats.disk_hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if not settings.GEO_CACHE_ENABLED:
+            return
+        expires_at = time.time() + ttl
+        self.memory.set(key, value, expires_at)
+        self.stats.writes += 1
+        try:
+            await asyncio.to_thread(self.disk.set, key, value, expires_at)
+        except sqlite3.Error:
+            logger.exception("Geocoding cache write failed")
+
+    async def startup(self) -> None:
+        if not settings.GEO_CACHE_ENABLED:
+            return
+        try:
+            removed = await asyncio.to_thread(self.disk.purge_expired)
+        except sqlite3.Error:
+            logger.exception("Geocoding cache purge failed")
+            return
+        if removed:
+            logger.info("Geocoding cache: purged %s expired entries", removed)
+
+    async def shutdown(self) -> None:
+        await asyncio.to_thread(self.disk.close)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats.as_dict(),
+            "memoryEntries": len(self.memory),
+            "memoryCapacity": settings.GEO_CACHE_MEMORY_SIZE,
+        }
+
+
+geo_cache = GeoCache()
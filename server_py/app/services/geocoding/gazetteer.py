@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import gzip
+import json
+import logging
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from app.core.config import settings
+from app.services.geocoding.cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Вес типа объекта при выдаче: населённые пункты выше улиц, улицы выше POI
+KIND_WEIGHTS: Dict[str, int] = {
+    "city": 5,
+    "town": 5,
+    "village": 5,
+    "street": 3,
+    "poi": 1,
+}
+
+KIND_TITLES: Dict[str, str] = {
+    "city": "Город",
+    "town": "Посёлок",
+    "village": "Село",
+    "street": "Улица",
+    "poi": "Объект",
+}
+
+_CYR_TO_LAT: Dict[str, str] = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+    "н": "n", "ң": "ng", "о": "o", "ө": "o", "п": "p", "р": "r", "с": "s",
+    "т": "t", "у": "u", "ү": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch",
+    "ш": "sh", "щ": "sh", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya",
+}
+
+# Сводим разные латинские написания к одному виду: Chuy/Chui, Jibek/Zhibek
+_LATIN_FOLDS: Tuple[Tuple[str, str], ...] = (
+    ("zh", "j"),
+    ("kh", "h"),
+    ("ts", "c"),
+    ("w", "v"),
+    ("y", "i"),
+)
+
+
+def transliterate(text: str) -> str:
+    """Кириллица (включая кыргызские ң, ө, ү) → латиница."""
+    return "".join(_CYR_TO_LAT.get(ch, ch) for ch in text)
+
+
+def search_key(text: str) -> str:
+    """Ключ поиска: нормализованная латиница с унификацией написаний."""
+    key = transliterate(normalize_query(text))
+    for src, dst in _LATIN_FOLDS:
+        key = key.replace(src, dst)
+    return key
+
+
+def _index_keys(name: str) -> List[str]:
+    """Ключи для имени целиком и с начала каждого слова («проспект Чуй» → «чуй»)."""
+    words = search_key(name).split(" ")
+    return [" ".join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+Record = Tuple[str, str, str, float, float]  # kind, name, city, lat, lon
+
+
+def _read_csv(path: Path) -> Iterator[Record]:
+    with path.open(encoding="utf-8", newline="") as fh:
+        for row in csv.DictReader(fh):
+            yield (
+                (row.get("kind") or "poi").strip(),
+                (row.get("name") or "").strip(),
+                (row.get("city") or "").strip(),
+                float(row["lat"]),
+                float(row["lon"]),
+            )
+
+
+def _read_geojson(path: Path) -> Iterator[Record]:
+    with path.open(encoding="utf-8") as fh:
+        data = json.load(fh)
+    for feature in data.get("features", []):
+        props = feature.get("properties") or {}
+        geometry = feature.get("geometry") or {}
+        coords = geometry.get("coordinates") or []
+        if geometry.get("type") != "Point" or len(coords) < 2:
+            continue
+        # Поддерживаем как собственное поле kind, так и теги OSM (place/highway)
+        kind = props.get("kind")
+        if not kind:
+            place = props.get("place")
+            if place in ("city", "town", "village"):
+                kind = place
+            elif place in ("hamlet", "locality"):
+                kind = "village"
+            elif props.get("highway"):
+                kind = "street"
+            else:
+                kind = "poi"
+        yield (
+            kind,
+            (props.get("name:ru") or props.get("name") or "").strip(),
+            (props.get("city") or props.get("addr:city") or "").strip(),
+            float(coords[1]),
+            float(coords[0]),
+        )
+
+
+def read_dump(path: Path) -> Iterator[Record]:
+    if path.suffix.lower() == ".csv":
+        return _read_csv(path)
+    return _read_geojson(path)
+
+
+def build_index(records: Iterable[Record], target: Path) -> int:
+    """Строит компактный индекс (отсортированный массив ключей) и пишет его на диск."""
+    unique: Dict[Tuple[str, str, str], Record] = {}
+    for kind, name, city, lat, lon in records:
+        if not name or kind not in KIND_WEIGHTS:
+            continue
+        if not (39.0 <= lat <= 43.5 and 69.0 <= lon <= 81.0):
+            continue
+        # Улица в OSM разбита на много сегментов — оставляем одну точку на город
+        unique.setdefault((kind, name.lower(), city.lower()), (kind, name, city, round(lat, 6), round(lon, 6)))
+
+    rows = list(unique.values())
+    entries = sorted(
+        (key, ref, 0 if word == 0 else 1)
+        for ref, (_, name, _, _, _) in enumerate(rows)
+        for word, key in enumerate(_index_keys(name))
+    )
+    payload = {
+        "version": INDEX_VERSION,
+        "records": rows,
+        "keys": [key for key, _, _ in entries],
+        "refs": [ref for _, ref, _ in entries],
+        # 0 — ключ совпадает с началом имени, 1 — с началом одного из слов
+        "partial": [partial for _, _, partial in entries],
+    }
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(target, "wt", encoding="utf-8") as fh:
+        json.dump(payload, fh, ensure_ascii=False, separators=(",", ":"))
+    return len(rows)
+
+
+class Gazetteer:
+    """Локальный справочник населённых пунктов, улиц и POI Кыргызстана."""
+
+    def __init__(self) -> None:
+        self._records: List[Record] = []
+        self._keys: List[str] = []
+        self._refs: List[int] = []
+        self._partial: List[int] = []
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def load(self, path: Path) -> None:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            payload = json.load(fh)
+        if payload.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported gazetteer index version: {payload.get('version')}")
+        self._records = [tuple(row) for row in payload["records"]]
+        self._keys = payload["keys"]
+        self._refs = payload["refs"]
+        self._partial = payload["partial"]
+        self.loaded = True
+
+    async def startup(self) -> None:
+        path = settings.GAZETTEER_PATH
+        if not path.exists():
+            logger.info("Gazetteer index not found at %s, local suggest disabled", path)
+            return
+        try:
+            await asyncio.to_thread(self.load, path)
+        except (OSError, ValueError, KeyError):
+            logger.exception("Failed to load gazetteer index %s", path)
+            return
+        logger.info("Gazetteer loaded: %s records", len(self._records))
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        prefix = search_key(query)
+        if not self.loaded or not prefix:
+            return []
+
+        # Отсортированный массив: все ключи с нужным префиксом идут подряд
+        candidates: Dict[int, int] = {}
+        pos = bisect_left(self._keys, prefix)
+        scan_limit = max(limit * 8, 32)
+        while pos < len(self._keys) and len(candidates) < scan_limit:
+            if not self._keys[pos].startswith(prefix):
+                break
+            ref = self._refs[pos]
+            candidates[ref] = min(candidates.get(ref, 1), self._partial[pos])
+            pos += 1
+
+        ranked = sorted(
+            candidates.items(),
+            key=lambda item: (
+                -KIND_WEIGHTS[self._records[item[0]][0]],
+                item[1],
+                len(self._records[item[0]][1]),
+            ),
+        )
+        results: List[Dict[str, Any]] = []
+        seen = set()
+        for ref, _ in ranked:
+            kind, name, city, lat, lon = self._records[ref]
+            title = f"с. {name}" if kind == "village" else name
+            dedup_key = " ".join(title.lower().split())
+            if dedup_key in seen:
+                continue
+            seen.add(dedup_key)
+            subtitle_parts = [city] if city and city not in title else []
+            subtitle_parts.append(KIND_TITLES[kind])
+            results.append({
+                "title": title,
+                "subtitle": ", ".join(subtitle_parts),
+                "latitude": lat,
+                "longitude": lon,
+                "address": title,
+            })
+            if len(results) >= limit:
+                break
+
+        if results:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return results
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "records": len(self._records),
+            "keys": len(self._keys),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+gazetteer = Gazetteer()
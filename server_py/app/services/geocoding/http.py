@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Базовые адреса провайдеров: на каждый хост держим свой пул соединений
+PROVIDER_BASE_URLS: Dict[str, str] = {
+    "2gis": "https://catalog.api.2gis.com",
+    "geoapify": "https://api.geoapify.com",
+}
+
+
+def _http2_available() -> bool:
+    if not settings.GEO_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ProviderClients:
+    """Общие httpx-клиенты геокодеров с keep-alive пулом на каждый хост.
+
+    Клиенты создаются при старте приложения и закрываются при остановке,
+    поэтому подсказки при наборе адреса не платят за TCP+TLS рукопожатие
+    на каждое нажатие клавиши.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _build(self, provider: str) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.GEO_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GEO_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.GEO_HTTP_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(
+            settings.GEO_HTTP_TIMEOUT,
+            connect=settings.GEO_HTTP_CONNECT_TIMEOUT,
+        )
+        return httpx.AsyncClient(
+            base_url=PROVIDER_BASE_URLS[provider],
+            limits=limits,
+            timeout=timeout,
+            http2=_http2_available(),
+        )
+
+    async def startup(self) -> None:
+        for provider in PROVIDER_BASE_URLS:
+            if provider not in self._clients:
+                self._clients[provider] = self._build(provider)
+        logger.info(
+            "Geocoding HTTP clients started (http2=%s)", _http2_available()
+        )
+
+    async def shutdown(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        """Возвращает клиент провайдера; создаёт его, если startup не вызывался."""
+        client: Optional[httpx.AsyncClient] = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._build(provider)
+            self._clients[provider] = client
+        return client
+
+
+provider_clients = ProviderClients()
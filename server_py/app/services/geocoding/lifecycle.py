@@ -0,0 +1,19 @@
+"""Запуск и остановка ресурсов геокодинга: пулы HTTP-клиентов, кеш, справочник, квоты."""
+
+from app.services.geocoding.cache import geo_cache
+from app.services.geocoding.gazetteer import gazetteer
+from app.services.geocoding.http import provider_clients
+from app.services.geocoding.quota import quota_budgeter
+
+
+async def startup() -> None:
+    await provider_clients.startup()
+    await geo_cache.startup()
+    await gazetteer.startup()
+    await quota_budgeter.startup()
+
+
+async def shutdown() -> None:
+    await quota_budgeter.shutdown()
+    await geo_cache.shutdown()
+    await provider_clients.shutdown()
@@ -0,0 +1,754 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.geocoding.http import provider_clients
+from app.services.geocoding.quota import quota_budgeter
+from app.services.geocoding.ranking import coords_key, from_2gis, from_geoapify, rank_candidates
+
+logger = logging.getLogger(__name__)
+
+DGIS_API_KEY = settings.DGIS_API_KEY
+GEOAPIFY_API_KEY = settings.GEOAPIFY_API_KEY
+
+
+def is_in_kg(lat: float, lon: float) -> bool:
+    """Простая проверка, что координаты лежат в пределах Кыргызстана."""
+    return 39.0 <= lat <= 43.5 and 69.0 <= lon <= 81.0
+
+
+class NoProviderAvailable(Exception):
+    """Все провайдеры операции выключены (нет ключа) или в разомкнутом breaker'е."""
+
+
+class ProviderHealth:
+    """Задержки, ошибки и состояние circuit breaker одного провайдера."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.latencies: Deque[float] = deque(maxlen=settings.GEO_PROVIDER_LATENCY_WINDOW)
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.state = "closed"  # closed | open | half_open
+        self.opened_at = 0.0
+        # В half_open к провайдеру идёт ровно один пробный запрос
+        self.probe_in_flight = False
+
+    def available(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.probe_in_flight:
+            return False
+        # Разомкнутый breaker пропускает пробный запрос после паузы
+        return self.state == "half_open" or time.monotonic() - self.opened_at >= settings.GEO_CB_RESET_SECONDS
+
+    def acquire(self) -> bool:
+        """Разрешение на запрос; после паузы первый вызывающий забирает пробу."""
+        if self.state == "closed":
+            return True
+        if not self.available():
+            return False
+        self.state = "half_open"
+        self.probe_in_flight = True
+        return True
+
+    def release(self) -> None:
+        """Запрос отменён до ответа: пробу сможет сделать следующий вызывающий."""
+        self.probe_in_flight = False
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.state = "closed"
+        self.probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if self.state == "half_open" or self.consecutive_failures >= settings.GEO_CB_FAILURE_THRESHOLD:
+            if self.state != "open":
+                logger.warning(
+                    "Geocoding provider %s circuit opened after %s failures", self.name, self.consecutive_failures
+                )
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            "state": self.state,
+            "probeInFlight": self.probe_in_flight,
+            "successes": self.successes,
+            "failures": self.failures,
+            "p50Ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95Ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+class Provider(ABC):
+    """Базовый класс провайдера геокодирования."""
+
+    name = ""
+
+    def __init__(self) -> None:
+        self.health = ProviderHealth(self.name)
+        self.quota = quota_budgeter.get(self.name)
+
+    @property
+    def configured(self) -> bool:
+        return True
+
+    def client(self) -> httpx.AsyncClient:
+        return provider_clients.get(self.name)
+
+    async def spend_followup(self, op: str) -> bool:
+        """Списывает бюджет за дополнительный HTTP-запрос внутри одной операции.
+
+        Первый запрос оплачивает пул (try_spend в ProviderPool.call); каждый
+        следующий — сам провайдер. False, если бюджет или частота не позволяют.
+        """
+        wait = self.quota.try_spend(op)
+        if wait is None:
+            return False
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.quota.refund()
+                raise
+        return True
+
+    @abstractmethod
+    async def forward(self, trimmed: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def reverse(self, lat: float, lon: float) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def suggest(self, trimmed: str, limit: int) -> dict:
+        ...
+
+
+class DGISProvider(Provider):
+    name = "2gis"
+
+    @property
+    def configured(self) -> bool:
+        return bool(DGIS_API_KEY)
+
+    async def forward(self, trimmed: str) -> Optional[dict]:
+        """Прямое геокодирование; None, если ничего не найдено."""
+
+        # Не добавляем "Кыргызстан" автоматически — используем bbox для ограничения региона
+        narrowed = trimmed
+
+        client = self.client()
+        last_error: Optional[Exception] = None
+        try:
+            # 2GIS Items API с bbox для Кыргызстана
+            params = {
+                "q": narrowed,
+                "fields": "items.point,items.geometry.centroid,items.address_name,items.full_name,items.type",
+                "page_size": 15,
+                "key": DGIS_API_KEY,
+                "sort": "distance",
+                "locale": "ru_KG",
+            }
+            resp = await client.get("/3.0/items", params=params)
+            resp.raise_for_status()
+            data = resp.json()
+
+            for item in data.get("result", {}).get("items", []):
+                # Координаты из point или geometry.centroid
+                point = item.get("point") or item.get("geometry", {}).get("centroid", {})
+                lat = point.get("lat") or point.get("latitude")
+                lon = point.get("lon") or point.get("longitude")
+
+                if lat is not None and lon is not None and is_in_kg(float(lat), float(lon)):
+                    address_name = item.get("address_name", "").strip()
+                    full_name = item.get("full_name", "").strip()
+                    address = address_name or full_name or trimmed
+
+                    # Очистка от лишних префиксов
+                    for prefix in ["Кыргызстан, ", "Киргизия, ", "Kyrgyzstan, "]:
+                        if address.startswith(prefix):
+                            address = address[len(prefix):]
+
+                    return {
+                        "latitude": float(lat),
+                        "longitude": float(lon),
+                        "address": address,
+                    }
+        except (httpx.HTTPError, ValueError) as e:
+            last_error = e
+
+        if not await self.spend_followup("forward"):
+            if last_error is not None:
+                raise last_error
+            return None
+
+        try:
+            # 2GIS Geocoder API (запасной вариант, более точный для адресов)
+            params = {
+                "q": narrowed,
+                "key": DGIS_API_KEY,
+                "fields": "items.point,items.address_name,items.full_name",
+                "locale": "ru_KG",
+            }
+            resp = await client.get("/3.0/items/geocode", params=params)
+            resp.raise_for_status()
+            data = resp.json()
+            items = data.get("result", {}).get("items", [])
+
+            if items:
+                best = items[0]
+                point = best.get("point") or best.get("geometry", {}).get("centroid", {})
+                lat = point.get("lat") or point.get("latitude")
+                lon = point.get("lon") or point.get("longitude")
+
+                if lat and lon and is_in_kg(float(lat), float(lon)):
+                    address_name = best.get("address_name", "").strip()
+                    full_name = best.get("full_name", "").strip()
+                    address = address_name or full_name or trimmed
+
+                    for prefix in ["Кыргызстан, ", "Киргизия, ", "Kyrgyzstan, "]:
+                        if address.startswith(prefix):
+                            address = address[len(prefix):]
+
+                    return {
+                        "latitude": float(lat),
+                        "longitude": float(lon),
+                        "address": address,
+                    }
+        except (httpx.HTTPError, ValueError) as e:
+            last_error = e
+        if last_error is not None:
+            raise last_error
+        return None
+
+    async def reverse(self, lat: float, lon: float) -> Optional[dict]:
+        """Обратное геокодирование; None, если адрес не найден."""
+
+        client = self.client()
+        params = {
+            "lat": lat,
+            "lon": lon,
+            "type": "house",
+            "key": DGIS_API_KEY,
+        }
+        resp = await client.get("/3.0/items/geocode", params=params)
+        resp.raise_for_status()
+        data = resp.json()
+        items = data.get("result", {}).get("items", [])
+        if items:
+            address = items[0].get("address_name") or items[0].get("full_name")
+            if address:
+                return {"latitude": lat, "longitude": lon, "address": address.strip()}
+        return None
+
+    async def suggest(self, trimmed: str, limit: int) -> dict:
+        """Подсказки с ранжированием."""
+
+        narrowed = trimmed if any(k in trimmed.lower() for k in ["киргиз", "кыргыз", "kyrgyz", "kg"]) else f"Кыргызстан, {trimmed}"
+
+        client = self.client()
+        params = {
+            "q": narrowed,
+            "fields": "items.point,items.geometry.centroid,items.address_name,items.full_name,items.name,items.type,items.adm_div",
+            "page_size": max(limit, 15),
+            "key": DGIS_API_KEY,
+        }
+        resp = await client.get("/3.0/items", params=params)
+        resp.raise_for_status()
+        data = resp.json()
+        items = data.get("result", {}).get("items", [])
+
+        candidates = []
+        for item in items:
+            point = item.get("point") or item.get("geometry", {}).get("centroid", {})
+            lat = point.get("lat") or point.get("latitude")
+            lon = point.get("lon") or point.get("longitude")
+
+            if lat is None or lon is None:
+                continue
+
+            lat_f, lon_f = float(lat), float(lon)
+            if not is_in_kg(lat_f, lon_f):
+                continue
+
+            title = item.get("name") or item.get("full_name") or item.get("address_name") or trimmed
+            subtitle = item.get("address_name") or item.get("full_name") or ""
+
+            candidates.append(from_2gis(item, {
+                "title": title.strip(),
+                "subtitle": subtitle.strip(),
+                "latitude": lat_f,
+                "longitude": lon_f,
+                "address": (subtitle or title).strip(),
+            }))
+
+        # Ранжирование и дедупликация по координатам
+        return {"results": rank_candidates(candidates, trimmed, limit, key=coords_key)}
+
+
+class GeoapifyProvider(Provider):
+    name = "geoapify"
+
+    @property
+    def configured(self) -> bool:
+        return bool(GEOAPIFY_API_KEY)
+
+    async def forward(self, trimmed: str) -> Optional[dict]:
+        """Прямое геокодирование; None, если ничего не найдено."""
+
+        client = self.client()
+        params = {
+            "text": trimmed,
+            "apiKey": GEOAPIFY_API_KEY,
+            "lang": "ru",
+            "limit": 5,
+            "filter": "rect:69.0,39.0,81.0,43.5",  # Кыргызстан bbox
+            "bias": "proximity:74.590682,42.874772",  # Центр Бишкека
+        }
+        resp = await client.get("/v1/geocode/search", params=params)
+        resp.raise_for_status()
+        data = resp.json()
+
+        for feature in data.get("features", []):
+            props = feature.get("properties", {})
+            coords = feature.get("geometry", {}).get("coordinates", [])
+            if len(coords) < 2 or not is_in_kg(coords[1], coords[0]):
+                continue
+            address = props.get("address_line1") or props.get("formatted") or trimmed
+            address = address.replace("Kyrgyzstan, ", "").replace("Кыргызстан, ", "")
+            return {
+                "latitude": float(coords[1]),
+                "longitude": float(coords[0]),
+                "address": address,
+            }
+        return None
+
+    async def reverse(self, lat: float, lon: float) -> Optional[dict]:
+        """Обратное геокодирование; None, если адрес не найден."""
+
+        client = self.client()
+        # Geoapify Reverse Geocoding API
+        # Пробуем несколько типов для получения лучшего результата
+        params = {
+            "lat": lat,
+            "lon": lon,
+            "apiKey": GEOAPIFY_API_KEY,
+            "lang": "ru",
+            "type": "street,amenity,building",  # Приоритет улицам и зданиям
+        }
+        resp = await client.get("/v1/geocode/reverse", params=params)
+        resp.raise_for_status()
+        data = resp.json()
+
+        features = data.get("features", [])
+
+        if features:
+            # Ищем лучший результат (не county/district)
+            best_feature = None
+            for feature in features:
+                props = feature.get("properties", {})
+                result_type = props.get("result_type", "")
+
+                # Пропускаем county и state если есть что-то лучше
+                if result_type in ["county", "state", "country"]:
+                    if not best_feature:
+                        best_feature = feature  # Сохраним как fallback
+                    continue
+
+                # Нашли хороший результат
+                best_feature = feature
+                break
+
+            if not best_feature:
+                best_feature = features[0]
+
+            props = best_feature.get("properties", {})
+
+            # Получаем компоненты адреса
+            street = props.get("street", "")
+            housenumber = props.get("housenumber", "")
+            suburb = props.get("suburb", "")
+            village = props.get("village", "")
+            city = props.get("city", "")
+            district = props.get("district", "")
+            county = props.get("county", "")
+            formatted = props.get("formatted", "")
+            address_line1 = props.get("address_line1", "")
+            address_line2 = props.get("address_line2", "")
+            result_type = props.get("result_type", "")
+            name = props.get("name", "")
+
+            logger.debug(
+                "Geoapify reverse: type=%s street=%s house=%s village=%s city=%s suburb=%s county=%s name=%s",
+                result_type, street, housenumber, village, city, suburb, county, name,
+            )
+
+            # Собираем адрес с приоритетами
+            address_parts = []
+
+            # Если это село
+            if village:
+                address_parts.append(f"с. {village}")
+                if housenumber:
+                    address_parts.append(housenumber)
+            # Если это город с улицей
+            elif street:
+                if housenumber:
+                    address_parts.append(f"{street}, {housenumber}")
+                else:
+                    address_parts.append(street)
+            # Если это POI с названием
+            elif name and result_type in ["amenity", "building"]:
+                address_parts.append(name)
+            # Если это город/пригород
+            elif suburb and city:
+                address_parts.append(f"{city}, {suburb}")
+            elif city:
+                address_parts.append(city)
+            # Если только район - показываем с ближайшим городом
+            elif county:
+                # Ищем город из всех результатов
+                city_name = None
+                for feat in features:
+                    p = feat.get("properties", {})
+                    if p.get("city"):
+                        city_name = p.get("city")
+                        break
+
+                if city_name:
+                    address_parts.append(f"{city_name}, {county}")
+                else:
+                    # Fallback - просто район, но с пометкой
+                    address_parts.append(f"~{county}")  # ~ означает приблизительно
+            elif address_line1:
+                # Убираем "Kyrgyzstan"
+                clean = address_line1.replace("Kyrgyzstan, ", "").replace("Кыргызстан, ", "")
+                address_parts.append(clean)
+            elif formatted:
+                # Убираем "Kyrgyzstan" из formatted
+                clean = formatted.replace("Kyrgyzstan, ", "").replace("Кыргызстан, ", "")
+                address_parts.append(clean)
+
+            if address_parts:
+                final_address = ", ".join(address_parts)
+                logger.debug("Geoapify reverse address: %r", final_address)
+                return {"latitude": lat, "longitude": lon, "address": final_address}
+
+        return None
+
+    async def suggest(self, trimmed: str, limit: int) -> dict:
+        """Подсказки с ранжированием."""
+
+        # Добавляем контекст Кыргызстана если нужно
+        search_query = trimmed
+        if "бишкек" not in search_query.lower() and "ош" not in search_query.lower() and "кыргызстан" not in search_query.lower():
+            search_query = f"{trimmed}, Кыргызстан"
+
+        client = self.client()
+        # Geoapify Autocomplete API
+        # https://apidocs.geoapify.com/docs/geocoding/address-autocomplete/
+        params = {
+            "text": search_query,
+            "apiKey": GEOAPIFY_API_KEY,
+            "lang": "ru",
+            "limit": limit,
+            "filter": "rect:69.0,39.0,81.0,43.5",  # Кыргызстан bbox
+            "bias": "proximity:74.590682,42.874772",  # Центр Бишкека
+        }
+
+        resp = await client.get("/v1/geocode/autocomplete", params=params)
+        resp.raise_for_status()
+        data = resp.json()
+
+        features = data.get("features", [])
+
+        logger.debug("Geoapify suggest: %s features for %r", len(features), trimmed)
+
+        # Формируем результаты
+        candidates = []
+
+        for feature in features[:limit]:
+            props = feature.get("properties", {})
+            geom = feature.get("geometry", {})
+            coords = geom.get("coordinates", [])
+
+            if len(coords) < 2:
+                continue
+
+            lon, lat = coords[0], coords[1]
+
+            if not is_in_kg(lat, lon):
+                continue
+
+            # Получаем название и адрес
+            formatted = props.get("formatted", "")
+            name = props.get("name", "")
+            street = props.get("street", "")
+            housenumber = props.get("housenumber", "")
+            city = props.get("city", "")
+            village = props.get("village", "")
+            suburb = props.get("suburb", "")
+            result_type = props.get("result_type", "")
+            address_line1 = props.get("address_line1", "")
+
+            logger.debug(
+                "Geoapify suggest feature: type=%s street=%s house=%s village=%s city=%s name=%s",
+                result_type, street, housenumber, village, city, name,
+            )
+
+            # Формируем title (главный текст) - без районов!
+            if village:
+                # Село
+                title = f"с. {village}"
+                if housenumber:
+                    title += f", {housenumber}"
+            elif housenumber and street:
+                # Улица с номером дома
+                title = f"{street}, {housenumber}"
+            elif street:
+                # Просто улица
+                title = street
+            elif name and result_type in ["amenity", "building"]:
+                # POI или здание
+                title = name
+            elif city and not suburb:
+                # Город (но не район!)
+                title = city
+            elif address_line1:
+                # Используем address_line1, но убираем районы
+                clean = address_line1.replace("Kyrgyzstan, ", "").replace("Кыргызстан, ", "")
+                # Пропускаем если это только "Сокулукский район" или подобное
+                if "район" in clean.lower() and "," not in clean:
+                    continue
+                title = clean
+            elif formatted:
+                # Последний fallback
+                clean = formatted.replace("Kyrgyzstan, ", "").replace("Кыргызстан, ", "")
+                # Пропускаем если это только район
+                if "район" in clean.lower() and "," not in clean:
+                    continue
+                title = clean
+            else:
+                continue
+
+            # Формируем subtitle (тип/город)
+            subtitle_parts = []
+            if city and city not in title:
+                subtitle_parts.append(city)
+            if result_type:
+                type_ru = {
+                    "amenity": "Объект",
+                    "building": "Здание",
+                    "street": "Улица",
+                    "suburb": "Район",
+                    "city": "Город",
+                    "postcode": "Почтовый индекс",
+                    "village": "Село",
+                }.get(result_type, result_type)
+                subtitle_parts.append(type_ru)
+
+            subtitle = ", ".join(subtitle_parts) if subtitle_parts else None
+
+            # Формируем финальный адрес для использования
+            if village:
+                final_address = f"с. {village}"
+                if housenumber:
+                    final_address += f", {housenumber}"
+            elif street:
+                final_address = street
+                if housenumber:
+                    final_address += f", {housenumber}"
+            elif name:
+                final_address = name
+            else:
+                final_address = title
+
+            candidates.append(from_geoapify(props, {
+                "title": title,
+                "subtitle": subtitle,
+                "latitude": lat,
+                "longitude": lon,
+                "address": final_address,
+            }))
+
+        # Ранжирование и дедупликация по заголовку
+        return {"results": rank_candidates(candidates, trimmed, limit)}
+
+
+_MISSING = object()
+
+
+def _has_result(op: str, result: Any) -> bool:
+    if op == "suggest":
+        return bool(result and result.get("results"))
+    return result is not None
+
+
+class ProviderPool:
+    """Вызывает провайдеров по очереди с учётом здоровья и хеджированием.
+
+    Первый провайдер из GEO_PROVIDER_ORDER, у которого есть ключ и не разомкнут
+    breaker, получает запрос сразу. Если он не ответил за p95 своей задержки,
+    параллельно запускается следующий, и побеждает первый непустой ответ.
+    Ошибка или пустой ответ сразу передают запрос следующему провайдеру.
+    """
+
+    def __init__(self, providers: List[Provider]) -> None:
+        self.providers: Dict[str, Provider] = {p.name: p for p in providers}
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    @property
+    def configured(self) -> bool:
+        return any(p.configured for p in self.providers.values())
+
+    def candidates(self, op: str) -> List[Provider]:
+        order = settings.GEO_PROVIDER_ORDER.get(op) or list(self.providers)
+        result = []
+        for name in order:
+            provider = self.providers.get(name)
+            if provider is not None and provider.configured and provider.health.available():
+                result.append(provider)
+        return result
+
+    def hedge_delay(self, provider: Provider) -> float:
+        p95 = None
+        if len(provider.health.latencies) >= settings.GEO_HEDGE_MIN_SAMPLES:
+            p95 = provider.health.percentile(0.95)
+        delay = p95 if p95 is not None else settings.GEO_HEDGE_DEFAULT_DELAY_MS / 1000
+        return min(
+            max(delay, settings.GEO_HEDGE_MIN_DELAY_MS / 1000),
+            settings.GEO_HEDGE_MAX_DELAY_MS / 1000,
+        )
+
+    async def _invoke(self, provider: Provider, op: str, args: tuple, wait: float = 0.0, probe: bool = False) -> Any:
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Запрос так и не ушёл к провайдеру — возвращаем его в бюджет
+                provider.quota.refund()
+                if probe:
+                    provider.health.release()
+                raise
+        started = time.monotonic()
+        try:
+            result = await getattr(provider, op)(*args)
+        except asyncio.CancelledError:
+            if probe:
+                provider.health.release()
+            raise
+        except Exception:
+            provider.health.record_failure()
+            raise
+        provider.health.record_success(time.monotonic() - started)
+        return result
+
+    async def call(self, op: str, *args: Any) -> Any:
+        remaining = self.candidates(op)
+        if not remaining:
+            raise NoProviderAvailable(f"No geocoding provider available for {op}")
+
+        tasks: Dict["asyncio.Task[Any]", Provider] = {}
+        last_error: Optional[Exception] = None
+        empty: Any = _MISSING
+
+        def launch() -> Optional[Provider]:
+            # Провайдер без остатка бюджета или превысивший частоту пропускается
+            while remaining:
+                provider = remaining.pop(0)
+                # Пробу half_open мог забрать другой запрос, пока этот ждал
+                if not provider.health.acquire():
+                    continue
+                probe = provider.health.probe_in_flight
+                wait = provider.quota.try_spend(op)
+                if wait is not None:
+                    tasks[asyncio.create_task(self._invoke(provider, op, args, wait, probe))] = provider
+                    return provider
+                if probe:
+                    provider.health.release()
+            return None
+
+        primary = latest = launch()
+        if primary is None:
+            raise NoProviderAvailable(f"No geocoding provider available for {op}")
+        hedged = False
+        try:
+            while tasks:
+                timeout = None
+                if remaining and settings.GEO_HEDGE_ENABLED:
+                    timeout = self.hedge_delay(latest)
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Текущий провайдер медленнее своего p95 — хеджируем
+                    hedge = launch()
+                    if hedge is not None:
+                        self.hedged += 1
+                        hedged, latest = True, hedge
+                    continue
+                for task in done:
+                    provider = tasks.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:  # noqa: BLE001
+                        logger.warning("Geocoding provider %s failed on %s: %s", provider.name, op, e)
+                        last_error = e
+                        continue
+                    if _has_result(op, result):
+                        if hedged and provider is not primary:
+                            self.hedge_wins += 1
+                        return result
+                    empty = result
+                if not tasks and remaining:
+                    latest = launch() or latest
+                    if tasks:
+                        self.failovers += 1
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if empty is not _MISSING:
+            return empty
+        if last_error is not None:
+            raise last_error
+        raise NoProviderAvailable(f"No geocoding provider available for {op}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "hedged": self.hedged,
+            "hedgeWins": self.hedge_wins,
+            "failovers": self.failovers,
+            "providers": {
+                name: {**p.health.snapshot(), "configured": p.configured}
+                for name, p in self.providers.items()
+            },
+        }
+
+
+provider_pool = ProviderPool([DGISProvider(), GeoapifyProvider()])
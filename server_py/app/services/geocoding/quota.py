@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Операции, которым разрешено тратить резерв дневного лимита. Подсказки
+# идут на каждое нажатие клавиши, поэтому при малом остатке их обслуживают
+# кеш и локальный справочник.
+RESERVE_OPS = ("forward", "reverse")
+
+
+def _today() -> str:
+    # Лимиты провайдеров сбрасываются по UTC
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class TokenBucket:
+    """Ограничение частоты запросов: rate токенов в секунду, запас — burst."""
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """Резервирует токен; возвращает, сколько подождать, или None, если ждать дольше max_wait."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # Токены могут уйти в минус: так очередь ожидающих честно делит частоту
+        wait = max(0.0, (1 - self.tokens) / self.rate)
+        if wait > max_wait:
+            return None
+        self.tokens -= 1
+        return wait
+
+    def refund(self) -> None:
+        """Возвращает зарезервированный, но не использованный токен."""
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + 1)
+
+
+class ProviderQuota:
+    """Дневной бюджет и rate limit одного провайдера."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.daily_limit = settings.GEO_QUOTA_DAILY_LIMITS.get(name, 0)
+        rate = settings.GEO_QUOTA_RATE_LIMITS.get(name, 0.0)
+        self.bucket = TokenBucket(rate, max(1.0, rate * settings.GEO_QUOTA_BURST_SECONDS))
+        self.day = _today()
+        self.used = 0
+        self.rate_limited = 0
+        self.budget_rejected = 0
+
+    def _roll_day(self) -> None:
+        today = _today()
+        if today != self.day:
+            self.day = today
+            self.used = 0
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if not self.daily_limit:
+            return None
+        self._roll_day()
+        return max(self.daily_limit - self.used, 0)
+
+    @property
+    def low(self) -> bool:
+        remaining = self.remaining
+        return remaining is not None and remaining <= self.daily_limit * settings.GEO_QUOTA_RESERVE_RATIO
+
+    def try_spend(self, op: str) -> Optional[float]:
+        """Списывает один запрос; возвращает задержку до отправки или None, если нельзя."""
+        if not settings.GEO_QUOTA_ENABLED:
+            return 0.0
+        remaining = self.remaining
+        if remaining is not None and (remaining == 0 or (self.low and op not in RESERVE_OPS)):
+            self.budget_rejected += 1
+            return None
+        wait = self.bucket.reserve(settings.GEO_QUOTA_MAX_WAIT_MS / 1000)
+        if wait is None:
+            self.rate_limited += 1
+            return None
+        self.used += 1
+        return wait
+
+    def refund(self) -> None:
+        """Возвращает запрос, списанный try_spend, но так и не отправленный."""
+        if not settings.GEO_QUOTA_ENABLED:
+            return
+        # После смены дня счётчик уже обнулён: в минус он не уходит
+        self._roll_day()
+        self.used = max(self.used - 1, 0)
+        self.bucket.refund()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "day": self.day,
+            "used": self.used,
+            "dailyLimit": self.daily_limit or None,
+            "remaining": self.remaining,
+            "low": self.low,
+            "ratePerSecond": self.bucket.rate or None,
+            "rateLimited": self.rate_limited,
+            "budgetRejected": self.budget_rejected,
+        }
+
+
+class QuotaStore:
+    """Счётчики за день в SQLite рядом с кешем, чтобы перезапуск не обнулял бюджет.
+
+    Воркеры пишут приращения, а не итог, поэтому несколько процессов делят
+    один дневной бюджет.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS provider_usage ("
+                "provider TEXT NOT NULL, day TEXT NOT NULL, calls INTEGER NOT NULL, "
+                "PRIMARY KEY (provider, day))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def load(self, day: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT provider, calls FROM provider_usage WHERE day = ?", (day,)
+            ).fetchall()
+        return dict(rows)
+
+    def add(self, deltas: Dict[str, int], day: str) -> Dict[str, int]:
+        """Прибавляет свои вызовы к общим счётчикам и возвращает итог за день по всем воркерам."""
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT INTO provider_usage (provider, day, calls) VALUES (?, ?, ?) "
+                "ON CONFLICT (provider, day) DO UPDATE SET calls = calls + excluded.calls",
+                [(provider, day, calls) for provider, calls in deltas.items()],
+            )
+            conn.execute("DELETE FROM provider_usage WHERE day < ?", (day,))
+            conn.commit()
+            rows = conn.execute(
+                "SELECT provider, calls FROM provider_usage WHERE day = ?", (day,)
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class QuotaBudgeter:
+    """Бюджеты всех провайдеров и периодическое сохранение счётчиков."""
+
+    def __init__(self) -> None:
+        self.quotas: Dict[str, ProviderQuota] = {}
+        self.store = QuotaStore(settings.GEO_CACHE_DB_PATH)
+        self._flush_task: Optional[asyncio.Task] = None
+        # Итог по всем воркерам на момент последней синхронизации
+        self._synced: Dict[str, int] = {}
+        self._synced_day = _today()
+
+    def get(self, provider: str) -> ProviderQuota:
+        quota = self.quotas.get(provider)
+        if quota is None:
+            quota = self.quotas[provider] = ProviderQuota(provider)
+        return quota
+
+    def _usage(self) -> Dict[str, int]:
+        day = _today()
+        return {name: q.used for name, q in self.quotas.items() if q.day == day}
+
+    async def flush(self) -> None:
+        day = _today()
+        if day != self._synced_day:
+            self._synced, self._synced_day = {}, day
+        deltas = {
+            name: used - self._synced.get(name, 0)
+            for name, used in self._usage().items()
+            if used != self._synced.get(name, 0)
+        }
+        try:
+            # Даже без своих вызовов: заодно подтягиваем расход других воркеров
+            totals = await asyncio.to_thread(self.store.add, deltas, day)
+        except sqlite3.Error:
+            logger.exception("Failed to persist provider usage")
+            return
+        for name, total in totals.items():
+            quota = self.get(name)
+            if quota.day != day:
+                continue
+            quota.used += total - self._synced.get(name, 0) - deltas.get(name, 0)
+            self._synced[name] = total
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.GEO_QUOTA_FLUSH_SECONDS)
+            await self.flush()
+
+    async def startup(self) -> None:
+        if not settings.GEO_QUOTA_ENABLED:
+            return
+        day = _today()
+        try:
+            usage = await asyncio.to_thread(self.store.load, day)
+        except sqlite3.Error:
+            logger.exception("Failed to load provider usage")
+            usage = {}
+        for provider, calls in usage.items():
+            quota = self.get(provider)
+            quota.day, quota.used = day, calls
+        self._synced, self._synced_day = dict(usage), day
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def shutdown(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if settings.GEO_QUOTA_ENABLED:
+            await self.flush()
+        await asyncio.to_thread(self.store.close)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: q.snapshot() for name, q in self.quotas.items()}
+
+
+quota_budgeter = QuotaBudgeter()
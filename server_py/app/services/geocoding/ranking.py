@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from app.core.config import settings
+
+# Веса признаков (как в Яндекс.Навигаторе: село > город > улица > переулок > POI).
+# Переопределяются через GEO_RANKING_WEIGHTS в настройках.
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    # Тип населённого пункта
+    "village": 1000,
+    "town": 950,
+    "city": 900,
+    # Тип объекта, если это не населённый пункт
+    "avenue": 600,
+    "boulevard": 550,
+    "street": 500,
+    "unknown": 400,
+    "lane": 300,
+    "poi": 200,
+    # Совпадение с запросом
+    "match_address": 100,
+    "match_full": 80,
+    "match_name": 60,
+    "prefix": 50,
+    # Штраф за переулок, если пользователь его не искал
+    "lane_penalty": -200,
+}
+
+# Порядок важен: первое найденное слово определяет тип улицы
+_STREET_KINDS = (
+    ("улица", "street"),
+    ("переулок", "lane"),
+    ("проспект", "avenue"),
+    ("бульвар", "boulevard"),
+)
+
+_SETTLEMENT_PREFIXES = (
+    (("с.", "с "), "village"),
+    (("г.", "г "), "city"),
+    (("п.", "пгт."), "town"),
+)
+
+
+def _lower(value: Optional[str]) -> str:
+    return (value or "").lower().replace("ё", "е")
+
+
+class Candidate:
+    """Кандидат в подсказки: готовый ответ плюс нормализованные поля для скоринга."""
+
+    __slots__ = ("result", "address_name", "full_name", "name", "kind")
+
+    def __init__(
+        self,
+        result: Dict[str, Any],
+        *,
+        address_name: str = "",
+        full_name: str = "",
+        name: str = "",
+        settlement: Optional[str] = None,
+        item_type: str = "",
+    ) -> None:
+        self.result = result
+        # Нормализуем один раз при создании, а не на каждом признаке
+        self.address_name = _lower(address_name)
+        self.full_name = _lower(full_name)
+        self.name = _lower(name)
+        self.kind = settlement or self._object_kind(_lower(item_type))
+
+    def _object_kind(self, item_type: str) -> str:
+        for word, kind in _STREET_KINDS:
+            if word in self.address_name or word in self.full_name:
+                return kind
+        if item_type in ("branch", "attraction", "amenity", "building"):
+            return "poi"
+        return "unknown"
+
+
+def settlement_from_adm_div(adm_div: Iterable[dict]) -> Optional[str]:
+    """Тип населённого пункта из adm_div 2GIS (с./г./п.)."""
+    for adm in adm_div or []:
+        if adm.get("type") == "settlement":
+            settlement_name = _lower(adm.get("name"))
+            for prefixes, kind in _SETTLEMENT_PREFIXES:
+                if settlement_name.startswith(prefixes):
+                    return kind
+            return None
+    return None
+
+
+def from_2gis(item: dict, result: Dict[str, Any]) -> Candidate:
+    return Candidate(
+        result,
+        address_name=item.get("address_name", ""),
+        full_name=item.get("full_name", ""),
+        name=item.get("name", ""),
+        settlement=settlement_from_adm_div(item.get("adm_div", [])),
+        item_type=item.get("type", ""),
+    )
+
+
+def from_geoapify(props: dict, result: Dict[str, Any]) -> Candidate:
+    result_type = props.get("result_type", "")
+    settlement = None
+    if props.get("village") or result_type == "village":
+        settlement = "village"
+    elif result_type == "city":
+        settlement = "city"
+    return Candidate(
+        result,
+        address_name=props.get("address_line1", "") or result.get("address", ""),
+        full_name=props.get("formatted", ""),
+        name=props.get("name", "") or props.get("street", ""),
+        settlement=settlement,
+        item_type=result_type,
+    )
+
+
+class RankingEngine:
+    """Считает все признаки пачкой по колонкам и сортирует кандидатов."""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None) -> None:
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+
+    def score(self, candidates: Sequence[Candidate], query: str) -> List[float]:
+        w = self.weights
+        q = _lower(query)
+        addresses = [c.address_name for c in candidates]
+        full_names = [c.full_name for c in candidates]
+        names = [c.name for c in candidates]
+
+        # Каждый признак — отдельная колонка по всей пачке
+        kind_col = [w.get(c.kind, w["unknown"]) for c in candidates]
+        in_address = [q in a for a in addresses]
+        in_full = [q in f for f in full_names]
+        in_name = [q in n for n in names]
+        match_col = [
+            w["match_address"] if a else w["match_full"] if f else w["match_name"] if n else 0.0
+            for a, f, n in zip(in_address, in_full, in_name)
+        ]
+        prefix_col = [
+            w["prefix"] if a.startswith(q) or n.startswith(q) else 0.0
+            for a, n in zip(addresses, names)
+        ]
+        lane_col = (
+            [0.0] * len(candidates)
+            if "переулок" in q
+            else [w["lane_penalty"] if "переулок" in a else 0.0 for a in addresses]
+        )
+        return [sum(row) for row in zip(kind_col, match_col, prefix_col, lane_col)]
+
+    def rank(self, candidates: Sequence[Candidate], query: str) -> List[Candidate]:
+        scores = self.score(candidates, query)
+        # sorted стабилен: при равном счёте сохраняется порядок провайдера
+        order = sorted(range(len(candidates)), key=lambda i: -scores[i])
+        return [candidates[i] for i in order]
+
+
+def title_key(result: Dict[str, Any]) -> str:
+    return " ".join(str(result.get("title", "")).lower().split())
+
+
+def coords_key(result: Dict[str, Any]) -> str:
+    return f"{result['latitude']:.5f},{result['longitude']:.5f}"
+
+
+def rank_candidates(
+    candidates: Sequence[Candidate],
+    query: str,
+    limit: int,
+    engine: Optional[RankingEngine] = None,
+    key: Callable[[Dict[str, Any]], str] = title_key,
+) -> List[Dict[str, Any]]:
+    """Ранжирует подсказки одного провайдера и убирает дубли.
+
+    Пул возвращает ответ первого успешного провайдера, поэтому кандидаты
+    разных провайдеров не смешиваются. Порядок Geoapify теперь тоже задаёт
+    скоринг (раньше отдавался как есть); при равном счёте порядок провайдера
+    сохраняется.
+    """
+    engine = engine or ranking_engine
+    results: List[Dict[str, Any]] = []
+    seen = set()
+    for candidate in engine.rank(candidates, query):
+        dedup_key = key(candidate.result)
+        if dedup_key in seen:
+            continue
+        seen.add(dedup_key)
+        results.append(candidate.result)
+        if len(results) >= limit:
+            break
+    return results
+
+
+ranking_engine = RankingEngine(settings.GEO_RANKING_WEIGHTS)
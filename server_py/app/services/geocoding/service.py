@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.geocoding.cache import forward_key, geo_cache, reverse_key, suggest_key
+from app.services.geocoding.gazetteer import gazetteer
+from app.services.geocoding.providers import NoProviderAvailable, provider_pool
+from app.services.geocoding.singleflight import inflight
+from app.services.geocoding.spatial import spatial_cache
+
+
+async def fetch_forward(trimmed: str) -> Optional[dict]:
+    """Прямое геокодирование через пул провайдеров; None, если ничего не найдено.
+
+    Ошибки провайдеров пробрасываются: пакетная выдача отличает "не найдено"
+    от "не удалось".
+    """
+    return await provider_pool.call("forward", trimmed)
+
+
+async def fetch_reverse(lat: float, lon: float) -> Optional[dict]:
+    """Обратное геокодирование через пул провайдеров; None, если адрес не найден.
+
+    Ошибки провайдеров пробрасываются, как и в fetch_forward.
+    """
+    return await provider_pool.call("reverse", lat, lon)
+
+
+async def fetch_suggestions(trimmed: str, limit: int) -> dict:
+    """Подсказки через пул провайдеров; ошибки провайдеров пробрасываются."""
+    return await provider_pool.call("suggest", trimmed, limit)
+
+
+async def _forward_uncached(key: str, trimmed: str) -> Optional[dict]:
+    result = await fetch_forward(trimmed)
+    if result is not None:
+        await geo_cache.set(key, result, settings.GEO_CACHE_FORWARD_TTL)
+    return result
+
+
+async def cached_forward(trimmed: str) -> Optional[dict]:
+    return await geo_cache.get(forward_key(trimmed))
+
+
+async def forward(trimmed: str, *, check_cache: bool = True) -> Optional[dict]:
+    key = forward_key(trimmed)
+    if check_cache:
+        cached = await geo_cache.get(key)
+        if cached is not None:
+            return cached
+    return await inflight.do(key, lambda: _forward_uncached(key, trimmed))
+
+
+async def _reverse_uncached(key: str, lat: float, lon: float) -> Optional[dict]:
+    result = await fetch_reverse(lat, lon)
+    if result is not None:
+        spatial_cache.set(lat, lon, result)
+        await geo_cache.set(key, result, settings.GEO_CACHE_REVERSE_TTL)
+    return result
+
+
+async def cached_reverse(lat: float, lon: float) -> Optional[dict]:
+    # Адрес общий для всей ячейки, координаты возвращаем запрошенные
+    snapped = spatial_cache.get(lat, lon)
+    if snapped is not None:
+        return {**snapped, "latitude": lat, "longitude": lon}
+    cached = await geo_cache.get(reverse_key(lat, lon))
+    if cached is not None:
+        spatial_cache.set(lat, lon, cached)
+        return {**cached, "latitude": lat, "longitude": lon}
+    return None
+
+
+async def reverse(lat: float, lon: float, *, check_cache: bool = True) -> Optional[dict]:
+    if check_cache:
+        cached = await cached_reverse(lat, lon)
+        if cached is not None:
+            return cached
+    key = reverse_key(lat, lon)
+    result = await inflight.do(key, lambda: _reverse_uncached(key, lat, lon))
+    if result is None:
+        return None
+    return {**result, "latitude": lat, "longitude": lon}
+
+
+async def _suggest_uncached(key: str, trimmed: str, limit: int) -> dict:
+    result = await fetch_suggestions(trimmed, limit)
+    if result.get("results"):
+        await geo_cache.set(key, result, settings.GEO_CACHE_SUGGEST_TTL)
+    return result
+
+
+async def suggest(trimmed: str, limit: int) -> dict:
+    local = []
+    if settings.GEO_SUGGEST_MODE == "local_first":
+        local = gazetteer.search(trimmed, limit)
+        if local and len(local) >= min(settings.GAZETTEER_MIN_RESULTS, limit):
+            return {"results": local}
+
+    key = suggest_key(trimmed, limit)
+    cached = await geo_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        # Одинаковые одновременные запросы ждут один общий вызов провайдера
+        return await inflight.do(key, lambda: _suggest_uncached(key, trimmed, limit))
+    except NoProviderAvailable:
+        # Бюджет провайдеров на исходе — подсказки только из локального справочника
+        return {"results": local or gazetteer.search(trimmed, limit)}
+    except httpx.HTTPError:
+        # Провайдер недоступен — отдаём то, что нашлось локально
+        if local:
+            return {"results": local}
+        raise
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self, task: "asyncio.Task[Any]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Объединяет одновременные одинаковые запросы к провайдеру.
+
+    Первый вызов с ключом запускает задачу, остальные ждут её же результат
+    (или исключение). Если все ожидающие отменены (клиенты отключились),
+    запрос к провайдеру тоже отменяется.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, _Call] = {}
+        self.started = 0
+        self.joined = 0
+        self.cancelled = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _task, key=key, call=call: self._forget(key, call))
+            self.started += 1
+        else:
+            self.joined += 1
+
+        call.waiters += 1
+        try:
+            # shield: отмена одного ожидающего не должна отменять общий запрос
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Никто больше не ждёт результата — освобождаем соединение к провайдеру
+                self._forget(key, call)
+                call.task.cancel()
+                self.cancelled += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "inFlight": len(self._calls),
+            "started": self.started,
+            "joined": self.joined,
+            "cancelled": self.cancelled,
+        }
+
+
+inflight = SingleFlight()
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from math import atan2, cos, radians, sin, sqrt
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_BASE32_INDEX = {ch: i for i, ch in enumerate(_BASE32)}
+
+
+def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Вычисляет расстояние между двумя точками в метрах по формуле haversine.
+    """
+    R = 6371000  # Радиус Земли в метрах
+
+    lat1_rad = radians(lat1)
+    lat2_rad = radians(lat2)
+    delta_lat = radians(lat2 - lat1)
+    delta_lon = radians(lon2 - lon1)
+
+    a = sin(delta_lat / 2) ** 2 + cos(lat1_rad) * cos(lat2_rad) * sin(delta_lon / 2) ** 2
+    c = 2 * atan2(sqrt(a), sqrt(1 - a))
+
+    return R * c
+
+
+def geohash_encode(lat: float, lon: float, precision: int) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars: List[str] = []
+    bit = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[value])
+            bit = 0
+            value = 0
+    return "".join(chars)
+
+
+def geohash_bounds(cell: str) -> Tuple[float, float, float, float]:
+    """Границы ячейки: (min_lat, max_lat, min_lon, max_lon)."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for ch in cell:
+        value = _BASE32_INDEX[ch]
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def geohash_neighbors(cell: str) -> List[str]:
+    """Восемь соседних ячеек той же точности."""
+    min_lat, max_lat, min_lon, max_lon = geohash_bounds(cell)
+    d_lat = max_lat - min_lat
+    d_lon = max_lon - min_lon
+    center_lat = (min_lat + max_lat) / 2
+    center_lon = (min_lon + max_lon) / 2
+    result: List[str] = []
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            if dx == 0 and dy == 0:
+                continue
+            lat = center_lat + dy * d_lat
+            if not -90.0 <= lat <= 90.0:
+                continue
+            lon = (center_lon + dx * d_lon + 180.0) % 360.0 - 180.0
+            result.append(geohash_encode(lat, lon, len(cell)))
+    return result
+
+
+class SpatialCache:
+    """Кеш обратного геокодирования по ячейкам geohash.
+
+    Точка не дальше GEO_SPATIAL_MAX_DISTANCE от уже разрешённой точки в своей
+    или соседней ячейке получает готовый адрес без обращения к провайдеру. TTL задаётся
+    на ячейку: она живёт с момента первого сохранённого в неё адреса.
+    """
+
+    def __init__(self) -> None:
+        self._cells: "OrderedDict[str, Tuple[float, List[Tuple[float, float, Any]]]]" = OrderedDict()
+        self.hits = 0
+        self.neighbor_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _live_entries(self, cell: str, now: float) -> List[Tuple[float, float, Any]]:
+        entry = self._cells.get(cell)
+        if entry is None:
+            return []
+        expires_at, points = entry
+        if expires_at <= now:
+            del self._cells[cell]
+            return []
+        return points
+
+    def get(self, lat: float, lon: float) -> Optional[Any]:
+        if not settings.GEO_SPATIAL_CACHE_ENABLED:
+            return None
+        now = time.time()
+        cell = geohash_encode(lat, lon, settings.GEO_SPATIAL_PRECISION)
+        max_distance = settings.GEO_SPATIAL_MAX_DISTANCE
+
+        best: Optional[Any] = None
+        best_distance = max_distance
+        best_is_neighbor = False
+        for candidate in [cell, *geohash_neighbors(cell)]:
+            for p_lat, p_lon, value in self._live_entries(candidate, now):
+                distance = calculate_distance(lat, lon, p_lat, p_lon)
+                # Дальше радиуса не берём даже из своей ячейки: у её краёв адрес уже другой
+                if distance > best_distance:
+                    continue
+                if best is None or distance < best_distance:
+                    best, best_distance, best_is_neighbor = value, distance, candidate != cell
+
+        if best is None:
+            self.misses += 1
+            return None
+        if best_is_neighbor:
+            self.neighbor_hits += 1
+        else:
+            self.hits += 1
+            self._cells.move_to_end(cell)
+        return best
+
+    def set(self, lat: float, lon: float, value: Any) -> None:
+        if not settings.GEO_SPATIAL_CACHE_ENABLED:
+            return
+        now = time.time()
+        cell = geohash_encode(lat, lon, settings.GEO_SPATIAL_PRECISION)
+        points = self._live_entries(cell, now)
+        if not points:
+            self._cells[cell] = (now + settings.GEO_SPATIAL_TTL, points)
+        points.append((lat, lon, value))
+        # Несколько опорных точек на ячейку повышают точность у её границ
+        del points[:-settings.GEO_SPATIAL_POINTS_PER_CELL]
+        self._cells.move_to_end(cell)
+        while len(self._cells) > settings.GEO_SPATIAL_MAX_CELLS:
+            self._cells.popitem(last=False)
+            self.evictions += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "neighborHits": self.neighbor_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "cells": len(self._cells),
+            "precision": settings.GEO_SPATIAL_PRECISION,
+        }
+
+
+spatial_cache = SpatialCache()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncReadSessionLocal
+from app.models.order import Order
+
+EXPORT_FORMATS: Dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Порядок колонок совпадает с полями OrderResponse
+EXPORT_COLUMNS: List[str] = [
+    "id",
+    "user_id",
+    "address",
+    "from_address",
+    "to_address",
+    "start_coords",
+    "dest_coords",
+    "distance",
+    "duration",
+    "cost",
+    "status",
+    "driver_name",
+    "vehicle_make",
+    "vehicle_model",
+    "plate_number",
+    "vehicle_color",
+    "notes",
+    "started_at",
+    "arrived_at",
+    "created_at",
+    "updated_at",
+    "meta",
+]
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def order_row(order: Order) -> Dict[str, Any]:
+    return {column: _value(getattr(order, column)) for column in EXPORT_COLUMNS}
+
+
+class OrderExport:
+    """Выгрузка заказов потоком: строки читаются серверным курсором пачками
+    по EXPORT_BATCH_SIZE и сразу сериализуются, поэтому память не зависит
+    от размера таблицы."""
+
+    def __init__(
+        self,
+        *,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        statuses: Optional[List[str]] = None,
+    ) -> None:
+        self.created_from = created_from
+        self.created_to = created_to
+        self.statuses = statuses
+
+    def statement(self):
+        stmt = select(Order)
+        if self.created_from is not None:
+            stmt = stmt.where(Order.created_at >= self.created_from)
+        if self.created_to is not None:
+            stmt = stmt.where(Order.created_at < self.created_to)
+        if self.statuses:
+            stmt = stmt.where(Order.status.in_(self.statuses))
+        # По индексу ix_orders_created_at_id, без сортировки в памяти
+        return stmt.order_by(Order.created_at.desc(), Order.id.desc())
+
+    async def _batches(self) -> AsyncIterator[List[Order]]:
+        # Сессия живёт столько же, сколько ответ, а не сколько обработчик
+        async with AsyncReadSessionLocal() as session:
+            stmt = self.statement().execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+            result = await session.stream_scalars(stmt)
+            # identity map держит объекты слабыми ссылками: отданные пачки освобождаются
+            async for batch in result.partitions():
+                yield batch
+
+    async def _ndjson(self) -> AsyncIterator[bytes]:
+        async for batch in self._batches():
+            yield "".join(
+                json.dumps(order_row(order), ensure_ascii=False) + "\n" for order in batch
+            ).encode()
+
+    async def _csv(self) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        # BOM, чтобы Excel открыл кириллицу без вопросов о кодировке
+        buffer.write("\ufeff")
+        writer.writeheader()
+        async for batch in self._batches():
+            for order in batch:
+                row = order_row(order)
+                for column in ("start_coords", "dest_coords", "meta"):
+                    if row[column] is not None:
+                        row[column] = json.dumps(row[column], ensure_ascii=False)
+                writer.writerow(row)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    def stream(self, fmt: str) -> AsyncIterator[bytes]:
+        return self._ndjson() if fmt == "ndjson" else self._csv()
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.user import User
+from app.core.auth_cache import invalidate_user
 from app.core.security import get_password_hash, verify_password
 from app.schemas.user import UserCreate, UserUpdate
 
@@ -44,6 +45,7 @@ class UserService:
         
         await self.db.commit()
         await self.db.refresh(user)
+        await invalidate_user(user.id)
         return user
     
     async def authenticate(self, email: str, password: str) -> User | None:
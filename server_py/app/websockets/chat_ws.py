@@ -1,111 +1,247 @@
 from __future__ import annotations
 
-import asyncio
 import logging
-from typing import Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from jose import JWTError, jwt
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 from sqlalchemy import select
 
+from app.core.auth_cache import resolve_token
 from app.core.config import settings
-from app.core.database import AsyncSessionLocal
+from app.core.database import AsyncReadSessionLocal
+from app.core.dependencies import require_admin
+from app.core.pubsub import PubSub, pubsub
 from app.models.user import User
-from app.services.auth import AuthService
 from app.services.chat import ChatService, serialize_message
+from app.websockets.history import ChatHistory
+from app.websockets.inbox import InboxSummary
+from app.websockets.outbox import Outbox, encode_frame, event_key
+from app.websockets.registry import ConnectionRegistry
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Каналы pub/sub: сообщение одному пользователю, всем админам, сообщение чата (обоим)
+CHANNEL_USER = "chat.user"
+CHANNEL_ADMIN = "chat.admin"
+CHANNEL_CHAT = "chat.message"
+
 
 class ChatConnectionManager:
-    def __init__(self) -> None:
-        self._user_connections: Dict[int, Set[WebSocket]] = {}
-        self._user_lookup: Dict[WebSocket, int] = {}
-        self._admin_connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
+    """Сокеты чата этого воркера. Отправка идёт через pub/sub, поэтому
+    сообщение доходит до сокета, в каком бы воркере он ни был открыт.
+
+    Сообщения диалога получают его пользователь и админы, подписанные на
+    диалог (или ещё не приславшие ни одной подписки); события заказов —
+    все админы.
+    """
+
+    def __init__(self, bus: PubSub) -> None:
+        self._registry = ConnectionRegistry()
+        self._inbox = InboxSummary(self._registry)
+        self._history = ChatHistory()
+        self._bus = bus
+        bus.subscribe(CHANNEL_USER, self._on_user_event)
+        bus.subscribe(CHANNEL_ADMIN, self._on_admin_event)
+        bus.subscribe(CHANNEL_CHAT, self._on_chat_event)
+
+    def _open_outbox(self, websocket: WebSocket) -> Outbox:
+        outbox = Outbox(websocket, self.unregister)
+        outbox.start()
+        return outbox
 
-    async def register_user(self, user_id: int, websocket: WebSocket) -> None:
-        async with self._lock:
-            self._user_connections.setdefault(user_id, set()).add(websocket)
-            self._user_lookup[websocket] = user_id
+    async def register_user(self, user_id: int, websocket: WebSocket, since: Optional[int] = None) -> None:
+        frames, replayed_seq = await self._replay(user_id, since) if since is not None else ([], None)
+        # Дальше без await: новое сообщение либо уже попало в повтор, либо придёт живым
+        outbox = self._open_outbox(websocket)
+        # Живые события, уже отправленные повтором (pub/sub другого воркера
+        # запаздывает относительно БД), этому сокету не дублируются
+        outbox.replayed_seq = replayed_seq
+        for frame in frames:
+            outbox.put(frame)
+        self._registry.add_user(user_id, outbox)
+
+    async def _replay(self, user_id: int, since: int) -> Tuple[List[str], Optional[int]]:
+        """Пропущенные сообщения диалога и итоговый кадр {"type": "replay"};
+        вторым значением — наибольший отправленный номер (None, если ничего)."""
+        history = self._history
+        frames = history.missed(user_id, since)
+        truncated = False
+        last_seq: Optional[int] = None
+        if frames is not None:
+            history.memory_replays += 1
+            if frames:
+                last_seq = since + len(frames)
+        else:
+            history.db_replays += 1
+            limit = settings.WS_REPLAY_LIMIT
+            async with AsyncReadSessionLocal() as session:
+                rows = await ChatService(session).messages_after(user_id=user_id, seq=since, limit=limit + 1)
+            if len(rows) > limit:
+                # Слишком много: клиент перезагрузит историю по REST
+                history.truncated += 1
+                truncated = True
+                frames = []
+            else:
+                frames = [encode_frame({"type": "message", "data": serialize_message(row)}) for row in rows]
+                if rows:
+                    last_seq = rows[-1].seq
+                # Сообщения, пришедшие пока шёл запрос
+                for seq, frame in history.after(user_id, last_seq if last_seq is not None else since):
+                    frames.append(frame)
+                    last_seq = seq
+        frames.append(encode_frame({"type": "replay", "since": since, "count": len(frames), "truncated": truncated}))
+        return frames, last_seq
 
     async def register_admin(self, websocket: WebSocket) -> None:
-        async with self._lock:
-            self._admin_connections.add(websocket)
+        self._registry.add_admin(self._open_outbox(websocket))
 
     async def unregister(self, websocket: WebSocket) -> None:
-        async with self._lock:
-            if websocket in self._admin_connections:
-                self._admin_connections.discard(websocket)
-                return
-            user_id = self._user_lookup.pop(websocket, None)
-            if user_id is None:
-                return
-            conns = self._user_connections.get(user_id)
-            if not conns:
-                return
-            conns.discard(websocket)
-            if not conns:
-                self._user_connections.pop(user_id, None)
-
-    async def _snapshot_user_connections(self, user_id: int) -> List[WebSocket]:
-        async with self._lock:
-            connections = self._user_connections.get(user_id)
-            return list(connections) if connections else []
-
-    async def _snapshot_admin_connections(self) -> List[WebSocket]:
-        async with self._lock:
-            return list(self._admin_connections)
+        # Повторный вызов (обрыв при отправке и finally эндпоинта) ничего не делает
+        outbox = self._registry.remove(websocket)
+        if outbox is not None:
+            await outbox.stop()
+
+    def _deliver_to_user(
+        self, user_id: int, frame: str, key: Optional[str] = None, seq: Optional[int] = None
+    ) -> None:
+        # Только постановка в очереди сокетов: отправляет задача каждого сокета
+        for outbox in self._registry.user(user_id):
+            if seq is not None and outbox.replayed_seq is not None and seq <= outbox.replayed_seq:
+                continue
+            outbox.put(frame, key)
+
+    def _deliver_to_admins(self, frame: str, key: Optional[str] = None) -> None:
+        for outbox in self._registry.admins():
+            outbox.put(frame, key)
+
+    def _deliver_to_watchers(self, user_id: int, frame: str, key: Optional[str] = None) -> None:
+        for outbox in self._registry.firehose():
+            outbox.put(frame, key)
+        for outbox in self._registry.watchers(user_id):
+            outbox.put(frame, key)
+
+    # Событие кодируется в JSON один раз на воркер, а не на каждый сокет
+    async def _on_user_event(self, event: dict) -> None:
+        message = event["message"]
+        self._deliver_to_user(event["userId"], encode_frame(message), event_key(message))
+
+    async def _on_admin_event(self, event: dict) -> None:
+        message = event["message"]
+        self._deliver_to_admins(encode_frame(message), event_key(message))
+
+    async def _on_chat_event(self, event: dict) -> None:
+        message = event["message"]
+        frame = encode_frame(message)
+        key = event_key(message)
+        seq = message["data"].get("seq") if message.get("type") == "message" else None
+        self._deliver_to_user(event["userId"], frame, key, seq)
+        self._deliver_to_watchers(event["userId"], frame, key)
+        if message.get("type") == "message":
+            self._history.record(event["userId"], seq, frame)
+            self._inbox.record(message["data"])
+
+    async def subscribe(self, websocket: WebSocket, user_ids: List[int], inbox: bool) -> None:
+        """Подписка админа на диалоги и сводку; первая подписка отключает firehose."""
+        outbox = self._registry.admin(websocket)
+        if outbox is None:
+            return
+        self._registry.watch(outbox, user_ids)
+        if inbox and outbox not in self._registry.inbox():
+            await self._inbox.ensure_loaded()
+            self._registry.set_inbox(outbox, True)
+            outbox.put(self._inbox.snapshot_frame())
+        self._confirm(outbox)
+
+    async def unsubscribe(self, websocket: WebSocket, user_ids: List[int], inbox: bool) -> None:
+        outbox = self._registry.admin(websocket)
+        if outbox is None:
+            return
+        self._registry.unwatch(outbox, user_ids)
+        if inbox:
+            self._registry.set_inbox(outbox, False)
+        self._confirm(outbox)
+
+    def _confirm(self, outbox: Outbox) -> None:
+        outbox.put(
+            encode_frame(
+                {
+                    "type": "subscriptions",
+                    "userIds": self._registry.watching(outbox),
+                    "inbox": outbox in self._registry.inbox(),
+                }
+            )
+        )
 
     async def send_to_user(self, user_id: int, message: dict) -> None:
-        for ws in await self._snapshot_user_connections(user_id):
-            await self._safe_send(ws, message)
+        await self._bus.publish(CHANNEL_USER, {"userId": user_id, "message": message})
 
     async def broadcast_admin(self, message: dict) -> None:
-        for ws in await self._snapshot_admin_connections():
-            await self._safe_send(ws, message)
+        await self._bus.publish(CHANNEL_ADMIN, {"message": message})
 
     async def push_message(self, user_id: int, message: dict) -> None:
-        await asyncio.gather(
-            self.send_to_user(user_id, message),
-            self.broadcast_admin(message),
-        )
+        await self._bus.publish(CHANNEL_CHAT, {"userId": user_id, "message": message})
 
-    async def _safe_send(self, websocket: WebSocket, message: dict) -> None:
-        try:
-            await websocket.send_json(message)
-        except Exception:
-            await self.unregister(websocket)
+    def snapshot(self) -> Dict[str, Any]:
+        registry = self._registry
+        outboxes = registry.outboxes()
+        deepest = sorted(outboxes, key=lambda o: o.depth, reverse=True)[:10]
+        return {
+            "users": registry.user_count,
+            "admins": registry.admin_count,
+            "firehoseAdmins": len(registry.firehose()),
+            "watchedConversations": registry.watched_count,
+            "inbox": self._inbox.stats(),
+            "replay": self._history.stats(),
+            "policy": settings.WS_OUTBOX_POLICY,
+            "queued": sum(o.depth for o in outboxes),
+            "dropped": sum(o.dropped for o in outboxes),
+            "coalesced": sum(o.coalesced for o in outboxes),
+            "deepest": [
+                {"userId": registry.user_of(o.websocket), **o.snapshot()} for o in deepest
+            ],
+        }
 
 
-chat_manager = ChatConnectionManager()
+chat_manager = ChatConnectionManager(pubsub)
+
+
+@router.get("/ws/stats", dependencies=[Depends(require_admin)])
+async def websocket_stats() -> Dict[str, Any]:
+    """Сокеты этого воркера и глубина их исходящих очередей (только для админов)."""
+    return chat_manager.snapshot()
 
 
 async def _resolve_user_from_token(token: str) -> Optional[User]:
-    if not token:
-        return None
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-    except JWTError:
-        return None
-    user_id = payload.get("sub")
-    if user_id is None:
+    return await resolve_token(token)
+
+
+def _parse_user_ids(raw: Any) -> List[int]:
+    if not isinstance(raw, list):
+        return []
+    user_ids: List[int] = []
+    for value in raw:
+        try:
+            user_ids.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    return user_ids
+
+
+def _parse_since(raw: Any) -> Optional[int]:
+    # Номер последнего полученного сообщения; без него — без догона, как раньше
+    if isinstance(raw, bool):
         return None
     try:
-        user_id_int = int(user_id)
+        since = int(raw)
     except (TypeError, ValueError):
         return None
-
-    async with AsyncSessionLocal() as session:
-        auth_service = AuthService(session)
-        user = await auth_service.get_user_by_id(user_id_int)
-        return user
+    return since if since >= 0 else None
 
 
 async def _user_exists(user_id: int) -> bool:
-    async with AsyncSessionLocal() as session:
+    async with AsyncReadSessionLocal() as session:
         result = await session.execute(select(User.id).where(User.id == user_id))
         return result.scalar_one_or_none() is not None
 
@@ -122,7 +258,7 @@ async def user_chat_websocket(websocket: WebSocket) -> None:
             await websocket.close(code=4403)
             return
         user_id = user.id
-        await chat_manager.register_user(user_id, websocket)
+        await chat_manager.register_user(user_id, websocket, since=_parse_since(init_payload.get("since")))
 
         while True:
             data = await websocket.receive_json()
@@ -133,15 +269,12 @@ async def user_chat_websocket(websocket: WebSocket) -> None:
             if not text:
                 continue
             meta = data.get("meta") if isinstance(data.get("meta"), dict) else None
-            async with AsyncSessionLocal() as session:
-                service = ChatService(session)
-                message = await service.create_message(
-                    user_id=user_id,
-                    sender="user",
-                    text=text,
-                    meta=meta,
-                    auto_commit=True,
-                )
+            message = await ChatService().create_message(
+                user_id=user_id,
+                sender="user",
+                text=text,
+                meta=meta,
+            )
             payload = {"type": "message", "data": serialize_message(message)}
             await chat_manager.push_message(user_id, payload)
     except WebSocketDisconnect:
@@ -165,6 +298,16 @@ async def admin_chat_websocket(websocket: WebSocket) -> None:
             data = await websocket.receive_json()
             if not isinstance(data, dict):
                 continue
+            # {"action": "subscribe" | "unsubscribe", "userIds": [...], "inbox": true}
+            action = data.get("action")
+            if action in ("subscribe", "unsubscribe"):
+                user_ids = _parse_user_ids(data.get("userIds"))
+                inbox = data.get("inbox") is True
+                if action == "subscribe":
+                    await chat_manager.subscribe(websocket, user_ids, inbox)
+                else:
+                    await chat_manager.unsubscribe(websocket, user_ids, inbox)
+                continue
             user_id = data.get("userId")
             text_raw = data.get("text")
             if user_id is None or text_raw is None:
@@ -179,15 +322,12 @@ async def admin_chat_websocket(websocket: WebSocket) -> None:
             if not await _user_exists(user_id_int):
                 continue
             meta = data.get("meta") if isinstance(data.get("meta"), dict) else None
-            async with AsyncSessionLocal() as session:
-                service = ChatService(session)
-                message = await service.create_message(
-                    user_id=user_id_int,
-                    sender="admin",
-                    text=text,
-                    meta=meta,
-                    auto_commit=True,
-                )
+            message = await ChatService().create_message(
+                user_id=user_id_int,
+                sender="admin",
+                text=text,
+                meta=meta,
+            )
             payload = {"type": "message", "data": serialize_message(message)}
             await chat_manager.push_message(user_id_int, payload)
     except WebSocketDisconnect:
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+Entry = Tuple[int, str]
+
+
+class ChatHistory:
+    """Последние кадры каждого диалога для догона после переподключения.
+
+    Каждый воркер получает все сообщения чата через pub/sub и держит по
+    WS_REPLAY_BUFFER_SIZE последних кадров на диалог (LRU до
+    WS_REPLAY_CONVERSATIONS диалогов). Буфер диалога появляется с первым
+    событием после старта воркера, поэтому всё, что новее его начала, в нём
+    есть; пропуск, который начинается раньше, догоняется из БД.
+    """
+
+    def __init__(self) -> None:
+        self._conversations: "OrderedDict[int, List[Entry]]" = OrderedDict()
+        self.memory_replays = 0
+        self.db_replays = 0
+        self.truncated = 0
+
+    def record(self, user_id: int, seq: Optional[int], frame: str) -> None:
+        if seq is None:
+            return
+        entries = self._conversations.get(user_id)
+        if entries is None:
+            entries = self._conversations[user_id] = []
+            while len(self._conversations) > settings.WS_REPLAY_CONVERSATIONS:
+                self._conversations.popitem(last=False)
+        else:
+            self._conversations.move_to_end(user_id)
+        if not entries or entries[-1][0] < seq:
+            entries.append((seq, frame))
+        else:
+            # События разных воркеров могут прийти не по порядку
+            index = bisect_left(entries, (seq,))
+            if index < len(entries) and entries[index][0] == seq:
+                return
+            entries.insert(index, (seq, frame))
+        if len(entries) > settings.WS_REPLAY_BUFFER_SIZE:
+            del entries[0]
+
+    def after(self, user_id: int, seq: int) -> List[Entry]:
+        entries = self._conversations.get(user_id) or []
+        return entries[bisect_left(entries, (seq + 1,)):]
+
+    def missed(self, user_id: int, since: int) -> Optional[List[str]]:
+        """Кадры с номером больше since или None, если буфер не покрывает пропуск."""
+        entries = self._conversations.get(user_id)
+        if not entries or entries[0][0] > since + 1:
+            return None
+        frames: List[str] = []
+        expected = since + 1
+        for seq, frame in self.after(user_id, since):
+            if seq != expected:
+                return None
+            frames.append(frame)
+            expected += 1
+        return frames
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "conversations": len(self._conversations),
+            "memoryReplays": self.memory_replays,
+            "dbReplays": self.db_replays,
+            "truncated": self.truncated,
+        }
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.database import AsyncReadSessionLocal
+from app.services.chat import ChatService, serialize_message
+from app.websockets.outbox import encode_frame
+from app.websockets.registry import ConnectionRegistry
+
+
+def preview(message: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": message["id"],
+        "sender": message["sender"],
+        "text": (message.get("text") or "")[: settings.WS_INBOX_PREVIEW_CHARS],
+        "createdAt": message["createdAt"],
+    }
+
+
+class InboxSummary:
+    """Сводка входящих для админов: непрочитанные и превью последнего сообщения.
+
+    Состояние собирается из БД при первой подписке и дальше ведётся по
+    событиям чата, которые получает каждый воркер. Изменённые диалоги уходят
+    подписчикам пачкой не чаще раза в WS_INBOX_INTERVAL_MS, по кадру на
+    диалог с ключом inbox:<userId> — при политике coalesce в очереди
+    медленного админа остаётся только последнее состояние диалога.
+    """
+
+    def __init__(self, registry: ConnectionRegistry) -> None:
+        self._registry = registry
+        self._conversations: Dict[int, Dict[str, Any]] = {}
+        self._dirty: Set[int] = set()
+        self._loaded = False
+        self._pending: Optional[List[Dict[str, Any]]] = None
+        self._load_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.flushes = 0
+
+    async def ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            # События, пришедшие во время запроса, применяются после него
+            self._pending = []
+            try:
+                async with AsyncReadSessionLocal() as session:
+                    last, unread = await ChatService(session).inbox()
+            except Exception:
+                self._pending = None
+                raise
+            for message in last:
+                self._conversations[message.user_id] = {
+                    "userId": message.user_id,
+                    "unread": unread.get(message.user_id, 0),
+                    "lastMessage": preview(serialize_message(message)),
+                }
+            pending, self._pending = self._pending, None
+            self._loaded = True
+            for message in pending:
+                self._apply(message)
+
+    def record(self, message: Dict[str, Any]) -> None:
+        """Новое сообщение чата (data события {"type": "message"})."""
+        if self._pending is not None:
+            self._pending.append(message)
+            return
+        if not self._loaded:
+            # Подписчиков ещё не было: сообщение уже в БД и попадёт в загрузку
+            return
+        self._apply(message)
+        if not self._registry.inbox():
+            self._dirty.clear()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    def _apply(self, message: Dict[str, Any]) -> None:
+        user_id = message["userId"]
+        current = self._conversations.get(user_id)
+        if current is not None and current["lastMessage"]["id"] >= message["id"]:
+            return
+        if message["sender"] == "admin":
+            unread = 0
+        else:
+            unread = (current["unread"] if current is not None else 0) + 1
+        self._conversations[user_id] = {"userId": user_id, "unread": unread, "lastMessage": preview(message)}
+        self._dirty.add(user_id)
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.sleep(settings.WS_INBOX_INTERVAL_MS / 1000)
+        finally:
+            self._flush_task = None
+        self.flush()
+
+    def flush(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        subscribers = self._registry.inbox()
+        if not dirty or not subscribers:
+            return
+        self.flushes += 1
+        for user_id in dirty:
+            frame = encode_frame({"type": "inbox", "data": [self._conversations[user_id]]})
+            key = f"inbox:{user_id}"
+            for outbox in subscribers:
+                outbox.put(frame, key=key)
+
+    def snapshot_frame(self) -> str:
+        """Полная сводка для нового подписчика: самые свежие WS_INBOX_LIMIT диалогов."""
+        conversations = sorted(
+            self._conversations.values(), key=lambda item: item["lastMessage"]["id"], reverse=True
+        )
+        return encode_frame({"type": "inbox", "snapshot": True, "data": conversations[: settings.WS_INBOX_LIMIT]})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._loaded,
+            "conversations": len(self._conversations),
+            "subscribers": len(self._registry.inbox()),
+            "flushes": self.flushes,
+        }
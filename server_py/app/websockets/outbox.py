@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import orjson
+from fastapi import WebSocket
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Политики переполнения очереди сокета
+DROP_OLDEST = "drop_oldest"  # выбросить самое старое событие
+COALESCE = "coalesce"  # события с одним ключом заменяют друг друга, иначе как drop_oldest
+DISCONNECT = "disconnect"  # закрыть медленный сокет: клиент переподключится и догонит историю
+
+OVERFLOW_POLICIES = (DROP_OLDEST, COALESCE, DISCONNECT)
+
+# Код закрытия для медленного клиента: "Try Again Later"
+CLOSE_SLOW_CONSUMER = 1013
+
+
+def encode_frame(message: Any) -> str:
+    """JSON-кадр события. Кодируется один раз и уходит во все очереди как есть."""
+    return orjson.dumps(message).decode()
+
+
+def event_key(message: Any) -> Optional[str]:
+    """Ключ для политики coalesce: тип события и id заказа или сообщения.
+
+    Более новое событие о том же заказе заменяет ещё не отправленное старое;
+    повторная доставка того же сообщения чата не занимает второе место.
+    """
+    if not isinstance(message, dict):
+        return None
+    data = message.get("data")
+    if not isinstance(data, dict) or data.get("id") is None:
+        return None
+    return f"{message.get('type')}:{data['id']}"
+
+
+class Outbox:
+    """Исходящая очередь одного сокета и задача-писатель.
+
+    put() не ждёт сокет: кладёт событие в ограниченную очередь и сразу
+    возвращается, поэтому медленный браузер задерживает только себя.
+    В очереди лежат готовые текстовые кадры (encode_frame): при рассылке
+    одна строка разделяется всеми получателями.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_close: Callable[[WebSocket], Awaitable[None]],
+        *,
+        max_size: Optional[int] = None,
+        policy: Optional[str] = None,
+    ) -> None:
+        self.websocket = websocket
+        self._on_close = on_close
+        self.max_size = max_size or settings.WS_OUTBOX_SIZE
+        self.policy = policy or settings.WS_OUTBOX_POLICY
+        if self.policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown outbox policy: {self.policy}")
+        self._queue: Deque[Tuple[Optional[str], str]] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closer: Optional[asyncio.Task] = None
+        self.closed = False
+        # Наибольший seq, отправленный догоном при подключении (только сокеты пользователей)
+        self.replayed_seq: Optional[int] = None
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._writer())
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def put(self, frame: str, key: Optional[str] = None) -> bool:
+        """Ставит кадр в очередь; False, если сокет уже закрыт или закрывается."""
+        if self.closed:
+            return False
+        queue = self._queue
+        if key is not None and self.policy == COALESCE:
+            for index, (queued_key, _) in enumerate(queue):
+                if queued_key == key:
+                    # Клиенту нужно только последнее состояние по ключу
+                    queue[index] = (key, frame)
+                    self.coalesced += 1
+                    return True
+        if len(queue) >= self.max_size:
+            if self.policy == DISCONNECT:
+                self._close_slow()
+                return False
+            queue.popleft()
+            self.dropped += 1
+        queue.append((key, frame))
+        self.max_depth = max(self.max_depth, len(queue))
+        self._wakeup.set()
+        return True
+
+    def _close_slow(self) -> None:
+        logger.warning("Closing slow websocket consumer: %s events queued", len(self._queue))
+        self.closed = True
+        self._queue.clear()
+        self._closer = asyncio.create_task(self._shutdown(CLOSE_SLOW_CONSUMER))
+
+    async def _send(self, frame: str) -> None:
+        await self.websocket.send_text(frame)
+
+    async def _writer(self) -> None:
+        timeout = settings.WS_SEND_TIMEOUT_SECONDS
+        try:
+            while not self.closed:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                _, frame = self._queue.popleft()
+                # Клиент, который не принимает кадр за timeout, считается зависшим
+                await asyncio.wait_for(self._send(frame), timeout)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001
+            # Обрыв или зависший клиент: сокет больше не обслуживаем
+            self.closed = True
+            self._queue.clear()
+            await self._shutdown(CLOSE_SLOW_CONSUMER)
+
+    async def _shutdown(self, code: int) -> None:
+        try:
+            await self.websocket.close(code=code)
+        except Exception:  # noqa: BLE001
+            pass
+        await self._on_close(self.websocket)
+
+    async def stop(self) -> None:
+        self.closed = True
+        self._queue.clear()
+        task, self._task = self._task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self._queue),
+            "maxDepth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "closed": self.closed,
+        }
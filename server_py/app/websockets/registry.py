@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+from app.websockets.outbox import Outbox
+
+EMPTY: FrozenSet[Outbox] = frozenset()
+
+
+class ConnectionRegistry:
+    """Очереди сокетов чата по пользователям и админам, без блокировок.
+
+    Наборы очередей неизменяемые (frozenset): подключение и отключение
+    собирают новый набор и подменяют ссылку (copy-on-write). Изменения идут
+    без await, то есть целиком внутри одного шага цикла событий, поэтому
+    отправка просто берёт текущий набор и обходит его — без lock и без
+    копирования, даже если в это время кто-то подключается.
+
+    Админ после подключения получает все сообщения чата (firehose), пока не
+    пришлёт первую подписку; дальше — только диалоги, на которые подписан
+    (watchers), и, если хочет, сводку входящих (inbox).
+    """
+
+    def __init__(self) -> None:
+        self._users: Dict[int, FrozenSet[Outbox]] = {}
+        self._admins: FrozenSet[Outbox] = EMPTY
+        self._firehose: FrozenSet[Outbox] = EMPTY
+        self._watchers: Dict[int, FrozenSet[Outbox]] = {}
+        self._inbox: FrozenSet[Outbox] = EMPTY
+        self._sockets: Dict[WebSocket, Tuple[Optional[int], Outbox]] = {}
+        self._watching: Dict[Outbox, Set[int]] = {}
+
+    def add_user(self, user_id: int, outbox: Outbox) -> None:
+        self._users[user_id] = self._users.get(user_id, EMPTY) | {outbox}
+        self._sockets[outbox.websocket] = (user_id, outbox)
+
+    def add_admin(self, outbox: Outbox) -> None:
+        self._admins = self._admins | {outbox}
+        self._firehose = self._firehose | {outbox}
+        self._sockets[outbox.websocket] = (None, outbox)
+
+    def remove(self, websocket: WebSocket) -> Optional[Outbox]:
+        """Убирает сокет; очередь возвращается вызывающему, чтобы тот её остановил."""
+        entry = self._sockets.pop(websocket, None)
+        if entry is None:
+            return None
+        user_id, outbox = entry
+        if user_id is None:
+            self.unwatch(outbox, self._watching.get(outbox, ()))
+            self._watching.pop(outbox, None)
+            self._admins = self._admins - {outbox}
+            self._firehose = self._firehose - {outbox}
+            self._inbox = self._inbox - {outbox}
+            return outbox
+        remaining = self._users.get(user_id, EMPTY) - {outbox}
+        if remaining:
+            self._users[user_id] = remaining
+        else:
+            self._users.pop(user_id, None)
+        return outbox
+
+    def _leave_firehose(self, outbox: Outbox) -> None:
+        if outbox in self._firehose:
+            self._firehose = self._firehose - {outbox}
+            self._watching.setdefault(outbox, set())
+
+    def watch(self, outbox: Outbox, user_ids: Iterable[int]) -> None:
+        self._leave_firehose(outbox)
+        watching = self._watching[outbox]
+        for user_id in user_ids:
+            if user_id not in watching:
+                watching.add(user_id)
+                self._watchers[user_id] = self._watchers.get(user_id, EMPTY) | {outbox}
+
+    def unwatch(self, outbox: Outbox, user_ids: Iterable[int]) -> None:
+        self._leave_firehose(outbox)
+        watching = self._watching.get(outbox, set())
+        for user_id in list(user_ids):
+            if user_id not in watching:
+                continue
+            watching.discard(user_id)
+            remaining = self._watchers.get(user_id, EMPTY) - {outbox}
+            if remaining:
+                self._watchers[user_id] = remaining
+            else:
+                self._watchers.pop(user_id, None)
+
+    def set_inbox(self, outbox: Outbox, enabled: bool) -> None:
+        self._leave_firehose(outbox)
+        self._inbox = self._inbox | {outbox} if enabled else self._inbox - {outbox}
+
+    def watching(self, outbox: Outbox) -> List[int]:
+        return sorted(self._watching.get(outbox, ()))
+
+    def in_firehose(self, outbox: Outbox) -> bool:
+        return outbox in self._firehose
+
+    def admin(self, websocket: WebSocket) -> Optional[Outbox]:
+        entry = self._sockets.get(websocket)
+        return entry[1] if entry is not None and entry[0] is None else None
+
+    def user(self, user_id: int) -> FrozenSet[Outbox]:
+        return self._users.get(user_id, EMPTY)
+
+    def admins(self) -> FrozenSet[Outbox]:
+        return self._admins
+
+    def firehose(self) -> FrozenSet[Outbox]:
+        return self._firehose
+
+    def watchers(self, user_id: int) -> FrozenSet[Outbox]:
+        return self._watchers.get(user_id, EMPTY)
+
+    def inbox(self) -> FrozenSet[Outbox]:
+        return self._inbox
+
+    def user_of(self, websocket: WebSocket) -> Optional[int]:
+        entry = self._sockets.get(websocket)
+        return entry[0] if entry is not None else None
+
+    def outboxes(self) -> List[Outbox]:
+        return [outbox for _, outbox in self._sockets.values()]
+
+    @property
+    def user_count(self) -> int:
+        return len(self._sockets) - len(self._admins)
+
+    @property
+    def admin_count(self) -> int:
+        return len(self._admins)
+
+    @property
+    def watched_count(self) -> int:
+        return len(self._watchers)
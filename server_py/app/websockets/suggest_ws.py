@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Optional
+
+import httpx
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from app.core.config import settings
+from app.services.geocoding import service as geocoding_service
+from app.services.geocoding.providers import provider_pool
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def _lookup(websocket: WebSocket, send_lock: asyncio.Lock, query: str, limit: int, request_id: Any) -> None:
+    # Ждём паузу в наборе: если придёт новый префикс, задача будет отменена здесь
+    await asyncio.sleep(settings.GEO_SUGGEST_DEBOUNCE_MS / 1000)
+    payload: dict = {"type": "suggest", "id": request_id, "query": query}
+    if not provider_pool.configured:
+        payload.update(type="error", detail="No geocoding provider API key is configured")
+    else:
+        try:
+            result = await geocoding_service.suggest(query, limit)
+            payload["results"] = result.get("results", [])
+        except httpx.HTTPError as e:
+            payload.update(type="error", detail=f"Suggestion request failed: {str(e)}")
+        except Exception as e:  # noqa: BLE001
+            logger.exception("Suggest lookup failed")
+            payload.update(type="error", detail=f"Internal error: {str(e)}")
+    async with send_lock:
+        await websocket.send_json(payload)
+
+
+@router.websocket("/ws/suggest")
+async def suggest_websocket(websocket: WebSocket) -> None:
+    """Подсказки адресов по мере набора.
+
+    Клиент шлёт {"query": "...", "limit": 8, "id": ...} на каждое нажатие;
+    сервер выжидает паузу, отменяет устаревший поиск и отвечает только
+    на последний префикс.
+    """
+    await websocket.accept()
+    pending: Optional[asyncio.Task] = None
+    # Все отправки в сокет идут под одним замком: ответ поиска и ответ на
+    # короткий запрос не пишутся одновременно, а отмена не рвёт отправку
+    send_lock = asyncio.Lock()
+    try:
+        while True:
+            data = await websocket.receive_json()
+            if not isinstance(data, dict):
+                continue
+            query = str(data.get("query") or "").strip()
+            try:
+                limit = min(max(int(data.get("limit") or 8), 1), 20)
+            except (TypeError, ValueError):
+                limit = 8
+
+            async with send_lock:
+                if pending is not None and not pending.done():
+                    pending.cancel()
+                pending = None
+
+                if len(query) < 2:
+                    await websocket.send_json(
+                        {"type": "suggest", "id": data.get("id"), "query": query, "results": []}
+                    )
+                    continue
+            pending = asyncio.create_task(_lookup(websocket, send_lock, query, limit, data.get("id")))
+    except WebSocketDisconnect:
+        pass
+    except Exception:  # noqa: BLE001
+        logger.exception("Suggest websocket error")
+        try:
+            await websocket.close(code=1011)
+        except Exception:  # noqa: BLE001
+            pass
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
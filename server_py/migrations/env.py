@@ -0,0 +1,70 @@
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.database import Base, async_database_url
+
+# Импортируем модели чтобы они попали в metadata
+from app.models import user  # noqa: F401
+from app.models import verification  # noqa: F401
+from app.models import order  # noqa: F401
+from app.models import chat_message  # noqa: F401
+from app.models import tariff  # noqa: F401
+from app.models import app_settings  # noqa: F401
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Служебные таблицы вне моделей (отпечаток схемы из init_db) — не для autogenerate
+IGNORED_TABLES = {"schema_version"}
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    return not (type_ == "table" and name in IGNORED_TABLES)
+
+
+def _configure(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # ALTER TABLE в SQLite ограничен — Alembic пересобирает таблицу целиком
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=async_database_url(settings.DATABASE_URL),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    engine = create_async_engine(async_database_url(settings.DATABASE_URL))
+    async with engine.connect() as connection:
+        await connection.run_sync(_configure)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif config.attributes.get("connection") is not None:
+    # Вызов из init_db: соединение уже открыто внутри его транзакции
+    _configure(config.attributes["connection"])
+else:
+    asyncio.run(run_migrations_online())
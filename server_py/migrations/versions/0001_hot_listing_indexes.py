@@ -0,0 +1,61 @@
+"""Composite and partial indexes for hot listing queries
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Таблицы создаёт init_db (create_all); на свежей базе индексы уже есть,
+    # поэтому все операции идемпотентны
+    op.create_index(
+        "ix_orders_user_id_created_at",
+        "orders",
+        ["user_id", sa.text("created_at DESC")],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_orders_created_at",
+        "orders",
+        [sa.text("created_at DESC")],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_chat_messages_user_id_created_at_id",
+        "chat_messages",
+        ["user_id", "created_at", "id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_users_drivers_created_at",
+        "users",
+        [sa.text("created_at DESC")],
+        sqlite_where=sa.text("role = 'driver'"),
+        postgresql_where=sa.text("role = 'driver'"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_verification_codes_active",
+        "verification_codes",
+        ["phone", "code", "expires_at"],
+        sqlite_where=sa.text("is_used = 0"),
+        postgresql_where=sa.text("is_used = false"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_verification_codes_active", table_name="verification_codes")
+    op.drop_index("ix_users_drivers_created_at", table_name="users")
+    op.drop_index("ix_chat_messages_user_id_created_at_id", table_name="chat_messages")
+    op.drop_index("ix_orders_created_at", table_name="orders")
+    op.drop_index("ix_orders_user_id_created_at", table_name="orders")
@@ -0,0 +1,63 @@
+"""Add id to listing indexes for keyset pagination on (created_at, id)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_orders_user_id_created_at_id",
+        "orders",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_orders_created_at_id",
+        "orders",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_users_created_at_id",
+        "users",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_users_drivers_created_at_id",
+        "users",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        sqlite_where=sa.text("role = 'driver'"),
+        postgresql_where=sa.text("role = 'driver'"),
+        if_not_exists=True,
+    )
+    # Новые индексы покрывают старые целиком
+    op.drop_index("ix_orders_user_id_created_at", table_name="orders")
+    op.drop_index("ix_orders_created_at", table_name="orders")
+    op.drop_index("ix_users_drivers_created_at", table_name="users")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_users_drivers_created_at",
+        "users",
+        [sa.text("created_at DESC")],
+        sqlite_where=sa.text("role = 'driver'"),
+        postgresql_where=sa.text("role = 'driver'"),
+    )
+    op.create_index("ix_orders_created_at", "orders", [sa.text("created_at DESC")])
+    op.create_index("ix_orders_user_id_created_at", "orders", ["user_id", sa.text("created_at DESC")])
+    op.drop_index("ix_users_drivers_created_at_id", table_name="users")
+    op.drop_index("ix_users_created_at_id", table_name="users")
+    op.drop_index("ix_orders_created_at_id", table_name="orders")
+    op.drop_index("ix_orders_user_id_created_at_id", table_name="orders")
@@ -0,0 +1,41 @@
+"""Per-conversation sequence numbers for chat messages
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Новая база уже создана create_all вместе с колонкой
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("chat_messages")}
+    if "seq" not in columns:
+        op.add_column("chat_messages", sa.Column("seq", sa.Integer(), nullable=True))
+    # Существующие сообщения нумеруются по порядку id внутри каждого диалога
+    op.execute(
+        "UPDATE chat_messages SET seq = ("
+        "SELECT COUNT(*) FROM chat_messages AS earlier "
+        "WHERE earlier.user_id = chat_messages.user_id AND earlier.id <= chat_messages.id"
+        ") WHERE seq IS NULL"
+    )
+    op.create_index(
+        "ux_chat_messages_user_id_seq",
+        "chat_messages",
+        ["user_id", "seq"],
+        unique=True,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_chat_messages_user_id_seq", table_name="chat_messages")
+    with op.batch_alter_table("chat_messages") as batch:
+        batch.drop_column("seq")
@@ -0,0 +1,57 @@
+"""Make users.created_at and orders.created_at NOT NULL (keyset pagination key)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Индексы по created_at: SQLite пересобирает таблицу, а отражение DESC и
+# частичных индексов ненадёжно, поэтому они пересоздаются явно
+INDEXES = {
+    "users": [
+        ("ix_users_created_at_id", [sa.text("created_at DESC"), sa.text("id DESC")], None),
+        ("ix_users_drivers_created_at_id", [sa.text("created_at DESC"), sa.text("id DESC")], "role = 'driver'"),
+    ],
+    "orders": [
+        ("ix_orders_user_id_created_at_id", ["user_id", sa.text("created_at DESC"), sa.text("id DESC")], None),
+        ("ix_orders_created_at_id", [sa.text("created_at DESC"), sa.text("id DESC")], None),
+    ],
+}
+
+
+def _set_nullable(nullable: bool) -> None:
+    sqlite = op.get_bind().dialect.name == "sqlite"
+    for table, indexes in INDEXES.items():
+        if sqlite:
+            for name, _, _ in indexes:
+                op.drop_index(name, table_name=table)
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column("created_at", existing_type=sa.DateTime(), nullable=nullable)
+        if sqlite:
+            for name, columns, where in indexes:
+                op.create_index(name, table, columns, sqlite_where=sa.text(where) if where else None)
+
+
+def upgrade() -> None:
+    # Строки без даты создания получают дату изменения или момент миграции
+    for table in INDEXES:
+        op.execute(
+            sa.text(
+                f"UPDATE {table} SET created_at = COALESCE(updated_at, :now) WHERE created_at IS NULL"
+            ).bindparams(now=datetime.utcnow())
+        )
+    _set_nullable(False)
+
+
+def downgrade() -> None:
+    _set_nullable(True)
@@ -20,9 +20,12 @@ if __name__ == "__main__":
     
     # Запускаем сервер
     # Важно: reload=True игнорирует host, поэтому используем reload=False для сетевого доступа
+    # SERVER_WORKERS > 1 — по процессу на ядро; чат между ними ходит через PUBSUB_BACKEND
     uvicorn.run(
         "app.main:app",
         host=settings.SERVER_HOST,
         port=settings.SERVER_PORT,
+        workers=settings.SERVER_WORKERS,
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE,
         reload=False  # Отключаем reload чтобы host работал правильно
     )
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""Бенчмарк рассылки чата: задержка publish при 10k сокетов пользователей и 200 админов.
+
+Сравниваются два реестра соединений с одинаковыми очередями Outbox:
+
+- locked — прежняя схема: общий asyncio.Lock на подключение, отключение и
+  каждый снимок получателей, снимок копируется в list;
+- cow — ConnectionRegistry: неизменяемые наборы очередей, отправка без lock.
+
+Сокеты фиктивные (send_text ничего не делает), задержка — время вызова
+push_message (один пользователь + все админы) до постановки во все очереди.
+Сценарий "churn" параллельно переподключает случайных пользователей.
+
+    python scripts/bench_chat_fanout.py
+    python scripts/bench_chat_fanout.py --users 10000 --admins 200 --publishes 5000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Set
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.pubsub import InProcessBackend, PubSub  # noqa: E402
+from app.websockets.chat_ws import ChatConnectionManager  # noqa: E402
+from app.websockets.outbox import Outbox, encode_frame  # noqa: E402
+
+
+class FakeWebSocket:
+    async def send_text(self, frame: str) -> None:
+        pass
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+class LockedConnectionManager(ChatConnectionManager):
+    """Прежний реестр: изменяемые множества под одним asyncio.Lock."""
+
+    def __init__(self, bus: PubSub) -> None:
+        super().__init__(bus)
+        self._lock = asyncio.Lock()
+        self._user_connections: Dict[int, Set[Outbox]] = {}
+        self._admin_connections: Set[Outbox] = set()
+        self._outboxes: Dict[object, Outbox] = {}
+        self._user_lookup: Dict[object, int] = {}
+
+    async def register_user(self, user_id: int, websocket) -> None:
+        async with self._lock:
+            outbox = self._open_outbox(websocket)
+            self._user_connections.setdefault(user_id, set()).add(outbox)
+            self._user_lookup[websocket] = user_id
+            self._outboxes[websocket] = outbox
+
+    async def register_admin(self, websocket) -> None:
+        async with self._lock:
+            outbox = self._open_outbox(websocket)
+            self._admin_connections.add(outbox)
+            self._outboxes[websocket] = outbox
+
+    async def unregister(self, websocket) -> None:
+        async with self._lock:
+            outbox = self._outboxes.pop(websocket, None)
+            if outbox is None:
+                return
+            await outbox.stop()
+            self._admin_connections.discard(outbox)
+            user_id = self._user_lookup.pop(websocket, None)
+            conns = self._user_connections.get(user_id)
+            if conns:
+                conns.discard(outbox)
+                if not conns:
+                    self._user_connections.pop(user_id, None)
+
+    async def _snapshot_user(self, user_id: int) -> List[Outbox]:
+        async with self._lock:
+            return list(self._user_connections.get(user_id, ()))
+
+    async def _snapshot_admins(self) -> List[Outbox]:
+        async with self._lock:
+            return list(self._admin_connections)
+
+    async def _on_chat_event(self, event: dict) -> None:
+        frame = encode_frame(event["message"])
+        for outbox in await self._snapshot_user(event["userId"]):
+            outbox.put(frame)
+        for outbox in await self._snapshot_admins():
+            outbox.put(frame)
+
+
+async def _churn(manager: ChatConnectionManager, sockets: Dict[int, FakeWebSocket], users: int, stop: asyncio.Event) -> int:
+    """Переподключает случайных пользователей, пока идёт рассылка."""
+    reconnects = 0
+    while not stop.is_set():
+        user_id = random.randrange(users)
+        await manager.unregister(sockets[user_id])
+        sockets[user_id] = FakeWebSocket()
+        await manager.register_user(user_id, sockets[user_id])
+        reconnects += 1
+        await asyncio.sleep(0)
+    return reconnects
+
+
+async def _run(manager_cls, args: argparse.Namespace, churn: bool) -> List[float]:
+    bus = PubSub()
+    await bus.startup(InProcessBackend(set()))
+    manager = manager_cls(bus)
+    sockets = {user_id: FakeWebSocket() for user_id in range(args.users)}
+    for user_id, ws in sockets.items():
+        await manager.register_user(user_id, ws)
+    admins = [FakeWebSocket() for _ in range(args.admins)]
+    for ws in admins:
+        await manager.register_admin(ws)
+
+    stop = asyncio.Event()
+    churner = asyncio.create_task(_churn(manager, sockets, args.users, stop)) if churn else None
+    rng = random.Random(42)
+    message = {"type": "message", "data": {"id": 1, "text": "ping"}}
+    latencies: List[float] = []
+    for _ in range(args.publishes):
+        user_id = rng.randrange(args.users)
+        started = time.perf_counter()
+        await manager.push_message(user_id, message)
+        latencies.append((time.perf_counter() - started) * 1e6)
+        # Даём писателям очередей разгрести отправленное
+        await asyncio.sleep(0)
+
+    stop.set()
+    if churner is not None:
+        await churner
+    for ws in [*sockets.values(), *admins]:
+        await manager.unregister(ws)
+    await bus.shutdown()
+    return latencies
+
+
+def _report(name: str, latencies: List[float]) -> float:
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    print(f"  {name:<7} p50 {p50:>7.1f} us   p99 {p99:>7.1f} us   max {ordered[-1]:>8.1f} us")
+    return p50
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Задержка рассылки чата: реестр под lock против copy-on-write")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--admins", type=int, default=200)
+    parser.add_argument("--publishes", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(f"{args.users} user sockets, {args.admins} admin sockets, {args.publishes} publishes")
+    for churn in (False, True):
+        print("with reconnect churn:" if churn else "steady:")
+        before = _report("locked", asyncio.run(_run(LockedConnectionManager, args, churn)))
+        after = _report("cow", asyncio.run(_run(ChatConnectionManager, args, churn)))
+        print(f"  p50 speedup x{before / after:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Сравнение сериализации списков: ORM + response_model против Core-строк + orjson.
+
+Заполняет временную SQLite-базу заказами и для каждого размера меряет полный
+путь от запроса к БД до готового тела ответа:
+
+    orm   — select(Order) → ORM-объекты → валидация List[OrderResponse] → JSONResponse
+    fast  — Projection(Order, OrderResponse) → Core-строки → dict → ORJSONResponse
+
+    python scripts/bench_list_serialization.py
+    python scripts/bench_list_serialization.py --rows 10000 100000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import delete, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+
+
+async def _fill(session: AsyncSession, Order, rows: int) -> None:
+    await session.execute(delete(Order))
+    start = datetime(2025, 1, 1)
+    batch = []
+    for i in range(rows):
+        batch.append(
+            {
+                "address": f"Бишкек, ул. Токтогула, {i}",
+                "from_address": "Бишкек, пр. Чуй, 1",
+                "to_address": "Бишкек, ул. Ахунбаева, 100",
+                "start_coords": {"lat": 42.87, "lon": 74.59},
+                "dest_coords": {"lat": 42.84, "lon": 74.61},
+                "distance": 5400.0,
+                "duration": 780.0,
+                "cost": 650.0,
+                "status": "completed",
+                "driver_name": "Азамат",
+                "plate_number": "01KG123ABC",
+                "meta": {"source": "bench", "n": i},
+                "created_at": start + timedelta(seconds=i),
+                "updated_at": start + timedelta(seconds=i),
+            }
+        )
+        if len(batch) == 5000:
+            await session.execute(insert(Order), batch)
+            batch = []
+    if batch:
+        await session.execute(insert(Order), batch)
+    await session.commit()
+
+
+async def _measure(fn: Callable[[], Awaitable[bytes]], repeat: int) -> "tuple[float, int]":
+    timings: List[float] = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(await fn())
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), size
+
+
+async def bench(sizes: List[int], repeat: int) -> None:
+    from app.core.database import AsyncReadSessionLocal, AsyncSessionLocal, dispose_engines
+    from app.core.fast_json import Projection
+    from app.core.init_db import init_db
+    from app.models.order import Order
+    from app.schemas.order import OrderResponse
+
+    await init_db()
+    adapter = TypeAdapter(List[OrderResponse])
+    projection = Projection(Order, OrderResponse)
+    order_by = (Order.created_at.desc(), Order.id.desc())
+
+    async def orm_path() -> bytes:
+        async with AsyncReadSessionLocal() as session:
+            rows = (await session.execute(select(Order).order_by(*order_by))).scalars().all()
+        # То же, что делает FastAPI для response_model
+        value = adapter.validate_python(rows, from_attributes=True)
+        return JSONResponse(adapter.dump_python(value, mode="json")).body
+
+    async def fast_path() -> bytes:
+        async with AsyncReadSessionLocal() as session:
+            rows = (await session.execute(projection.select().order_by(*order_by))).all()
+        return ORJSONResponse(projection.dicts(rows)).body
+
+    print(f"{'rows':>8} {'orm, s':>10} {'fast, s':>10} {'speedup':>8} {'body, MB':>9}")
+    try:
+        for rows in sizes:
+            async with AsyncSessionLocal() as session:
+                await _fill(session, Order, rows)
+            orm_time, size = await _measure(orm_path, repeat)
+            fast_time, _ = await _measure(fast_path, repeat)
+            print(
+                f"{rows:>8} {orm_time:>10.3f} {fast_time:>10.3f} "
+                f"{orm_time / fast_time:>7.1f}x {size / 1_000_000:>9.1f}"
+            )
+    finally:
+        await dispose_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк сериализации списков заказов")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Движки создаются при импорте app.core.database, поэтому URL задаётся до него
+        settings.DATABASE_URL = f"sqlite+aiosqlite:///{tmp}/bench.db"
+        asyncio.run(bench(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
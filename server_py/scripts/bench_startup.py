@@ -0,0 +1,134 @@
+"""Бенчмарк холодного старта: импорт app.main, запуск lifespan и init_db.
+
+Каждый замер импорта — отдельный процесс `python -X importtime -c "import app.main"`,
+так что модули не кешируются между прогонами (байткод .pyc — кешируется, как
+и в проде). "Готовность" — отдельный процесс, который импортирует приложение
+и проходит startup lifespan. init_db меряется дважды на временной базе: первый
+запуск с полной проверкой схемы и повторный, когда отпечаток схемы уже совпадает.
+
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --runs 10 --top 15
+    python scripts/bench_startup.py --budget-ms 900 --json startup.jsonl   # для CI
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _import_run(env: Dict[str, str]) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """Один процесс: (мс на import app.main, {модуль: (self мкс, cumulative мкс)})."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules: Dict[str, Tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            own, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+            modules[name] = (int(own), int(cumulative))
+        except ValueError:
+            continue  # строка заголовка
+    return modules["app.main"][1] / 1000, modules
+
+
+READY_CODE = (
+    "import asyncio, time\n"
+    "t = time.perf_counter()\n"
+    "from app.main import app, lifespan\n"
+    "async def ready():\n"
+    "    async with lifespan(app):\n"
+    "        return time.perf_counter() - t\n"
+    "print(asyncio.run(ready()) * 1000)\n"
+)
+
+
+def _ready_run(env: Dict[str, str]) -> float:
+    """Один процесс: мс от начала импорта до конца startup в lifespan."""
+    proc = subprocess.run(
+        [sys.executable, "-c", READY_CODE], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return float(proc.stdout.split()[-1])
+
+
+def _init_db_timings(url: str) -> Tuple[float, float]:
+    code = (
+        "import asyncio, time\n"
+        "from app.core.init_db import init_db\n"
+        "t = time.perf_counter(); asyncio.run(init_db()); full = time.perf_counter() - t\n"
+        "t = time.perf_counter(); asyncio.run(init_db()); fast = time.perf_counter() - t\n"
+        "print(full * 1000, fast * 1000)\n"
+    )
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "DATABASE_URL": url}
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    full, fast = proc.stdout.split()[-2:]
+    return float(full), float(fast)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк холодного старта сервера")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Сколько самых тяжёлых модулей показать")
+    parser.add_argument("--budget-ms", type=float, help="Код возврата 1, если медиана импорта больше")
+    parser.add_argument("--json", type=Path, help="Дописать результат строкой JSON в файл (история замеров)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{tmp}/startup.db"
+        env = {**os.environ, "PYTHONPATH": str(ROOT), "DATABASE_URL": url}
+        _import_run(env)  # прогрев: компиляция .pyc
+        timings: List[float] = []
+        ready: List[float] = []
+        modules: Dict[str, Tuple[int, int]] = {}
+        for _ in range(args.runs):
+            elapsed, modules = _import_run(env)
+            timings.append(elapsed)
+            ready.append(_ready_run(env))
+        init_full, init_fast = _init_db_timings(url)
+
+    median = statistics.median(timings)
+    print(f"import app.main: median {median:.0f} ms, min {min(timings):.0f} ms ({args.runs} runs)")
+    print(f"ready (import + lifespan startup): median {statistics.median(ready):.0f} ms")
+    print(f"init_db: full check {init_full:.0f} ms, schema unchanged {init_fast:.0f} ms")
+    if args.top:
+        print(f"\nTop {args.top} modules by self time (last run):")
+        for name, (own, cumulative) in sorted(modules.items(), key=lambda item: -item[1][0])[: args.top]:
+            print(f"  {own / 1000:>7.1f} ms  (cumulative {cumulative / 1000:>7.1f})  {name}")
+
+    if args.json:
+        record = {
+            "ts": int(time.time()),
+            "importMedianMs": round(median, 1),
+            "importMinMs": round(min(timings), 1),
+            "readyMedianMs": round(statistics.median(ready), 1),
+            "initDbFullMs": round(init_full, 1),
+            "initDbFastMs": round(init_fast, 1),
+        }
+        with args.json.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"\nImport time {median:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Собирает локальный справочник для подсказок адресов.
+
+Пример:
+    python scripts/build_gazetteer.py kyrgyzstan.geojson
+    python scripts/build_gazetteer.py places.csv --output data/gazetteer.json.gz
+
+CSV: колонки kind,name,city,lat,lon (kind: city|town|village|street|poi).
+GeoJSON: точки с properties.kind либо OSM-тегами place/highway и name.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.services.geocoding.gazetteer import build_index, read_dump  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", type=Path, help="CSV или GeoJSON выгрузка")
+    parser.add_argument("--output", type=Path, default=settings.GAZETTEER_PATH)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    count = build_index(read_dump(args.source), args.output)
+    elapsed = time.perf_counter() - started
+    size_kb = args.output.stat().st_size / 1024
+    print(f"Записано {count} объектов в {args.output} ({size_kb:.0f} КБ) за {elapsed:.1f} с")
+
+
+if __name__ == "__main__":
+    main()
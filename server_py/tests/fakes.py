@@ -0,0 +1,34 @@
+import asyncio
+from typing import List, Optional
+
+
+class FakeWebSocket:
+    """Сокет, который запоминает отправленные кадры и код закрытия.
+
+    hold() задерживает отправку до release(): так моделируется медленный клиент.
+    """
+
+    def __init__(self) -> None:
+        self.frames: List[str] = []
+        self.close_code: Optional[int] = None
+        self._gate = asyncio.Event()
+        self._gate.set()
+
+    def hold(self) -> None:
+        self._gate.clear()
+
+    def release(self) -> None:
+        self._gate.set()
+
+    async def send_text(self, frame: str) -> None:
+        await self._gate.wait()
+        self.frames.append(frame)
+
+    async def close(self, code: int = 1000) -> None:
+        self.close_code = code
+
+
+async def settle(rounds: int = 20) -> None:
+    # Дать задачам-писателям сокетов разослать очередь
+    for _ in range(rounds):
+        await asyncio.sleep(0)
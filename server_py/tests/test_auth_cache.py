@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.api.v1.endpoints.auth import verify_code
+from app.core import auth_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.security import create_access_token
+from app.models.user import User
+from app.models.verification import VerificationCode
+from app.schemas.auth import VerifyCodeRequest
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    auth_cache.token_memo.clear()
+    auth_cache.user_cache.clear()
+    yield
+    auth_cache.token_memo.clear()
+    auth_cache.user_cache.clear()
+
+
+def token_for(user: User) -> str:
+    return create_access_token({"sub": str(user.id)})
+
+
+async def rename(user_id: int, first_name: str) -> None:
+    async with AsyncSessionLocal() as session:
+        user = await session.get(User, user_id)
+        user.first_name = first_name
+        await session.commit()
+
+
+def test_cached_user_is_served_until_invalidated(run, make_user):
+    user = make_user(first_name="Old")
+    token = token_for(user)
+    assert run(auth_cache.resolve_token(token)).first_name == "Old"
+
+    run(rename(user.id, "New"))
+    assert run(auth_cache.resolve_token(token)).first_name == "Old"
+
+    run(auth_cache.invalidate_user(user.id))
+    assert run(auth_cache.resolve_token(token)).first_name == "New"
+    assert auth_cache.user_cache.invalidations == 1
+
+
+def test_deactivated_user_is_rejected_after_invalidation(run, make_user):
+    user = make_user()
+    token = token_for(user)
+    assert run(auth_cache.resolve_token(token)) is not None
+
+    async def deactivate():
+        async with AsyncSessionLocal() as session:
+            (await session.get(User, user.id)).is_active = False
+            await session.commit()
+
+    run(deactivate())
+    run(auth_cache.invalidate_user(user.id))
+
+    assert run(auth_cache.resolve_token(token)) is None
+
+
+def test_token_memo_skips_signature_check_on_repeat(make_user, monkeypatch):
+    user = make_user()
+    token = token_for(user)
+    assert auth_cache.decode_user_id(token) == user.id
+
+    def no_decode(*args, **kwargs):
+        raise AssertionError("signature checked twice")
+
+    monkeypatch.setattr(auth_cache.jwt, "decode", no_decode)
+    assert auth_cache.decode_user_id(token) == user.id
+
+
+def test_disabled_cache_bypasses_memo_and_user_cache(run, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_CACHE_ENABLED", False)
+    user = make_user(first_name="Old")
+    token = token_for(user)
+    run(auth_cache.resolve_token(token))
+
+    assert auth_cache.token_memo.snapshot()["size"] == 0
+    assert auth_cache.user_cache.snapshot()["size"] == 0
+    run(rename(user.id, "New"))
+    assert run(auth_cache.resolve_token(token)).first_name == "New"
+
+
+def test_invalid_token_resolves_to_none(run):
+    assert run(auth_cache.resolve_token("not-a-jwt")) is None
+
+
+def test_cached_user_is_a_private_copy(run, make_user):
+    user = make_user(first_name="Old")
+    token = token_for(user)
+    first = run(auth_cache.resolve_token(token))
+
+    # Запрос меняет свой current_user — другие запросы этого не видят
+    first.first_name = "Mutated"
+    second = run(auth_cache.resolve_token(token))
+
+    assert second is not first
+    assert second.first_name == "Old"
+
+
+def test_verify_code_invalidates_cached_user(run, make_user):
+    user = make_user()
+    token = token_for(user)
+    run(auth_cache.resolve_token(token))
+
+    async def login():
+        async with AsyncSessionLocal() as session:
+            session.add(VerificationCode(
+                phone=user.phone,
+                code="1234",
+                expires_at=datetime.utcnow() + timedelta(minutes=5),
+            ))
+            await session.commit()
+            return await verify_code(VerifyCodeRequest(phone=user.phone, code="1234"), db=session)
+
+    payload = run(login())
+
+    assert payload["user_id"] == user.id
+    assert auth_cache.user_cache.snapshot()["size"] == 0
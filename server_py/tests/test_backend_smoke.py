@@ -0,0 +1,47 @@
+"""Сквозная проверка бэкенда БД: запускается и на SQLite, и на PostgreSQL
+(см. DATABASE_URL в conftest)."""
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.database import AsyncReadSessionLocal, async_database_url, engine
+from app.core.write_queue import write_queue
+from app.models.order import Order
+from app.services.chat import ChatService
+
+
+def test_engine_matches_database_url(db):
+    expected = make_url(async_database_url(settings.DATABASE_URL)).get_backend_name()
+    assert engine.dialect.name == expected
+
+
+def test_order_round_trip(run, make_user):
+    user = make_user()
+    coords = {"latitude": 42.87, "longitude": 74.59}
+
+    async def scenario():
+        order = await write_queue.add(Order(user_id=user.id, address="A → B", start_coords=coords, cost=500.0))
+        async with AsyncReadSessionLocal() as session:
+            return order, (await session.execute(select(Order).where(Order.id == order.id))).scalar_one()
+
+    created, loaded = run(scenario())
+
+    assert loaded.user_id == user.id
+    assert loaded.start_coords == coords
+    assert loaded.created_at == created.created_at
+    assert loaded.status == "pending"
+
+
+def test_chat_message_round_trip(run, make_user):
+    user = make_user()
+
+    async def scenario():
+        await ChatService().create_message(user_id=user.id, sender="user", text="Привет", meta={"k": 1})
+        await ChatService().create_message(user_id=user.id, sender="admin", text="Здравствуйте")
+        async with AsyncReadSessionLocal() as session:
+            return await ChatService(session).list_messages(user_id=user.id)
+
+    messages = run(scenario())
+
+    assert [(m.sender, m.text, m.seq) for m in messages] == [("user", "Привет", 1), ("admin", "Здравствуйте", 2)]
+    assert messages[0].meta == {"k": 1}
@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy import literal
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import AsyncReadSessionLocal
+from app.core.pubsub import PubSub
+from app.services import chat
+from app.services.chat import ChatService, serialize_message
+from app.websockets.chat_ws import ChatConnectionManager
+from app.websockets.outbox import encode_frame
+from fakes import FakeWebSocket, settle
+
+
+async def send(user_id: int, text: str):
+    return await ChatService().create_message(user_id=user_id, sender="user", text=text)
+
+
+def test_seq_is_numbered_per_conversation(run, make_user):
+    first, second = make_user(), make_user()
+
+    seqs = [run(send(first.id, "a")).seq, run(send(second.id, "b")).seq, run(send(first.id, "c")).seq]
+
+    assert seqs == [1, 1, 2]
+
+
+def test_messages_after_returns_missed_in_order(run, make_user):
+    user = make_user()
+    for i in range(4):
+        run(send(user.id, f"m{i}"))
+
+    async def missed():
+        async with AsyncReadSessionLocal() as session:
+            return await ChatService(session).messages_after(user_id=user.id, seq=2, limit=10)
+
+    assert [(m.seq, m.text) for m in run(missed())] == [(3, "m2"), (4, "m3")]
+
+
+def test_seq_conflict_is_recomputed(run, make_user, monkeypatch):
+    user = make_user()
+    run(send(user.id, "first"))
+    real_next_seq = chat._next_seq
+    calls = []
+
+    def stale_then_real(user_id):
+        # Первая попытка видит устаревший максимум, как параллельный воркер
+        calls.append(user_id)
+        return literal(1) if len(calls) == 1 else real_next_seq(user_id)
+
+    monkeypatch.setattr(chat, "_next_seq", stale_then_real)
+
+    assert run(send(user.id, "second")).seq == 2
+    assert len(calls) == 2
+
+
+def test_seq_conflict_gives_up_after_bounded_attempts(run, make_user, monkeypatch):
+    user = make_user()
+    run(send(user.id, "first"))
+    monkeypatch.setattr(chat, "_next_seq", lambda user_id: literal(1))
+
+    with pytest.raises(IntegrityError):
+        run(send(user.id, "second"))
+
+
+def test_replay_then_live_does_not_duplicate(run, make_user):
+    user = make_user()
+    messages = [run(send(user.id, f"m{i}")) for i in range(3)]
+    manager = ChatConnectionManager(PubSub())
+    websocket = FakeWebSocket()
+
+    async def scenario():
+        await manager.register_user(user.id, websocket, since=1)
+        # Сообщение 3 уже в БД, но pub/sub доставляет его только теперь
+        for message in messages[1:]:
+            await manager._on_chat_event(
+                {"userId": user.id, "message": {"type": "message", "data": serialize_message(message)}}
+            )
+        late = await send(user.id, "m3")
+        await manager._on_chat_event(
+            {"userId": user.id, "message": {"type": "message", "data": serialize_message(late)}}
+        )
+        await settle()
+        await manager.unregister(websocket)
+        return late
+
+    late = run(scenario())
+
+    def message_frame(message):
+        return encode_frame({"type": "message", "data": serialize_message(message)})
+
+    assert websocket.frames == [
+        message_frame(messages[1]),
+        message_frame(messages[2]),
+        encode_frame({"type": "replay", "since": 1, "count": 2, "truncated": False}),
+        message_frame(late),
+    ]
@@ -0,0 +1,104 @@
+import gzip
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from app.services.geocoding.gazetteer import INDEX_VERSION, Gazetteer, build_index, search_key
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "build_gazetteer.py"
+
+RECORDS = [
+    ("street", "проспект Чуй", "Бишкек", 42.8765, 74.6033),
+    ("street", "проспект Чуй", "Бишкек", 42.8770, 74.5800),  # второй сегмент той же улицы
+    ("street", "проспект Жибек Жолу", "Бишкек", 42.8868, 74.6000),
+    ("village", "Чуйкент", "", 42.9000, 74.7000),
+    ("poi", "Чуй Тур", "Бишкек", 42.8700, 74.6100),
+    ("city", "Ош", "", 40.5283, 72.7985),
+    ("street", "Набережная", "Москва", 55.75, 37.61),  # вне Кыргызстана
+]
+
+
+def make_gazetteer(tmp_path) -> Gazetteer:
+    path = tmp_path / "gazetteer.json.gz"
+    build_index(RECORDS, path)
+    gazetteer = Gazetteer()
+    gazetteer.load(path)
+    return gazetteer
+
+
+def test_search_key_folds_spellings():
+    assert search_key("Чуй") == search_key("Chui") == search_key("chuy")
+    assert search_key("Жибек Жолу") == search_key("Zhibek Zholu") == search_key("jibek jolu")
+    # Кыргызские буквы
+    assert search_key("Үңкүр") == "ungkur"
+    assert search_key("Өзгөн") == search_key("Ozgon")
+    assert search_key("Ёлка") == search_key("Елка")
+
+
+def test_prefix_lookup_ranks_by_kind(tmp_path):
+    gazetteer = make_gazetteer(tmp_path)
+
+    titles = [r["title"] for r in gazetteer.search("чуй", 10)]
+
+    # Населённый пункт выше улицы, улица выше POI; сегменты улицы схлопнуты
+    assert titles == ["с. Чуйкент", "проспект Чуй", "Чуй Тур"]
+
+
+def test_prefix_matches_any_word_and_latin_query(tmp_path):
+    gazetteer = make_gazetteer(tmp_path)
+
+    assert [r["title"] for r in gazetteer.search("zhibek", 5)] == ["проспект Жибек Жолу"]
+    assert [r["title"] for r in gazetteer.search("проспект ж", 5)] == ["проспект Жибек Жолу"]
+    assert gazetteer.search("набережная", 5) == []
+    assert gazetteer.snapshot()["misses"] == 1
+
+
+def test_limit_and_result_shape(tmp_path):
+    gazetteer = make_gazetteer(tmp_path)
+
+    [result] = gazetteer.search("chui", 1)
+
+    assert result == {
+        "title": "с. Чуйкент",
+        "subtitle": "Село",
+        "latitude": 42.9,
+        "longitude": 74.7,
+        "address": "с. Чуйкент",
+    }
+
+
+def test_build_script_writes_index(tmp_path):
+    source = tmp_path / "places.geojson"
+    source.write_text(json.dumps({
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [74.6, 42.87]},
+             "properties": {"place": "city", "name:ru": "Бишкек"}},
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [74.61, 42.88]},
+             "properties": {"highway": "primary", "name": "проспект Манаса", "addr:city": "Бишкек"}},
+            {"type": "Feature", "geometry": {"type": "LineString", "coordinates": [[74.6, 42.8], [74.7, 42.9]]},
+             "properties": {"name": "линия"}},
+        ],
+    }), encoding="utf-8")
+    target = tmp_path / "out" / "gazetteer.json.gz"
+
+    subprocess.run(
+        [sys.executable, str(SCRIPT), str(source), "--output", str(target)],
+        check=True,
+        capture_output=True,
+    )
+
+    with gzip.open(target, "rt", encoding="utf-8") as fh:
+        payload = json.load(fh)
+    assert payload["version"] == INDEX_VERSION
+    assert sorted(tuple(r[:3]) for r in payload["records"]) == [
+        ("city", "Бишкек", ""),
+        ("street", "проспект Манаса", "Бишкек"),
+    ]
+    assert payload["keys"] == sorted(payload["keys"])
+    assert len(payload["keys"]) == len(payload["refs"]) == len(payload["partial"])
+
+    gazetteer = Gazetteer()
+    gazetteer.load(target)
+    assert [r["title"] for r in gazetteer.search("manasa", 5)] == ["проспект Манаса"]
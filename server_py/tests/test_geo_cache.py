@@ -0,0 +1,74 @@
+import time
+
+from app.core.config import settings
+from app.services.geocoding.cache import CacheStats, GeoCache, MemoryCache, SQLiteCache
+
+
+def make_cache(monkeypatch, tmp_path, size: int = 2) -> GeoCache:
+    monkeypatch.setattr(settings, "GEO_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "GEO_CACHE_MEMORY_SIZE", size)
+    monkeypatch.setattr(settings, "GEO_CACHE_DB_PATH", tmp_path / "geocache.db")
+    return GeoCache()
+
+
+def test_lru_evicts_least_recently_used():
+    stats = CacheStats()
+    memory = MemoryCache(2, stats)
+    expires_at = time.time() + 60
+    memory.set("a", 1, expires_at)
+    memory.set("b", 2, expires_at)
+
+    # Чтение "a" делает самой старой запись "b"
+    assert memory.get("a") == 1
+    memory.set("c", 3, expires_at)
+
+    assert memory.get("b") is None
+    assert memory.get("a") == 1 and memory.get("c") == 3
+    assert stats.evictions == 1
+
+
+def test_memory_entry_expires():
+    stats = CacheStats()
+    memory = MemoryCache(2, stats)
+    memory.set("a", 1, time.time() - 1)
+
+    assert memory.get("a") is None
+    assert len(memory) == 0
+    assert stats.expirations == 1
+
+
+def test_disk_hit_is_promoted_to_memory(run, monkeypatch, tmp_path):
+    cache = make_cache(monkeypatch, tmp_path)
+    run(cache.set("forward:бишкек", {"address": "Бишкек"}, ttl=60))
+    cache.memory.clear()
+
+    assert run(cache.get("forward:бишкек")) == {"address": "Бишкек"}
+    assert cache.stats.disk_hits == 1
+    assert len(cache.memory) == 1
+
+    assert run(cache.get("forward:бишкек")) == {"address": "Бишкек"}
+    assert cache.stats.memory_hits == 1
+    run(cache.shutdown())
+
+
+def test_expired_disk_entry_is_a_miss_and_purged(run, monkeypatch, tmp_path):
+    cache = make_cache(monkeypatch, tmp_path)
+    run(cache.set("forward:ош", {"address": "Ош"}, ttl=-1))
+    cache.memory.clear()
+
+    assert run(cache.get("forward:ош")) is None
+    assert cache.stats.misses == 1
+
+    run(cache.startup())
+    assert cache.disk.count() == 0
+    run(cache.shutdown())
+
+
+def test_disk_survives_reopen(tmp_path):
+    path = tmp_path / "geocache.db"
+    disk = SQLiteCache(path)
+    disk.set("k", [1, 2], time.time() + 60)
+    disk.close()
+
+    entry = SQLiteCache(path).get("k")
+    assert entry is not None and entry[1] == [1, 2]
@@ -0,0 +1,57 @@
+import httpx
+
+from app.api.v1.endpoints.geocoding import _batch_status
+from app.services.geocoding import service as geocoding_service
+from app.services.geocoding.batch import iter_batch
+from app.services.geocoding.providers import provider_pool
+
+
+def collect(run, keys, cached, fetch, concurrency=2):
+    async def scenario():
+        return [item async for item in iter_batch(keys, cached, fetch, concurrency)]
+
+    return {key: (result, error) for key, result, error in run(scenario())}
+
+
+def test_cache_hits_come_first_without_fetch(run):
+    fetched = []
+
+    async def cached(key):
+        return {"address": key} if key == "hit" else None
+
+    async def fetch(key):
+        fetched.append(key)
+        return {"address": "fresh"}
+
+    async def scenario():
+        return [item async for item in iter_batch(["miss", "hit"], cached, fetch, 2)]
+
+    items = run(scenario())
+
+    assert items[0] == ("hit", {"address": "hit"}, None)
+    assert fetched == ["miss"]
+
+
+def test_provider_failure_is_error_not_not_found(run, monkeypatch):
+    async def call(op, query):
+        if query == "broken street":
+            raise httpx.ConnectError("upstream down")
+        if query == "nowhere street":
+            return None
+        return {"latitude": 42.87, "longitude": 74.59, "address": query}
+
+    monkeypatch.setattr(provider_pool, "call", call)
+
+    async def no_cache(key):
+        return None
+
+    results = collect(
+        run,
+        ["broken street", "nowhere street", "chui avenue"],
+        no_cache,
+        lambda trimmed: geocoding_service.forward(trimmed, check_cache=False),
+    )
+
+    statuses = {key: _batch_status(*value) for key, value in results.items()}
+    assert statuses == {"broken street": "error", "nowhere street": "not_found", "chui avenue": "ok"}
+    assert results["broken street"][1] == "upstream down"
@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.core.pubsub import PubSub
+from app.services.chat import ChatService, serialize_message
+from app.websockets.chat_ws import ChatConnectionManager
+from fakes import FakeWebSocket, settle
+
+
+@pytest.fixture
+def fast_inbox(monkeypatch):
+    monkeypatch.setattr(settings, "WS_INBOX_INTERVAL_MS", 30)
+
+
+async def post(manager: ChatConnectionManager, user_id: int, text: str, sender: str = "user"):
+    message = await ChatService().create_message(user_id=user_id, sender=sender, text=text)
+    await manager._on_chat_event(
+        {"userId": user_id, "message": {"type": "message", "data": serialize_message(message)}}
+    )
+    return message
+
+
+def decoded(websocket: FakeWebSocket, frame_type: str):
+    return [frame for frame in map(json.loads, websocket.frames) if frame["type"] == frame_type]
+
+
+def inbox_entries(websocket: FakeWebSocket):
+    # Без снимка при подписке: только изменения, разосланные flush()
+    return [entry for frame in decoded(websocket, "inbox") if not frame.get("snapshot") for entry in frame["data"]]
+
+
+def test_inbox_changes_are_batched_per_interval(run, make_user, fast_inbox):
+    first, second = make_user(), make_user()
+    manager = ChatConnectionManager(PubSub())
+    admin = FakeWebSocket()
+
+    async def scenario():
+        await ChatService().create_message(user_id=first.id, sender="user", text="hello")
+        await manager.register_admin(admin)
+        await manager.subscribe(admin, [], inbox=True)
+        await post(manager, first.id, "m2")
+        await post(manager, first.id, "m3")
+        await post(manager, second.id, "y1")
+        await settle()
+        before = len(inbox_entries(admin))
+        await asyncio.sleep(0.06)
+        await settle()
+        return before
+
+    assert run(scenario()) == 0
+
+    [snapshot] = [frame for frame in decoded(admin, "inbox") if frame.get("snapshot")]
+    assert {entry["userId"]: entry["unread"] for entry in snapshot["data"]}[first.id] == 1
+    # Одна рассылка на интервал, по кадру на изменённый диалог
+    entries = {entry["userId"]: entry for entry in inbox_entries(admin)}
+    assert set(entries) == {first.id, second.id}
+    assert entries[first.id]["unread"] == 3
+    assert entries[first.id]["lastMessage"]["text"] == "m3"
+    assert entries[second.id]["unread"] == 1
+    assert manager._inbox.flushes == 1
+    assert decoded(admin, "message") == []
+
+    async def reply():
+        await post(manager, first.id, "ответ", sender="admin")
+        await asyncio.sleep(0.06)
+        await settle()
+        await manager.unregister(admin)
+
+    run(reply())
+    assert inbox_entries(admin)[-1]["unread"] == 0
+
+
+def test_messages_reach_only_matching_topics(run, make_user, fast_inbox):
+    watched, other = make_user(), make_user()
+    manager = ChatConnectionManager(PubSub())
+    inbox_admin, watcher, firehose = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+
+    async def scenario():
+        for websocket in (inbox_admin, watcher, firehose):
+            await manager.register_admin(websocket)
+        await manager.subscribe(inbox_admin, [], inbox=True)
+        await manager.subscribe(watcher, [watched.id], inbox=False)
+        await post(manager, watched.id, "to watched")
+        await post(manager, other.id, "to other")
+        await asyncio.sleep(0.06)
+        await settle()
+        for websocket in (inbox_admin, watcher, firehose):
+            await manager.unregister(websocket)
+
+    run(scenario())
+
+    def texts(websocket):
+        return [frame["data"]["text"] for frame in decoded(websocket, "message")]
+
+    assert texts(inbox_admin) == []
+    assert texts(watcher) == ["to watched"]
+    assert texts(firehose) == ["to watched", "to other"]
+    assert {entry["userId"] for entry in inbox_entries(inbox_admin)} == {watched.id, other.id}
+    assert decoded(watcher, "inbox") == decoded(firehose, "inbox") == []
+
+
+def test_no_flush_without_inbox_subscribers(run, make_user, fast_inbox):
+    user = make_user()
+    manager = ChatConnectionManager(PubSub())
+    admin = FakeWebSocket()
+
+    async def scenario():
+        await manager.register_admin(admin)
+        await manager.subscribe(admin, [], inbox=True)
+        await manager.unsubscribe(admin, [], inbox=True)
+        await post(manager, user.id, "hi")
+        await asyncio.sleep(0.06)
+        await settle()
+        await manager.unregister(admin)
+
+    run(scenario())
+
+    assert manager._inbox.flushes == 0
+    assert inbox_entries(admin) == []
@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.dependencies import require_admin
+from app.core.write_queue import write_queue
+from app.main import app
+from app.models.order import Order
+from app.services.order_export import EXPORT_COLUMNS, OrderExport
+
+BASE = datetime(2026, 3, 1)
+
+
+@pytest.fixture
+def orders(run, make_user):
+    """Пять заказов с уникальным статусом, чтобы не пересекаться с другими тестами."""
+    user = make_user()
+    tag = f"test-{uuid.uuid4().hex[:8]}"
+
+    async def create():
+        return [
+            await write_queue.add(Order(
+                user_id=user.id,
+                address=f"Адрес {i}",
+                start_coords={"latitude": 42.87, "longitude": 74.59},
+                cost=100.0 * i,
+                status=tag,
+                created_at=BASE + timedelta(hours=i),
+            ))
+            for i in range(5)
+        ]
+
+    return tag, run(create())
+
+
+def collect(run, export: OrderExport, fmt: str):
+    async def read():
+        return [chunk async for chunk in export.stream(fmt)]
+
+    return run(read())
+
+
+def test_ndjson_newest_first(run, orders):
+    tag, created = orders
+
+    chunks = collect(run, OrderExport(statuses=[tag]), "ndjson")
+
+    rows = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+    assert [row["id"] for row in rows] == [order.id for order in reversed(created)]
+    assert list(rows[0]) == EXPORT_COLUMNS
+    assert rows[0]["created_at"] == (BASE + timedelta(hours=4)).isoformat()
+    assert rows[0]["start_coords"] == {"latitude": 42.87, "longitude": 74.59}
+
+
+def test_csv_has_bom_header_and_json_columns(run, orders):
+    tag, created = orders
+
+    chunks = collect(run, OrderExport(statuses=[tag]), "csv")
+
+    text = b"".join(chunks).decode()
+    assert text.startswith("﻿")
+    rows = list(csv.DictReader(io.StringIO(text[1:])))
+    assert [int(row["id"]) for row in rows] == [order.id for order in reversed(created)]
+    assert json.loads(rows[0]["start_coords"]) == {"latitude": 42.87, "longitude": 74.59}
+    assert rows[0]["address"] == "Адрес 4"
+
+
+def test_date_filter_is_half_open(run, orders):
+    tag, created = orders
+    export = OrderExport(
+        created_from=BASE + timedelta(hours=1),
+        created_to=BASE + timedelta(hours=3),
+        statuses=[tag],
+    )
+
+    rows = b"".join(collect(run, export, "ndjson")).decode().splitlines()
+
+    assert [json.loads(row)["id"] for row in rows] == [created[2].id, created[1].id]
+
+
+def test_rows_are_streamed_in_batches(run, orders, monkeypatch):
+    tag, _ = orders
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+
+    ndjson = collect(run, OrderExport(statuses=[tag]), "ndjson")
+    csv_chunks = collect(run, OrderExport(statuses=[tag]), "csv")
+
+    assert [chunk.count(b"\n") for chunk in ndjson] == [2, 2, 1]
+    # Первая пачка CSV несёт заголовок
+    assert [chunk.count(b"\r\n") for chunk in csv_chunks] == [3, 2, 1]
+
+
+def test_require_admin_rejects_other_roles(run, make_user):
+    admin = make_user(role="admin")
+    customer = make_user()
+
+    assert run(require_admin(admin)) is admin
+    with pytest.raises(HTTPException) as error:
+        run(require_admin(customer))
+    assert error.value.status_code == 403
+
+
+def test_export_requires_auth():
+    response = TestClient(app).get("/api/v1/orders/export")
+
+    assert response.status_code == 401
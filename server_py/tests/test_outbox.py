@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.pubsub import PubSub
+from app.websockets.chat_ws import ChatConnectionManager
+from app.websockets.outbox import CLOSE_SLOW_CONSUMER, COALESCE, DISCONNECT, DROP_OLDEST, Outbox, encode_frame, event_key
+from fakes import FakeWebSocket, settle
+
+
+def make_outbox(policy: str, max_size: int = 2):
+    closed = []
+
+    async def on_close(websocket):
+        closed.append(websocket)
+
+    websocket = FakeWebSocket()
+    return Outbox(websocket, on_close, max_size=max_size, policy=policy), websocket, closed
+
+
+def queued(outbox: Outbox):
+    return [frame for _, frame in outbox._queue]
+
+
+def test_drop_oldest_keeps_newest_frames():
+    outbox, _, _ = make_outbox(DROP_OLDEST)
+
+    assert all(outbox.put(frame) for frame in ("a", "b", "c"))
+
+    assert queued(outbox) == ["b", "c"]
+    assert outbox.dropped == 1
+
+
+def test_coalesce_replaces_queued_frame_with_same_key():
+    outbox, _, _ = make_outbox(COALESCE, max_size=3)
+
+    outbox.put("order 1 pending", key="order:1")
+    outbox.put("order 2 pending", key="order:2")
+    outbox.put("order 1 accepted", key="order:1")
+
+    assert queued(outbox) == ["order 1 accepted", "order 2 pending"]
+    assert outbox.coalesced == 1 and outbox.dropped == 0
+
+
+def test_coalesce_without_key_falls_back_to_drop_oldest():
+    outbox, _, _ = make_outbox(COALESCE)
+
+    for frame in ("a", "b", "c"):
+        outbox.put(frame)
+
+    assert queued(outbox) == ["b", "c"]
+    assert outbox.dropped == 1
+
+
+def test_disconnect_policy_closes_slow_consumer(run):
+    outbox, websocket, closed = make_outbox(DISCONNECT, max_size=1)
+
+    async def scenario():
+        assert outbox.put("a")
+        assert not outbox.put("b")
+        await settle()
+
+    run(scenario())
+
+    assert outbox.closed and outbox.depth == 0
+    assert websocket.close_code == CLOSE_SLOW_CONSUMER
+    assert closed == [websocket]
+    assert not outbox.put("c")
+
+
+def test_writer_sends_in_order(run):
+    outbox, websocket, _ = make_outbox(DROP_OLDEST, max_size=10)
+
+    async def scenario():
+        outbox.start()
+        for frame in ("a", "b", "c"):
+            outbox.put(frame)
+        await settle()
+        await outbox.stop()
+
+    run(scenario())
+
+    assert websocket.frames == ["a", "b", "c"]
+    assert outbox.sent == 3
+
+
+def test_send_timeout_disconnects_stuck_client(run, monkeypatch):
+    monkeypatch.setattr(settings, "WS_SEND_TIMEOUT_SECONDS", 0.01)
+    outbox, websocket, closed = make_outbox(DROP_OLDEST)
+    websocket.hold()
+
+    async def scenario():
+        outbox.start()
+        outbox.put("a")
+        await asyncio.sleep(0.05)
+
+    run(scenario())
+
+    assert outbox.closed
+    assert websocket.frames == []
+    assert websocket.close_code == CLOSE_SLOW_CONSUMER
+    assert closed == [websocket]
+
+
+@pytest.mark.parametrize(
+    "message, key",
+    [
+        ({"type": "order", "event": "created", "data": {"id": 7}}, "order:7"),
+        ({"type": "message", "data": {"id": 3, "seq": 1}}, "message:3"),
+        ({"type": "replay", "since": 1}, None),
+        ("text", None),
+    ],
+)
+def test_event_key(message, key):
+    assert event_key(message) == key
+
+
+def test_fan_out_coalesces_order_updates_for_slow_admin(run, monkeypatch):
+    monkeypatch.setattr(settings, "WS_OUTBOX_POLICY", COALESCE)
+    manager = ChatConnectionManager(PubSub())
+    websocket = FakeWebSocket()
+    websocket.hold()
+    first = {"type": "order", "event": "created", "data": {"id": 1, "status": "pending"}}
+    second = {"type": "order", "event": "updated", "data": {"id": 1, "status": "accepted"}}
+    other = {"type": "order", "event": "created", "data": {"id": 2, "status": "pending"}}
+
+    async def scenario():
+        await manager.register_admin(websocket)
+        # Писатель уже забрал первый кадр и ждёт клиента
+        await manager._on_admin_event({"message": other})
+        await settle()
+        await manager._on_admin_event({"message": first})
+        await manager._on_admin_event({"message": second})
+        websocket.release()
+        await settle()
+        await manager.unregister(websocket)
+
+    run(scenario())
+
+    assert websocket.frames == [encode_frame(other), encode_frame(second)]
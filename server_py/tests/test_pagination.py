@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.database import AsyncReadSessionLocal
+from app.core.pagination import Cursor, PageParams, fetch_page
+from app.models.user import User
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 16, 12, 30, 45, 123456)
+
+    decoded = Cursor.decode(Cursor(created_at, 42, backward=True).encode())
+
+    assert (decoded.created_at, decoded.id, decoded.backward) == (created_at, 42, True)
+
+
+@pytest.mark.parametrize("value", ["garbage", "W10", Cursor(datetime(2026, 1, 1), 1).encode()[:-3]])
+def test_malformed_cursor_is_rejected(value):
+    with pytest.raises(HTTPException) as error:
+        Cursor.decode(value)
+    assert error.value.status_code == 400
+
+
+@pytest.fixture
+def users(make_user):
+    # Двое с одинаковым created_at: порядок между ними решает id
+    base = datetime(2026, 1, 1)
+    stamps = [base, base + timedelta(minutes=1), base + timedelta(minutes=1), base + timedelta(minutes=2), base + timedelta(minutes=3)]
+    return [make_user(created_at=stamp) for stamp in stamps]
+
+
+def walk(run, ids, cursor_attr, start=None):
+    async def page(cursor):
+        async with AsyncReadSessionLocal() as session:
+            stmt = select(User).where(User.id.in_(ids))
+            return await fetch_page(session, stmt, User, PageParams(2, cursor))
+
+    pages, cursor = [], start
+    while True:
+        result = run(page(cursor))
+        pages.append([u.id for u in result.items])
+        cursor = getattr(result, cursor_attr)
+        if cursor is None:
+            return pages, result
+
+
+def test_keyset_pages_forward_and_back(run, users):
+    ids = [u.id for u in users]
+    newest_first = [u.id for u in sorted(users, key=lambda u: (u.created_at, u.id), reverse=True)]
+
+    forward, last = walk(run, ids, "next_cursor")
+    assert forward == [newest_first[0:2], newest_first[2:4], newest_first[4:]]
+
+    backward, _ = walk(run, ids, "prev_cursor", start=last.prev_cursor)
+    assert backward == [newest_first[2:4], newest_first[0:2]]
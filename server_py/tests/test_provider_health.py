@@ -0,0 +1,42 @@
+from app.core.config import settings
+from app.services.geocoding.providers import ProviderHealth
+
+
+def open_breaker() -> ProviderHealth:
+    health = ProviderHealth("test")
+    for _ in range(settings.GEO_CB_FAILURE_THRESHOLD):
+        health.record_failure()
+    assert health.state == "open"
+    # Пауза разомкнутого breaker'а уже прошла
+    health.opened_at -= settings.GEO_CB_RESET_SECONDS
+    return health
+
+
+def test_half_open_admits_a_single_probe():
+    health = open_breaker()
+
+    assert [health.acquire() for _ in range(3)] == [True, False, False]
+    assert health.state == "half_open"
+    assert not health.available()
+
+
+def test_cancelled_probe_hands_over_to_next_caller():
+    health = open_breaker()
+    assert health.acquire()
+
+    health.release()
+
+    assert health.acquire()
+    assert not health.acquire()
+
+
+def test_probe_outcome_closes_or_reopens():
+    health = open_breaker()
+    health.acquire()
+    health.record_success(0.01)
+    assert health.state == "closed" and health.acquire() and health.acquire()
+
+    health = open_breaker()
+    health.acquire()
+    health.record_failure()
+    assert health.state == "open" and not health.available()
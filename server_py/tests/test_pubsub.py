@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.pubsub import InProcessBackend, PubSub, SQLiteBackend
+
+
+@pytest.fixture
+def fast_poll(monkeypatch):
+    monkeypatch.setattr(settings, "PUBSUB_POLL_MS", 10)
+
+
+def recorder(bus: PubSub, channel: str):
+    received = []
+
+    async def handler(message):
+        received.append(message)
+
+    bus.subscribe(channel, handler)
+    return received
+
+
+async def wait_for(predicate, timeout: float = 1.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("event not delivered")
+        await asyncio.sleep(0.01)
+
+
+def test_sqlite_backend_delivers_across_connections(run, tmp_path, fast_poll):
+    path = tmp_path / "pubsub.db"
+    first, second = PubSub(), PubSub()
+    got_first, got_second = recorder(first, "chat"), recorder(second, "chat")
+
+    async def scenario():
+        await first.startup(SQLiteBackend(path))
+        await second.startup(SQLiteBackend(path))
+        await first.publish("chat", {"n": 1})
+        await second.publish("chat", {"n": 2})
+        await wait_for(lambda: len(got_first) == 2 and len(got_second) == 2)
+        # Ещё пара опросов: свои события из журнала не приходят повторно
+        await asyncio.sleep(0.05)
+        snapshots = first.snapshot(), second.snapshot()
+        await first.shutdown()
+        await second.shutdown()
+        return snapshots
+
+    first_stats, second_stats = run(scenario())
+
+    assert got_first == [{"n": 1}, {"n": 2}]
+    assert got_second == [{"n": 2}, {"n": 1}]
+    assert first_stats["published"] == first_stats["received"] == 1
+    assert first_stats["origin"] != second_stats["origin"]
+
+
+def test_sqlite_backend_skips_history_and_own_commits(run, tmp_path, fast_poll):
+    path = tmp_path / "pubsub.db"
+    early, late = PubSub(), PubSub()
+    got_late = recorder(late, "chat")
+
+    async def scenario():
+        await early.startup(SQLiteBackend(path))
+        await early.publish("chat", {"n": "before"})
+        await late.startup(SQLiteBackend(path))
+        # data_version не меняется от собственных коммитов: журнал не читается
+        await late.backend.publish("chat", {"n": "own"})
+        own_rows = await asyncio.to_thread(late.backend._fetch)
+        await early.publish("chat", {"n": "after"})
+        await wait_for(lambda: got_late)
+        await early.shutdown()
+        await late.shutdown()
+        return own_rows
+
+    assert run(scenario()) == []
+    assert got_late == [{"n": "after"}]
+
+
+def test_inprocess_backend_reaches_peers_once(run):
+    hub = set()
+    first, second = PubSub(), PubSub()
+    got_first, got_second = recorder(first, "chat"), recorder(second, "chat")
+
+    async def scenario():
+        await first.startup(InProcessBackend(hub))
+        await second.startup(InProcessBackend(hub))
+        await first.publish("chat", {"n": 1})
+        await second.shutdown()
+        await first.publish("chat", {"n": 2})
+        await first.shutdown()
+
+    run(scenario())
+
+    assert got_first == [{"n": 1}, {"n": 2}]
+    assert got_second == [{"n": 1}]
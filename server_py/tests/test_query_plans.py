@@ -0,0 +1,26 @@
+"""Планы горячих запросов (scripts/check_query_plans.py) на базе тестов:
+SQLite по умолчанию или PostgreSQL из DATABASE_URL."""
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from app.core.database import engine
+
+_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "check_query_plans.py"
+_spec = importlib.util.spec_from_file_location("check_query_plans", _SCRIPT)
+check_query_plans = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(check_query_plans)
+
+HOT_QUERIES = check_query_plans.hot_queries()
+
+
+@pytest.mark.parametrize("query", HOT_QUERIES, ids=[query.name for query in HOT_QUERIES])
+def test_hot_query_uses_index(run, db, query):
+    async def problems():
+        async with engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                return await check_query_plans._postgres_problems(conn, query)
+            return await check_query_plans._sqlite_problems(conn, query)
+
+    assert run(problems()) == []
@@ -0,0 +1,39 @@
+from app.core.config import settings
+from app.services.geocoding import quota as quota_module
+from app.services.geocoding.quota import ProviderQuota
+
+
+def make_quota(monkeypatch, rate: float = 1.0, daily: int = 10) -> ProviderQuota:
+    monkeypatch.setattr(settings, "GEO_QUOTA_ENABLED", True)
+    monkeypatch.setitem(settings.GEO_QUOTA_RATE_LIMITS, "test", rate)
+    monkeypatch.setitem(settings.GEO_QUOTA_DAILY_LIMITS, "test", daily)
+    return ProviderQuota("test")
+
+
+def test_refund_restores_counter_and_bucket(monkeypatch):
+    quota = make_quota(monkeypatch)
+    tokens = quota.bucket.tokens
+
+    assert quota.try_spend("forward") is not None
+    quota.refund()
+
+    assert quota.used == 0
+    assert quota.bucket.tokens >= tokens
+
+
+def test_refund_after_day_rollover_does_not_go_negative(monkeypatch):
+    quota = make_quota(monkeypatch)
+    quota.try_spend("forward")
+
+    monkeypatch.setattr(quota_module, "_today", lambda: "2999-01-01")
+    quota.refund()
+
+    assert quota.used == 0
+    assert quota.remaining == 10
+
+
+def test_spend_is_rejected_when_daily_budget_is_used(monkeypatch):
+    quota = make_quota(monkeypatch, rate=0.0, daily=2)
+
+    assert [quota.try_spend("forward") for _ in range(3)] == [0.0, 0.0, None]
+    assert quota.budget_rejected == 1
@@ -0,0 +1,44 @@
+from app.services.geocoding.ranking import Candidate, coords_key, rank_candidates, ranking_engine
+
+
+def _candidate(title, *, address="", kind=None, lat=42.87, lon=74.59):
+    result = {"title": title, "latitude": lat, "longitude": lon, "address": address or title}
+    return Candidate(result, address_name=address, name=title, settlement=kind)
+
+
+def test_settlement_ranks_above_street():
+    candidates = [
+        _candidate("Ленина", address="улица Ленина"),
+        _candidate("Ленинское", kind="village"),
+    ]
+    results = rank_candidates(candidates, "ленин", 10)
+    assert [r["title"] for r in results] == ["Ленинское", "Ленина"]
+
+
+def test_lane_penalized_unless_requested():
+    candidates = [
+        _candidate("Советский", address="переулок Советский"),
+        _candidate("Советская", address="улица Советская"),
+    ]
+    assert rank_candidates(candidates, "совет", 10)[0]["title"] == "Советская"
+
+    lane_score, _ = ranking_engine.score(candidates, "переулок совет")
+    assert lane_score == sum(ranking_engine.weights[k] for k in ("lane", "match_address", "prefix"))
+
+
+def test_equal_scores_keep_provider_order():
+    candidates = [_candidate(f"Улица {i}", address=f"улица {i}") for i in range(3)]
+    results = rank_candidates(candidates, "улица", 10)
+    assert [r["title"] for r in results] == ["Улица 0", "Улица 1", "Улица 2"]
+
+
+def test_dedupe_and_limit():
+    candidates = [
+        _candidate("Ала-Тоо"),
+        _candidate("ала-тоо "),
+        _candidate("Ала-Арча", lat=42.6),
+    ]
+    assert [r["title"] for r in rank_candidates(candidates, "ала", 10)] == ["Ала-Тоо", "Ала-Арча"]
+    assert len(rank_candidates(candidates, "ала", 1)) == 1
+    by_coords = rank_candidates(candidates, "ала", 10, key=coords_key)
+    assert [r["title"] for r in by_coords] == ["Ала-Тоо", "Ала-Арча"]
@@ -0,0 +1,88 @@
+from fastapi.testclient import TestClient
+
+from app.core.auth_cache import resolve_token
+from app.core.security import create_access_token
+from app.main import app
+from app.websockets.outbox import Outbox
+from app.websockets.registry import ConnectionRegistry
+from fakes import FakeWebSocket
+
+
+async def _noop(websocket):
+    pass
+
+
+def outbox() -> Outbox:
+    return Outbox(FakeWebSocket(), _noop)
+
+
+def test_sets_are_copy_on_write():
+    registry = ConnectionRegistry()
+    first, second = outbox(), outbox()
+    registry.add_user(1, first)
+    snapshot = registry.user(1)
+
+    registry.add_user(1, second)
+    registry.remove(first.websocket)
+
+    # Отправка, начатая по старому набору, видит его неизменным
+    assert snapshot == frozenset({first})
+    assert registry.user(1) == frozenset({second})
+
+
+def test_last_socket_removes_user_entry():
+    registry = ConnectionRegistry()
+    box = outbox()
+    registry.add_user(5, box)
+
+    assert registry.remove(box.websocket) is box
+    assert registry.remove(box.websocket) is None
+    assert registry.user(5) == frozenset()
+    assert registry.user_count == 0
+
+
+def test_admin_leaves_firehose_on_first_subscription():
+    registry = ConnectionRegistry()
+    admin = outbox()
+    registry.add_admin(admin)
+    assert registry.firehose() == frozenset({admin})
+
+    registry.watch(admin, [1, 2])
+
+    assert registry.firehose() == frozenset()
+    assert registry.watchers(1) == frozenset({admin})
+    assert registry.watching(admin) == [1, 2]
+
+    registry.unwatch(admin, [1])
+    assert registry.watchers(1) == frozenset()
+    assert registry.watched_count == 1
+
+
+def test_removing_admin_drops_all_subscriptions():
+    registry = ConnectionRegistry()
+    admin = outbox()
+    registry.add_admin(admin)
+    registry.watch(admin, [3])
+    registry.set_inbox(admin, True)
+
+    registry.remove(admin.websocket)
+
+    assert registry.admins() == frozenset()
+    assert registry.watchers(3) == frozenset()
+    assert registry.inbox() == frozenset()
+    assert registry.admin_count == 0
+
+
+def test_stats_require_admin(run, make_user):
+    admin, customer = make_user(role="admin"), make_user()
+    admin_token, customer_token = (create_access_token({"sub": str(u.id)}) for u in (admin, customer))
+    # Прогреваем кеш авторизации в цикле тестов: клиент ниже работает в своём цикле
+    run(resolve_token(admin_token))
+    run(resolve_token(customer_token))
+    client = TestClient(app)
+
+    assert client.get("/ws/stats").status_code == 401
+    assert client.get("/ws/stats", headers={"Authorization": f"Bearer {customer_token}"}).status_code == 403
+    response = client.get("/ws/stats", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert "deepest" in response.json()
@@ -0,0 +1,38 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app, geocoding
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Маршрутизацию проверяем без HTTP-клиентов, кеша и квот геокодинга
+    monkeypatch.setattr(geocoding, "started", True)
+    return TestClient(app)
+
+
+def test_legacy_geocode_path_resolves_through_mount(client):
+    legacy = client.get("/geocode/stats")
+    prefixed = client.get("/api/v1/geocode/stats")
+
+    assert legacy.status_code == prefixed.status_code == 200
+    assert set(legacy.json()) == set(prefixed.json()) >= {"cache", "providers", "quota"}
+
+
+def test_legacy_orders_path_is_aliased(client):
+    # 401 от require_admin, а не 404: путь переписан в /api/v1/orders/export
+    assert client.get("/orders/export").status_code == 401
+    assert client.get("/api/v1/orders/export").status_code == 401
+
+
+def test_unknown_segment_is_not_rewritten(client):
+    assert client.get("/nowhere/export").status_code == 404
+    assert client.get("/api/v1/openapi.json").status_code == 200
+
+
+def test_openapi_lists_lazy_geocoding_routes(client):
+    paths = client.get("/api/v1/openapi.json").json()["paths"]
+
+    assert {"/api/v1/geocode/forward", "/api/v1/geocode/suggest", "/api/v1/geocode/batch/forward"} <= set(paths)
+    assert "/api/v1/orders/export" in paths
+    assert paths["/api/v1/geocode/forward"]["get"]["tags"] == ["geocoding"]
@@ -0,0 +1,83 @@
+import asyncio
+
+from app.services.geocoding.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call(run):
+    flight = SingleFlight()
+    calls = 0
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", factory) for _ in range(3)))
+
+    assert run(scenario()) == [1, 1, 1]
+    assert calls == 1
+    assert flight.snapshot() == {"inFlight": 0, "started": 1, "joined": 2, "cancelled": 0}
+
+
+def test_error_is_shared_and_key_released(run):
+    flight = SingleFlight()
+
+    async def factory():
+        await asyncio.sleep(0)
+        raise RuntimeError("provider down")
+
+    async def scenario():
+        return await asyncio.gather(
+            flight.do("k", factory), flight.do("k", factory), return_exceptions=True
+        )
+
+    results = run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(flight) == 0
+
+
+def test_cancelling_one_waiter_keeps_shared_call(run):
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def factory():
+        await release.wait()
+        return "ok"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("k", factory))
+        second = asyncio.ensure_future(flight.do("k", factory))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await second
+
+    assert run(scenario()) == "ok"
+    assert flight.cancelled == 0
+
+
+def test_call_cancelled_when_last_waiter_leaves(run):
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def factory():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def scenario():
+        waiters = [asyncio.ensure_future(flight.do("k", factory)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+    run(scenario())
+    assert flight.cancelled == 1
+    assert len(flight) == 0
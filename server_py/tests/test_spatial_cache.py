@@ -0,0 +1,62 @@
+from app.core.config import settings
+from app.services.geocoding.spatial import (
+    SpatialCache,
+    calculate_distance,
+    geohash_bounds,
+    geohash_encode,
+)
+
+# Центр Бишкека
+LAT, LON = 42.8746, 74.5698
+
+
+def make_cache(monkeypatch) -> SpatialCache:
+    monkeypatch.setattr(settings, "GEO_SPATIAL_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "GEO_SPATIAL_PRECISION", 8)
+    monkeypatch.setattr(settings, "GEO_SPATIAL_MAX_DISTANCE", 25.0)
+    return SpatialCache()
+
+
+def cell_edges(lat: float, lon: float):
+    return geohash_bounds(geohash_encode(lat, lon, settings.GEO_SPATIAL_PRECISION))
+
+
+def test_neighbor_cell_across_boundary_hits(monkeypatch):
+    cache = make_cache(monkeypatch)
+    min_lat, max_lat, min_lon, max_lon = cell_edges(LAT, LON)
+    # Две точки по разные стороны восточной границы ячейки, в паре метров друг от друга
+    west = (LAT, max_lon - 0.00002)
+    east = (LAT, max_lon + 0.00002)
+    assert geohash_encode(*west, 8) != geohash_encode(*east, 8)
+
+    cache.set(*west, "Чуй 1")
+
+    assert cache.get(*east) == "Чуй 1"
+    assert cache.neighbor_hits == 1
+
+
+def test_same_cell_beyond_radius_misses(monkeypatch):
+    cache = make_cache(monkeypatch)
+    min_lat, max_lat, min_lon, max_lon = cell_edges(LAT, LON)
+    # Противоположные углы одной ячейки: ≈40 м, больше радиуса
+    near = (min_lat + 1e-6, min_lon + 1e-6)
+    far = (max_lat - 1e-6, max_lon - 1e-6)
+    assert geohash_encode(*near, 8) == geohash_encode(*far, 8)
+    assert calculate_distance(*near, *far) > settings.GEO_SPATIAL_MAX_DISTANCE
+
+    cache.set(*near, "Чуй 1")
+
+    assert cache.get(*far) is None
+    assert cache.misses == 1
+
+
+def test_nearest_point_wins(monkeypatch):
+    cache = make_cache(monkeypatch)
+    min_lat, max_lat, min_lon, max_lon = cell_edges(LAT, LON)
+    center_lat = (min_lat + max_lat) / 2
+    center_lon = (min_lon + max_lon) / 2
+    cache.set(center_lat, center_lon - 0.0001, "дальний")
+    cache.set(center_lat, center_lon + 0.00002, "ближний")
+
+    assert cache.get(center_lat, center_lon) == "ближний"
+    assert cache.hits == 1
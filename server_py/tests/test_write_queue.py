@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import AsyncSessionLocal
+from app.core.write_queue import WriteQueue
+from app.models.chat_message import ChatMessage
+
+
+@pytest.fixture
+def queue(run, db):
+    queue = WriteQueue()
+    run(queue.startup())
+    yield queue
+    run(queue.shutdown())
+
+
+def add_message(user_id: int, text: str):
+    async def op(session):
+        message = ChatMessage(user_id=user_id, sender="user", text=text, seq=None)
+        session.add(message)
+        await session.flush()
+        return message
+
+    return op
+
+
+async def texts(user_id: int):
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(ChatMessage.text).where(ChatMessage.user_id == user_id).order_by(ChatMessage.id)
+        )
+        return list(result.scalars())
+
+
+def test_concurrent_writes_share_one_commit(run, queue, make_user):
+    user = make_user()
+
+    async def scenario():
+        return await asyncio.gather(*(queue.run(add_message(user.id, f"m{i}")) for i in range(5)))
+
+    messages = run(scenario())
+
+    assert all(m.id is not None for m in messages)
+    assert queue.batches == 1
+    assert queue.writes == 5
+    assert queue.max_batch == 5
+    assert run(texts(user.id)) == [f"m{i}" for i in range(5)]
+
+
+def test_domain_error_fails_only_its_op(run, queue, make_user):
+    user = make_user()
+
+    async def not_found(session):
+        # Запись до ошибки должна откатиться вместе с операцией
+        session.add(ChatMessage(user_id=user.id, sender="user", text="partial"))
+        await session.flush()
+        raise HTTPException(status_code=404, detail="nope")
+
+    async def scenario():
+        return await asyncio.gather(
+            queue.run(add_message(user.id, "before")),
+            queue.run(not_found),
+            queue.run(add_message(user.id, "after")),
+            return_exceptions=True,
+        )
+
+    before, error, after = run(scenario())
+
+    assert isinstance(error, HTTPException) and error.status_code == 404
+    assert isinstance(before, ChatMessage) and isinstance(after, ChatMessage)
+    assert queue.retried == 0
+    assert queue.batches == 1
+    assert run(texts(user.id)) == ["before", "after"]
+
+
+def test_database_error_retries_batch_one_by_one(run, queue, make_user):
+    user = make_user()
+    taken = make_user()
+
+    async def duplicate_phone(session):
+        from app.models.user import User
+
+        session.add(User(phone=taken.phone))
+        await session.flush()
+
+    async def scenario():
+        return await asyncio.gather(
+            queue.run(add_message(user.id, "a")),
+            queue.run(duplicate_phone),
+            queue.run(add_message(user.id, "b")),
+            return_exceptions=True,
+        )
+
+    first, error, second = run(scenario())
+
+    assert isinstance(error, IntegrityError)
+    assert isinstance(first, ChatMessage) and isinstance(second, ChatMessage)
+    assert queue.retried == 3
+    assert run(texts(user.id)) == ["a", "b"]
+
+
+def test_single_op_runs_inline_without_worker(run, db, make_user):
+    user = make_user()
+    queue = WriteQueue()
+
+    message = run(queue.run(add_message(user.id, "inline")))
+
+    assert message.id is not None
+    assert queue.batches == 0
+
+    async def count():
+        async with AsyncSessionLocal() as session:
+            return await session.scalar(select(func.count()).where(ChatMessage.user_id == user.id))
+
+    assert run(count()) == 1